@@ -7,10 +7,13 @@ Copyright (c) by Abu Huzaifah Bidin with help from Github Copilot
 """
 
 from flask import Flask, request, jsonify, Response, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from compression import init_compression
 import os
 import json
-from typing import Dict, List, Any, Optional
+import hashlib
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 import logging
 import traceback
@@ -26,13 +29,27 @@ from scheduler.models import Tank, Vessel, Crude, Route, FeedstockParcel, Feedst
 
 # Import new database components
 from database.extended_ops import DatabaseManagerExtended
+from database.db_manager import with_iso_timestamps
+import loaders
+from loaders import load_tanks, load_vessels, load_crudes, load_recipes
 
 # Import OpenAI function calling system
 from llm_functions import OASISLLMFunctions
 from data_services import DataService
 
+def _json_default(o):
+    """JSON fallback for scheduler models so callers can hand Tank objects to the encoder."""
+    if isinstance(o, Tank):
+        return o.to_dict()
+    return DefaultJSONProvider.default(o)
+
+class OasisJSONProvider(DefaultJSONProvider):
+    default = staticmethod(_json_default)
+
 app = Flask(__name__)
+app.json = OasisJSONProvider(app)
 CORS(app, resources={r"/api/*": {"origins": "*"}})
+init_compression(app)
 
 # Configure logging for API
 logging.basicConfig(
@@ -47,11 +64,14 @@ db = DatabaseManagerExtended(DB_PATH)
 data_service = DataService(db)
 
 # Initialize LLM functions with database
-llm_functions = OASISLLMFunctions(DB_PATH)
+llm_functions = OASISLLMFunctions(DB_PATH, db=db)
 
 # Migration flag file
 MIGRATION_FLAG = os.path.join(os.path.dirname(__file__), ".migration_completed")
 
+# Scheduler output, served as part of /api/data
+SCHEDULE_PATH = os.path.join(os.path.dirname(__file__), "output", "schedule_results.json")
+
 def ensure_migration():
     """Ensure JSON data has been migrated to database."""
     if not os.path.exists(MIGRATION_FLAG):
@@ -68,9 +88,41 @@ if not ensure_migration():
 data_change_queue = queue.Queue()
 sse_connections = []
 
+# Digest of the last request body persisted per resource, with the data version
+# right after that save; any later write (from any process) changes the version
+_LAST_SAVE_HASH: Dict[str, Tuple[bytes, int]] = {}
+
+def _request_digest() -> bytes:
+    """Hash the raw request body so identical re-saves can skip the write transaction."""
+    return hashlib.blake2b(request.get_data()).digest()
+
+def _data_etag(include_schedule: bool = False) -> str:
+    """Weak ETag from the database data version, plus the schedule file mtime if requested."""
+    tag = str(db.get_schema_version())
+    if include_schedule:
+        try:
+            tag += f"-{os.stat(SCHEDULE_PATH).st_mtime_ns}"
+        except OSError:
+            pass
+    return f'W/"{tag}"'
+
+def _not_modified(etag: str) -> Optional[Response]:
+    """Return a 304 response if the client already holds the current representation."""
+    if request.headers.get('If-None-Match') == etag:
+        return Response(status=304, headers={'ETag': etag})
+    return None
+
+def _with_etag(response: Response, etag: str) -> Response:
+    """Attach validator headers so clients revalidate instead of refetching."""
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = 'private, must-revalidate'
+    return response
+
 # Data change notification system
 def notify_data_change(change_type: str, data_type: str = None, details: dict = None):
     """Notify all connected clients about data changes."""
+    # Any change invalidates the last-saved digest for that resource
+    _LAST_SAVE_HASH.pop(data_type, None)
     event_data = {
         'type': change_type,
         'data_type': data_type,
@@ -130,19 +182,26 @@ def data_stream():
 def get_all_data():
     """Get all system data from database."""
     try:
+        etag = _data_etag(include_schedule=True)
+        not_modified = _not_modified(etag)
+        if not_modified:
+            return not_modified
+        
         print("[get_all_data] Starting to load all system data...")
         
-        # Get all data from database
-        tanks_data = db.get_all_tanks()
+        # Get all data from database in one consistent read
+        snapshot = db.load_all_config_bulk()
+        
+        tanks_data = snapshot.tanks
         print(f"[get_all_data] Loaded {len(tanks_data)} tanks")
         
-        vessels_data = db.get_all_vessels()
+        vessels_data = snapshot.vessels
         print(f"[get_all_data] Loaded {len(vessels_data)} vessels")
         
-        crudes_data = {crude['name']: crude for crude in db.get_all_crudes()}
+        crudes_data = {crude['name']: crude for crude in snapshot.crudes}
         print(f"[get_all_data] Loaded {len(crudes_data)} crudes")
         
-        recipes_data = db.get_all_blending_recipes()
+        recipes_data = snapshot.recipes
         print(f"[get_all_data] Loaded {len(recipes_data)} recipes")
         
         # Convert recipes to dictionary format for compatibility
@@ -151,19 +210,19 @@ def get_all_data():
             recipes_dict[str(idx)] = recipe
         
         # Get feedstock requirements
-        feedstock_requirements = db.get_all_feedstock_requirements()
+        feedstock_requirements = snapshot.feedstock_requirements
         print(f"[get_all_data] Loaded {len(feedstock_requirements)} feedstock requirements")
         
         # Get routes
-        routes_data = db.get_all_routes()
+        routes_data = snapshot.routes
         print(f"[get_all_data] Loaded {len(routes_data)} routes")
         
         # Get plants
-        plants_data = db.get_all_plants()
+        plants_data = snapshot.plants
         print(f"[get_all_data] Loaded {len(plants_data)} plants")
         
         # Get vessel types from database
-        vessel_types = db.get_all_vessel_types()
+        vessel_types = snapshot.vessel_types
         if not vessel_types:
             # Fallback to default if DB is empty
             vessel_types = [
@@ -176,7 +235,7 @@ def get_all_data():
         # Extract feedstock parcels from vessel cargo
         feedstock_parcels = []
         for vessel_id, vessel_info in vessels_data.items():
-            for cargo_item in vessel_info.get('cargo', []):
+            for cargo_item in vessel_info.get('cargo', ()):
                 feedstock_parcels.append({
                     'grade': cargo_item.get('grade', ''),
                     'volume': cargo_item.get('volume', 0),
@@ -189,25 +248,24 @@ def get_all_data():
         
         # Load schedule data if available
         schedule_data = []
-        schedule_path = os.path.join(os.path.dirname(__file__), "output", "schedule_results.json")
+        schedule_path = SCHEDULE_PATH
         try:
-            with open(schedule_path, 'r') as f:
-                schedule_json = json.load(f)
-                # Extract the daily_plans array from the nested structure
-                schedule_data = schedule_json.get('daily_plans', [])
-                print(f"[get_all_data] Loaded schedule data with {len(schedule_data)} daily plans")
+            # Parsed once per file version; the daily_plans array is shared read-only
+            schedule_data = loaders.load_daily_plans(schedule_path)
+            print(f"[get_all_data] Loaded schedule data with {len(schedule_data)} daily plans")
         except (FileNotFoundError, json.JSONDecodeError):
             print(f"[get_all_data] No schedule data found at {schedule_path}")
             pass
         
+        # Timestamps go out as text, as they did before the epoch-integer columns
         response_data = {
             'tanks': tanks_data,
-            'vessels': vessels_data,
+            'vessels': {vessel_id: with_iso_timestamps(vessel) for vessel_id, vessel in vessels_data.items()},
             'crudes': crudes_data,
             'recipes': recipes_dict,
-            'feedstock_requirements': feedstock_requirements,
+            'feedstock_requirements': [with_iso_timestamps(req) for req in feedstock_requirements],
             'feedstock_parcels': feedstock_parcels,
-            'routes': routes_data,
+            'routes': [with_iso_timestamps(route) for route in routes_data],
             'plants': plants_data,
             'vessel_types': vessel_types,
             'schedule': schedule_data,
@@ -216,7 +274,7 @@ def get_all_data():
         }
         
         print(f"[get_all_data] Successfully loaded all data types: {list(response_data.keys())}")
-        return jsonify(response_data)
+        return _with_etag(jsonify(response_data), etag)
         
     except Exception as e:
         print(f"[get_all_data] Error loading data: {str(e)}")
@@ -237,6 +295,9 @@ def get_tanks():
 def save_tanks():
     """Save tanks data to database with atomic transaction."""
     try:
+        digest = _request_digest()
+        if _LAST_SAVE_HASH.get('tanks') == (digest, db.get_schema_version()):
+            return jsonify({'message': 'Tanks unchanged', 'timestamp': datetime.now().isoformat(), 'unchanged': True})
         tanks_data = request.get_json()
         print(f"[save_tanks] Received tanks_data: {tanks_data}")  # Log incoming data
         if not tanks_data:
@@ -247,6 +308,7 @@ def save_tanks():
         if success:
             # Notify about tank data change
             notify_data_change('update', 'tanks', {'count': len(tanks_data)})
+            _LAST_SAVE_HASH['tanks'] = (digest, db.get_schema_version())
             return jsonify({'message': 'Tanks saved successfully', 'timestamp': datetime.now().isoformat(), 'tanks_count': len(tanks_data)})
         else:
             print("[save_tanks] Failed to save tanks (service returned False)")
@@ -263,7 +325,7 @@ def get_tank(tank_name):
     try:
         tank_data = data_service.get_tank(tank_name)
         if tank_data:
-            return jsonify(tank_data)
+            return jsonify(with_iso_timestamps(tank_data))
         else:
             return jsonify({'error': 'Tank not found'}), 404
     except Exception as e:
@@ -305,7 +367,7 @@ def get_vessels():
     """Get vessels data from database."""
     try:
         vessels_data = data_service.get_all_vessels()
-        return jsonify(vessels_data)
+        return jsonify({vessel_id: with_iso_timestamps(vessel) for vessel_id, vessel in vessels_data.items()})
     except Exception as e:
         return jsonify({'error': f'Failed to load vessels: {str(e)}'}), 500
 
@@ -313,6 +375,9 @@ def get_vessels():
 def save_vessels():
     """Save vessels data to database with atomic transaction."""
     try:
+        digest = _request_digest()
+        if _LAST_SAVE_HASH.get('vessels') == (digest, db.get_schema_version()):
+            return jsonify({'message': 'Vessels unchanged', 'timestamp': datetime.now().isoformat(), 'unchanged': True})
         vessels_data = request.get_json()
         if not vessels_data:
             return jsonify({'error': 'No vessels data provided'}), 400
@@ -320,6 +385,7 @@ def save_vessels():
         if success:
             # Notify about vessel data change
             notify_data_change('update', 'vessels', {'count': len(vessels_data)})
+            _LAST_SAVE_HASH['vessels'] = (digest, db.get_schema_version())
             return jsonify({'message': 'Vessels saved successfully', 'timestamp': datetime.now().isoformat(), 'vessels_count': len(vessels_data)})
         else:
             return jsonify({'error': 'Failed to save vessels'}), 500
@@ -366,6 +432,9 @@ def get_recipes():
 def save_recipes():
     """Save recipes data to database."""
     try:
+        digest = _request_digest()
+        if _LAST_SAVE_HASH.get('recipes') == (digest, db.get_schema_version()):
+            return jsonify({'message': 'Recipes unchanged', 'timestamp': datetime.now().isoformat(), 'unchanged': True})
         recipes_data = request.get_json()
         if not recipes_data:
             return jsonify({'error': 'No recipes data provided'}), 400
@@ -373,6 +442,7 @@ def save_recipes():
         if success:
             # Notify about recipe data change
             notify_data_change('update', 'recipes', {'count': len(recipes_data)})
+            _LAST_SAVE_HASH['recipes'] = (digest, db.get_schema_version())
             return jsonify({'message': 'Recipes saved successfully', 'timestamp': datetime.now().isoformat(), 'recipes_count': len(recipes_data)})
         else:
             return jsonify({'error': 'Failed to save recipes'}), 500
@@ -388,7 +458,7 @@ def get_feedstock_parcels():
         
         feedstock_parcels = []
         for vessel_id, vessel_info in vessels_data.items():
-            for cargo_item in vessel_info.get('cargo', []):
+            for cargo_item in vessel_info.get('cargo', ()):
                 feedstock_parcels.append({
                     'grade': cargo_item.get('grade', ''),
                     'volume': cargo_item.get('volume', 0),
@@ -434,7 +504,7 @@ def get_feedstock_requirements():
         print("[get_feedstock_requirements] Loading feedstock requirements...")
         requirements = db.get_all_feedstock_requirements()
         print(f"[get_feedstock_requirements] Loaded {len(requirements)} requirements")
-        return jsonify(requirements)
+        return jsonify([with_iso_timestamps(req) for req in requirements])
     except Exception as e:
         print(f"[get_feedstock_requirements] Error: {str(e)}")
         return jsonify({'error': f'Failed to load feedstock requirements: {str(e)}'}), 500
@@ -446,7 +516,7 @@ def get_routes():
         print("[get_routes] Loading routes...")
         routes = db.get_all_routes()
         print(f"[get_routes] Loaded {len(routes)} routes")
-        return jsonify(routes)
+        return jsonify([with_iso_timestamps(route) for route in routes])
     except Exception as e:
         print(f"[get_routes] Error: {str(e)}")
         return jsonify({'error': f'Failed to load routes: {str(e)}'}), 500
@@ -520,91 +590,6 @@ def save_schedule():
 # DATABASE-AWARE SCHEDULER ENDPOINTS
 # ==============================================================================
 
-def load_tanks_from_db() -> Dict[str, Tank]:
-    """Load tanks from database and convert to Tank objects."""
-    tanks_data = db.get_all_tanks()
-    tanks = {}
-    
-    for tank_name, tank_info in tanks_data.items():
-        tank = Tank(
-            name=tank_name,
-            capacity=tank_info['capacity'],
-            content=tank_info['content']
-        )
-        tanks[tank_name] = tank
-    
-    return tanks
-
-def load_vessels_from_db() -> List[Vessel]:
-    """Load vessels from database and convert to Vessel objects."""
-    vessels_data = db.get_all_vessels()
-    vessels = []
-    
-    for vessel_id, vessel_info in vessels_data.items():
-        # Process cargo data
-        cargo = []
-        for parcel_info in vessel_info.get("cargo", []):
-            cargo.append(FeedstockParcel(
-                grade=parcel_info.get("grade", ""),
-                volume=parcel_info.get("volume", 0),
-                origin=parcel_info.get("origin", ""),
-                ldr={
-                    int(parcel_info.get("loading_start_day", 0)): 
-                    int(parcel_info.get("loading_end_day", 0))
-                },
-                vessel_id=vessel_id
-            ))
-        
-        # Create vessel object
-        vessel = Vessel(
-            vessel_id=vessel_id,
-            arrival_day=int(vessel_info.get("arrival_day", 0)),
-            capacity=float(vessel_info.get("capacity", 0)),
-            cost=float(vessel_info.get("cost", 0)),
-            cargo=cargo,
-            days_held=int(vessel_info.get("days_held", 0))
-        )
-        
-        # Set route attribute
-        if "route" in vessel_info:
-            vessel.route = vessel_info["route"]
-        
-        vessels.append(vessel)
-    
-    return vessels
-
-def load_crudes_from_db() -> Dict[str, Crude]:
-    """Load crudes from database and convert to Crude objects."""
-    crudes_list = db.get_all_crudes()
-    crudes = {}
-    
-    for crude_info in crudes_list:
-        crude = Crude(
-            name=crude_info['name'],
-            margin=crude_info['margin'],
-            origin=crude_info['origin']
-        )
-        crudes[crude_info['name']] = crude
-    
-    return crudes
-
-def load_recipes_from_db() -> List[BlendingRecipe]:
-    """Load recipes from database and convert to BlendingRecipe objects."""
-    recipes_list = db.get_all_blending_recipes()
-    recipes = []
-    
-    for recipe_info in recipes_list:
-        recipe = BlendingRecipe(
-            name=recipe_info['name'],
-            primary_grade=recipe_info['primary_grade'],
-            secondary_grade=recipe_info.get('secondary_grade'),
-            max_rate=recipe_info['max_rate'],
-            primary_fraction=recipe_info['primary_fraction']
-        )
-        recipes.append(recipe)
-    
-    return recipes
-
 @app.route('/api/scheduler/run', methods=['POST'])
 def run_scheduler():
     """Run scheduler with database data."""
@@ -615,10 +600,10 @@ def run_scheduler():
         print(f"Starting scheduler for {horizon_days} days with database data...")
         
         # Load data from database
-        tanks = load_tanks_from_db()
-        vessels = load_vessels_from_db()
-        crudes = load_crudes_from_db()
-        recipes = load_recipes_from_db()
+        tanks = load_tanks(db)
+        vessels = load_vessels(db)
+        crudes = load_crudes(db)
+        recipes = load_recipes(db)
         
         print(f"Loaded from database: {len(tanks)} tanks, {len(vessels)} vessels, {len(crudes)} crudes, {len(recipes)} recipes")
         
@@ -661,15 +646,15 @@ def optimize_schedule():
         max_recipes_per_day = data.get('max_recipes_per_day', 2)  # Max recipes per day
         api_logger.info(f"Optimization request: days={horizon_days}, objective={objective}, multi_recipe={multi_recipe}")
         # Load data from database
-        crudes = load_crudes_from_db()
-        recipes = load_recipes_from_db()
+        crudes = load_crudes(db)
+        recipes = load_recipes(db)
         # Check if we have an existing schedule to optimize
         current_schedule = data.get('schedule', [])
         from scheduler.models import DailyPlan
         schedule_objects = []
-        tanks_db = load_tanks_from_db()
+        tanks_db = load_tanks(db)
         # Load vessels from database for inventory arrivals
-        vessels = load_vessels_from_db()
+        vessels = load_vessels(db)
         if not current_schedule:
             api_logger.warning("No schedule provided in request payload")
             return jsonify({'error': 'No schedule provided'}), 400
@@ -733,26 +718,19 @@ def optimize_schedule():
                         'max_rate': bd.max_rate
                     } for bd in plan_dict['blending_details']
                 ]
-            # --- SERIALIZE tanks to dicts if needed ---
-            if 'tanks' in plan_dict and plan_dict['tanks']:
-                tanks_json = {}
-                for tank_name, tank in plan_dict['tanks'].items():
-                    if isinstance(tank, dict):
-                        tanks_json[tank_name] = tank
-                    else:
-                        tanks_json[tank_name] = {
-                            'name': tank.name,
-                            'capacity': tank.capacity,
-                            'content': tank.content
-                        }
-                plan_dict['tanks'] = tanks_json
+            # Tanks go out in their on-disk dict shape, so the daily_plans cache
+            # seeded by the auto-save holds the same types as a parsed file
+            if plan_dict.get('tanks'):
+                plan_dict['tanks'] = {
+                    tank_name: tank.to_dict() if isinstance(tank, Tank) else tank
+                    for tank_name, tank in plan_dict['tanks'].items()
+                }
             result.append(plan_dict)
         # --- AUTO-SAVE optimized schedule to schedule_results.json ---
         try:
             output_path = os.path.join(os.path.dirname(__file__), "output", "schedule_results.json")
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            with open(output_path, 'w') as f:
-                json.dump({"daily_plans": result}, f, indent=2)
+            loaders.save_daily_plans(output_path, result)
             api_logger.info(f"Auto-saved optimized schedule to {output_path} ({len(result)} days)")
         except Exception as save_exc:
             api_logger.error(f"Failed to auto-save optimized schedule: {save_exc}")
@@ -837,30 +815,7 @@ def optimize_vessels():
         optimized_vessels = vessel_optimizer.optimize_and_save(horizon_days=horizon_days)
         
         # Save optimized vessels back to database
-        vessels_dict = {}
-        for vessel in optimized_vessels:
-            # Convert vessel to dictionary format
-            cargo_json = []
-            for cargo in vessel.cargo:
-                ldr_start = next(iter(cargo.ldr.keys())) if cargo.ldr else 0
-                ldr_end = next(iter(cargo.ldr.values())) if cargo.ldr else 0
-                cargo_json.append({
-                    "grade": cargo.grade,
-                    "volume": cargo.volume,
-                    "origin": cargo.origin,
-                    "loading_start_day": ldr_start,
-                    "loading_end_day": ldr_end
-                })
-            
-            vessels_dict[vessel.vessel_id] = {
-                "vessel_id": vessel.vessel_id,
-                "arrival_day": vessel.arrival_day,
-                "capacity": vessel.capacity,
-                "cost": vessel.cost,
-                "days_held": vessel.days_held,
-                "cargo": cargo_json,
-                "route": getattr(vessel, 'route', [])
-            }
+        vessels_dict = {vessel.vessel_id: vessel.to_dict() for vessel in optimized_vessels}
         
         # Save to database
         db.save_vessels_data(vessels_dict)
@@ -887,30 +842,28 @@ def optimize_vessels():
 def database_status():
     """Get database status and statistics."""
     try:
-        conn = db._get_connection()
+        etag = _data_etag()
+        not_modified = _not_modified(etag)
+        if not_modified:
+            return not_modified
         
-        # Get table counts
-        tables = [
+        # Get table counts in one round-trip
+        counts = db.get_table_counts([
             'plants', 'crudes', 'tanks', 'tank_contents', 'blending_recipes',
             'vessels', 'vessel_cargo', 'vessel_routes', 'routes',
             'feedstock_requirements', 'vessel_daily_locations'
-        ]
-        
-        counts = {}
-        for table in tables:
-            cursor = conn.execute(f"SELECT COUNT(*) as count FROM {table}")
-            counts[table] = cursor.fetchone()['count']
+        ])
         
         # Check migration status
         migration_completed = os.path.exists(MIGRATION_FLAG)
         
-        return jsonify({
+        return _with_etag(jsonify({
             'status': 'operational',
             'migration_completed': migration_completed,
             'database_path': DB_PATH,
             'table_counts': counts,
             'timestamp': datetime.now().isoformat()
-        })
+        }), etag)
         
     except Exception as e:
         return jsonify({'error': f'Database status check failed: {str(e)}'}), 500
@@ -922,9 +875,8 @@ def backup_database():
         backup_name = f"oasis_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
         backup_path = os.path.join(os.path.dirname(DB_PATH), backup_name)
         
-        # Copy database file
-        import shutil
-        shutil.copy2(DB_PATH, backup_path)
+        # Online backup so committed WAL pages are included
+        db.backup(backup_path)
         
         return jsonify({
             'message': 'Database backup created successfully',
@@ -951,17 +903,19 @@ def migrate_database():
         static_dir = data.get('static_data_dir', 'static_data')
         dynamic_dir = data.get('dynamic_data_dir', 'dynamic_data')
         
-        # Run migration
+        # Run a full migration, so every file is re-read even if logged before
         results = migrate_from_json(
             db_path=DB_PATH,
             static_data_dir=static_dir,
-            dynamic_data_dir=dynamic_dir
+            dynamic_data_dir=dynamic_dir,
+            resume=False
         )
         
         # Create migration flag if successful
         if results['status'] == 'completed':
             with open(MIGRATION_FLAG, 'w') as f:
                 f.write(datetime.now().isoformat())
+            _LAST_SAVE_HASH.clear()
         
         return jsonify(results)
         
@@ -983,6 +937,9 @@ def process_chat_message():
         message = data['message']
         conversation_history = data.get('conversation_history', [])
         
+        # LLM tools may write tanks/vessels directly, so forget the last-saved digests
+        _LAST_SAVE_HASH.clear()
+        
         # Process the message through the LLM
         result = llm_functions.process_chat_message(message, conversation_history)
         
@@ -1006,6 +963,7 @@ def process_chat_message_stream():
         
         message = data['message']
         conversation_history = data.get('conversation_history', [])
+        _LAST_SAVE_HASH.clear()
         
         def generate():
             """Generator function for streaming response."""
@@ -1156,6 +1114,12 @@ def internal_error(error):
 # ==============================================================================
 
 if __name__ == '__main__':
-    print("Starting OASIS Database-Powered API Server...")
-    print("Database initialized and API server ready")
-    app.run(debug=True, host='0.0.0.0', port=5001)
+    # The Werkzeug dev server handles requests one at a time; production
+    # deployments should go through wsgi.py under gunicorn/gevent instead.
+    if os.environ.get('DEV'):
+        print("Starting OASIS Database-Powered API Server...")
+        print("Database initialized and API server ready")
+        app.run(debug=True, host='0.0.0.0', port=5001)
+    else:
+        print("Development server is disabled. Set DEV=1 to run it, or serve with:")
+        print("  gunicorn -k gevent -w 4 -b 0.0.0.0:5001 wsgi:app")
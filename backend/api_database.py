@@ -22,10 +22,14 @@ from scheduler.models import BlendingRecipe
 
 # Import new database components
 from database.extended_ops import DatabaseManagerExtended
+from database.db_manager import with_iso_timestamps
 
 app = Flask(__name__)
 CORS(app, resources={r"/api/*": {"origins": "*"}})
 
+# Shared default for vessels without a route; serializes as [] without allocating
+_EMPTY_ROUTE = ()
+
 # Initialize database
 DB_PATH = os.path.join(os.path.dirname(__file__), "oasis.db")
 db = DatabaseManagerExtended(DB_PATH)
@@ -68,7 +72,7 @@ def get_all_data():
         
         return jsonify({
             'tanks': tanks_data,
-            'vessels': vessels_data,
+            'vessels': {vessel_id: with_iso_timestamps(vessel) for vessel_id, vessel in vessels_data.items()},
             'crudes': crudes_data,
             'recipes': recipes_dict,
             'timestamp': datetime.now().isoformat(),
@@ -115,7 +119,7 @@ def get_tank(tank_name):
     try:
         tank_data = db.get_tank(name=tank_name)
         if tank_data:
-            return jsonify(tank_data)
+            return jsonify(with_iso_timestamps(tank_data))
         else:
             return jsonify({'error': 'Tank not found'}), 404
     except Exception as e:
@@ -164,7 +168,7 @@ def get_vessels():
     """Get vessels data from database."""
     try:
         vessels_data = db.get_all_vessels()
-        return jsonify(vessels_data)
+        return jsonify({vessel_id: with_iso_timestamps(vessel) for vessel_id, vessel in vessels_data.items()})
     except Exception as e:
         return jsonify({'error': f'Failed to load vessels: {str(e)}'}), 500
 
@@ -296,7 +300,7 @@ def load_vessels_from_db() -> List[Vessel]:
     for vessel_id, vessel_info in vessels_data.items():
         # Process cargo data
         cargo = []
-        for parcel_info in vessel_info.get("cargo", []):
+        for parcel_info in vessel_info.get("cargo", ()):
             cargo.append(FeedstockParcel(
                 grade=parcel_info.get("grade", ""),
                 volume=parcel_info.get("volume", 0),
@@ -447,8 +451,7 @@ def optimize_vessels():
             # Convert vessel to dictionary format
             cargo_json = []
             for cargo in vessel.cargo:
-                ldr_start = next(iter(cargo.ldr.keys())) if cargo.ldr else 0
-                ldr_end = next(iter(cargo.ldr.values())) if cargo.ldr else 0
+                ldr_start, ldr_end = cargo.ldr_window
                 cargo_json.append({
                     "grade": cargo.grade,
                     "volume": cargo.volume,
@@ -464,7 +467,7 @@ def optimize_vessels():
                 "cost": vessel.cost,
                 "days_held": vessel.days_held,
                 "cargo": cargo_json,
-                "route": getattr(vessel, 'route', [])
+                "route": getattr(vessel, 'route', _EMPTY_ROUTE)
             }
         
         # Save to database
@@ -489,19 +492,13 @@ def optimize_vessels():
 def database_status():
     """Get database status and statistics."""
     try:
-        conn = db._get_connection()
-        
         # Get table counts
         tables = [
             'plants', 'crudes', 'tanks', 'tank_contents', 'blending_recipes',
             'vessels', 'vessel_cargo', 'vessel_routes', 'routes',
             'feedstock_requirements', 'vessel_daily_locations'
         ]
-        
-        counts = {}
-        for table in tables:
-            cursor = conn.execute(f"SELECT COUNT(*) as count FROM {table}")
-            counts[table] = cursor.fetchone()['count']
+        counts = db.get_table_counts(tables)
         
         # Check migration status
         migration_completed = os.path.exists(MIGRATION_FLAG)
@@ -524,9 +521,8 @@ def backup_database():
         backup_name = f"oasis_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
         backup_path = os.path.join(os.path.dirname(DB_PATH), backup_name)
         
-        # Copy database file
-        import shutil
-        shutil.copy2(DB_PATH, backup_path)
+        # Online backup so committed WAL pages are included
+        db.backup(backup_path)
         
         return jsonify({
             'message': 'Database backup created successfully',
@@ -553,11 +549,12 @@ def migrate_database():
         static_dir = data.get('static_data_dir', 'static_data')
         dynamic_dir = data.get('dynamic_data_dir', 'dynamic_data')
         
-        # Run migration
+        # Run a full migration, so every file is re-read even if logged before
         results = migrate_from_json(
             db_path=DB_PATH,
             static_data_dir=static_dir,
-            dynamic_data_dir=dynamic_dir
+            dynamic_data_dir=dynamic_dir,
+            resume=False
         )
         
         # Create migration flag if successful
@@ -8,12 +8,16 @@ MIGRATED TO USE SQLITE DATABASE - All JSON file operations replaced with databas
 Copyright (c) by Abu Huzaifah Bidin with help from Github Copilot
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
+from compression import init_compression
 import json
 import os
-from typing import Dict, List, Any, Optional
+import hashlib
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
+from functools import lru_cache
+from concurrent.futures import Future, ThreadPoolExecutor
 
 from scheduler import (
     Scheduler, VesselOptimizer, SchedulerOptimizer, 
@@ -24,9 +28,20 @@ from scheduler.models import BlendingRecipe
 
 # Import new database components
 from database.extended_ops import DatabaseManagerExtended
+import loaders
+from loaders import (
+    load_tanks, load_vessels, load_crudes, load_recipes, load_routes, load_feedstock_requirements
+)
+
+# orjson serializes straight to bytes and is several times faster than stdlib json
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 app = Flask(__name__)
 CORS(app, resources={r"/api/*": {"origins": "*"}})  # This enables CORS for all /api/ routes
+init_compression(app)
 
 # Initialize database
 DB_PATH = os.path.join(os.path.dirname(__file__), "oasis.db")
@@ -35,6 +50,95 @@ db = DatabaseManagerExtended(DB_PATH)
 # Migration flag file
 MIGRATION_FLAG = os.path.join(os.path.dirname(__file__), ".migration_completed")
 
+# Scheduler output, served as part of /api/data
+SCHEDULE_PATH = os.path.join(os.path.dirname(__file__), "output", "schedule_results.json")
+
+def ojsonify(obj):
+    """jsonify() replacement backed by orjson when it is installed."""
+    if orjson is None:
+        return jsonify(obj)
+    return Response(
+        orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS),
+        mimetype='application/json'
+    )
+
+def data_etag(include_schedule: bool = False) -> str:
+    """Weak ETag from the database data version, plus the schedule file mtime if requested."""
+    tag = str(db.get_schema_version())
+    if include_schedule:
+        try:
+            tag += f"-{os.stat(SCHEDULE_PATH).st_mtime_ns}"
+        except OSError:
+            pass
+    return f'W/"{tag}"'
+
+def not_modified(etag: str) -> Optional[Response]:
+    """Return a 304 response if the client already holds the current representation."""
+    if request.headers.get('If-None-Match') == etag:
+        return Response(status=304, headers={'ETag': etag})
+    return None
+
+def with_etag(response: Response, etag: str) -> Response:
+    """Attach validator headers so clients revalidate instead of refetching."""
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = 'private, must-revalidate'
+    return response
+
+# Field identifying the entity in each save-data payload
+SAVE_KEYS = {
+    'tanks': 'name',
+    'vessels': 'vessel_id',
+    'crudes': 'name',
+    'recipes': 'name',
+    'routes': 'id',
+}
+
+# Digest of the last content saved per (type, key), with the schema_version it
+# left behind; any later write anywhere bumps the version and voids the entry
+_last_saved: Dict[Tuple[str, Any], Tuple[bytes, int]] = {}
+
+def content_digest(content: Any) -> bytes:
+    """Order-independent hash of a save-data payload."""
+    if orjson is None:
+        encoded = json.dumps(content, sort_keys=True, separators=(',', ':')).encode()
+    else:
+        encoded = orjson.dumps(content, option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(encoded).digest()
+
+def read_json_file(path: str) -> Any:
+    """Read a JSON file, using orjson when available."""
+    with open(path, 'rb') as f:
+        if orjson is None:
+            return json.load(f)
+        return orjson.loads(f.read())
+
+
+# Optimizer results are persisted off the request thread; a single worker keeps
+# the writes ordered, and every request waits for the last one to land first
+vessel_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='vessel-writer')
+_last_vessel_write: Optional[Future] = None
+
+def wait_for_vessel_writes() -> None:
+    """
+    Block until the last queued vessel write has committed (read-after-write consistency).
+    
+    A finished write is forgotten once waited on, so a failure is reported once
+    rather than on every later request.
+    """
+    global _last_vessel_write
+    future = _last_vessel_write
+    if future is None:
+        return
+    error = future.exception()
+    if _last_vessel_write is future:
+        _last_vessel_write = None
+    if error is not None:
+        print(f"Background vessel save failed: {error}")
+
+@app.before_request
+def sync_pending_writes():
+    wait_for_vessel_writes()
+
 def ensure_migration():
     """Ensure JSON data has been migrated to database."""
     if not os.path.exists(MIGRATION_FLAG):
@@ -49,218 +153,33 @@ def initialize_app():
     if not ensure_migration():
         raise RuntimeError("Database migration required before starting API")
 
-# ==============================================================================
-# DATABASE-POWERED DATA LOADERS
-# ==============================================================================
-
-def load_tanks() -> Dict[str, Tank]:
-    """Load tank data from database and convert to Tank objects"""
-    tanks_data = db.get_all_tanks()
-    tanks = {}
-    
-    for tank_data in tanks_data:
-        tank_name = tank_data.get('name', '')
-        
-        # Get tank contents
-        contents = db.get_tank_contents(tank_name)
-        content_list = []
-        
-        for content in contents:
-            content_dict = {content['crude_grade']: content['volume']}
-            content_list.append(content_dict)
-        
-        tanks[tank_name] = Tank(
-            name=tank_name,
-            capacity=tank_data.get('capacity', 0),
-            content=content_list
-        )
-    
-    return tanks
-
-def load_recipes() -> List[BlendingRecipe]:
-    """Load recipe data from database and convert to BlendingRecipe objects"""
-    recipes_data = db.get_all_blending_recipes()
-    recipes = []
-    
-    for recipe_data in recipes_data:
-        recipes.append(BlendingRecipe(
-            name=recipe_data.get('name', ''),
-            primary_grade=recipe_data.get('primary_grade', ''),
-            secondary_grade=recipe_data.get('secondary_grade', ''),
-            primary_fraction=recipe_data.get('primary_fraction', 0),
-            max_rate=recipe_data.get('max_rate', 0)
-        ))
-    
-    return recipes
-
-def load_crudes() -> Dict[str, Crude]:
-    """Load crude data from database and convert to Crude objects"""
-    crudes_data = db.get_all_crudes()
-    crudes = {}
-    
-    for crude_data in crudes_data:
-        crude_name = crude_data.get('name', '')
-        crudes[crude_name] = Crude(
-            name=crude_name,
-            margin=crude_data.get('margin', 0),
-            origin=crude_data.get('origin', '')
-        )
-    
-    return crudes
-
-def load_routes() -> Dict[str, Route]:
-    """Load route data from database and convert to Route objects"""
-    routes_data = db.get_all_routes()
-    routes = {}
-    
-    for route_data in routes_data:
-        route_id = route_data.get('id', '')
-        routes[route_id] = Route(
-            origin=route_data.get('origin', ''),
-            destination=route_data.get('destination', ''),
-            time_travel=route_data.get('time_travel', 0)
-        )
-    
-    return routes
-
-def load_vessels() -> List[Vessel]:
-    """Load vessel data from database and convert to Vessel objects"""
-    vessels_data = db.get_all_vessels()
-    vessels = []
-    
-    for vessel_data in vessels_data:
-        vessel_id = vessel_data.get('vessel_id', '')
-        
-        # Get vessel cargo
-        cargo_data = db.get_vessel_cargo(vessel_id)
-        cargo = []
-        
-        for cargo_item in cargo_data:
-            cargo.append(FeedstockParcel(
-                grade=cargo_item.get('grade', ''),
-                volume=cargo_item.get('volume', 0),
-                origin=cargo_item.get('origin', ''),
-                ldr={
-                    cargo_item.get('loading_start_day', 0): 
-                    cargo_item.get('loading_end_day', 0)
-                },
-                vessel_id=vessel_id
-            ))
-        
-        # Create vessel object
-        vessel = Vessel(
-            vessel_id=vessel_id,
-            arrival_day=vessel_data.get('arrival_day', 0),
-            capacity=vessel_data.get('capacity', 0),
-            cost=vessel_data.get('cost', 0),
-            cargo=cargo,
-            days_held=vessel_data.get('days_held', 0)
-        )
-        
-        # Add vessel route if exists
-        route_data = db.get_vessel_routes(vessel_id)
-        if route_data:
-            vessel.route = route_data
-            
-        vessels.append(vessel)
-    
-    return vessels
-
-def load_feedstock_requirements() -> List[FeedstockRequirement]:
-    """Load feedstock requirements from database"""
-    req_data = db.get_all_feedstock_requirements()
-    requirements = []
-    
-    for req_info in req_data:
-        allowed_ldr = {
-            req_info.get('loading_start_day', 1): 
-            req_info.get('loading_end_day', 10)
-        }
-        
-        requirements.append(FeedstockRequirement(
-            grade=req_info.get('grade', ''),
-            volume=req_info.get('volume', 0),
-            origin=req_info.get('origin', ''),
-            allowed_ldr=allowed_ldr,
-            required_arrival_by=req_info.get('required_arrival_by', 30)
-        ))
-    
-    return requirements
-
-def load_plant() -> Dict:
-    """Load plant configuration from database"""
-    plants_data = db.get_all_plants()
-    if plants_data:
-        return plants_data[0]  # Return first plant config
-    return {}
-
 # ==============================================================================
 # HELPER FUNCTIONS FOR JSON CONVERSION
 # ==============================================================================
 
-def routes_to_dict(routes):
-    """Convert Route objects to dictionaries for JSON serialization"""
-    return {
-        route_id: {
-            "origin": route.origin,
-            "destination": route.destination,
-            "time_travel": route.time_travel
-        }
-        for route_id, route in routes.items()
-    }
-
 def convert_vessels_to_json(vessels) -> List[Dict]:
     """Convert vessel objects to JSON-serializable format"""
-    result = []
-    
-    for vessel in vessels:
-        cargo_json = []
-        for parcel in vessel.cargo:
-            ldr_start = next(iter(parcel.ldr.keys())) if parcel.ldr else 0
-            ldr_end = next(iter(parcel.ldr.values())) if parcel.ldr else 0
-            
-            cargo_json.append({
-                "grade": parcel.grade,
-                "volume": parcel.volume,
-                "origin": parcel.origin,
-                "loading_start_day": ldr_start,
-                "loading_end_day": ldr_end
-            })
-        
-        vessel_json = {
-            "vessel_id": vessel.vessel_id,
-            "arrival_day": vessel.arrival_day,
-            "capacity": vessel.capacity,
-            "cost": vessel.cost,
-            "cargo": cargo_json,
-            "days_held": vessel.days_held,
-            "route": getattr(vessel, 'route', [])
+    return [vessel.to_dict() for vessel in vessels]
+
+@lru_cache(maxsize=1)
+def vessels_payload(schema_version: int) -> Dict[str, Dict]:
+    """Frontend-shaped vessels dict, rebuilt only when the database data version changes."""
+    return {
+        vessel_id: {
+            "vessel_id": vessel_id,
+            "arrival_day": int(vessel["arrival_day"]),
+            "capacity": float(vessel["capacity"]),
+            "cost": float(vessel["cost"]),
+            "cargo": vessel["cargo"],
+            "days_held": int(vessel["days_held"]),
+            "route": vessel["route"]
         }
-        
-        result.append(vessel_json)
-    
-    return result
+        for vessel_id, vessel in db.get_all_vessels().items()
+    }
 
 def convert_requirements_to_json(requirements) -> List[Dict]:
     """Convert feedstock requirement objects to JSON-serializable format"""
-    result = []
-    
-    for req in requirements:
-        ldr_start = next(iter(req.allowed_ldr.keys())) if req.allowed_ldr else 0
-        ldr_end = next(iter(req.allowed_ldr.values())) if req.allowed_ldr else 0
-        
-        req_json = {
-            "grade": req.grade,
-            "volume": req.volume,
-            "origin": req.origin,
-            "loading_start_day": ldr_start,
-            "loading_end_day": ldr_end,
-            "required_arrival_by": req.required_arrival_by
-        }
-        
-        result.append(req_json)
-    
-    return result
+    return [req.to_dict() for req in requirements]
 
 # ==============================================================================
 # API ENDPOINTS
@@ -270,63 +189,41 @@ def convert_requirements_to_json(requirements) -> List[Dict]:
 def get_data():
     """Get all configuration data from database"""
     try:
-        tanks = load_tanks()
-        recipes = load_recipes()
-        crudes = load_crudes()
-        routes = load_routes()
-        vessels = load_vessels()
-        
-        # Convert vessels list to dictionary format for frontend compatibility
-        vessels_dict = {}
-        for vessel in vessels:
-            vessel_data = {
-                "vessel_id": vessel.vessel_id,
-                "arrival_day": vessel.arrival_day,
-                "capacity": vessel.capacity,
-                "cost": vessel.cost,
-                "cargo": [
-                    {
-                        "grade": parcel.grade,
-                        "volume": parcel.volume,
-                        "origin": parcel.origin,
-                        "loading_start_day": next(iter(parcel.ldr.keys())) if parcel.ldr else 0,
-                        "loading_end_day": next(iter(parcel.ldr.values())) if parcel.ldr else 0
-                    }
-                    for parcel in vessel.cargo
-                ],
-                "days_held": vessel.days_held,
-                "route": getattr(vessel, 'route', [])
-            }
-            vessels_dict[vessel.vessel_id] = vessel_data
+        etag = data_etag(include_schedule=True)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
+        # Read every configuration table in one consistent, N+1-free pass;
+        # vessels come from a payload memoized on the data version
+        snapshot = db.load_all_config_bulk(include_vessels=False)
+        vessels_dict = vessels_payload(db.get_schema_version())
         
         # Load schedule data if available
         schedule_data = []
-        schedule_path = os.path.join(os.path.dirname(__file__), "output", "schedule_results.json")
         try:
-            with open(schedule_path, 'r') as f:
-                schedule_json = json.load(f)
-                schedule_data = schedule_json.get('daily_plans', [])
+            schedule_data = loaders.load_daily_plans(SCHEDULE_PATH)
         except (FileNotFoundError, json.JSONDecodeError):
             pass
         
-        return jsonify({
-            "tanks": {name: {"name": tank.name, "capacity": tank.capacity, "content": tank.content} 
-                     for name, tank in tanks.items()},
-            "recipes": [{"name": r.name, "primary_grade": r.primary_grade, "secondary_grade": r.secondary_grade,
-                        "primary_fraction": r.primary_fraction, "max_rate": r.max_rate} for r in recipes],
-            "crudes": {name: {"name": crude.name, "margin": crude.margin, "origin": crude.origin} 
-                      for name, crude in crudes.items()},
-            "routes": routes_to_dict(routes),
+        return with_etag(ojsonify({
+            "tanks": snapshot.tanks,
+            "recipes": snapshot.recipes,
+            "crudes": {c["name"]: {"name": c["name"], "margin": c["margin"], "origin": c["origin"]} 
+                      for c in snapshot.crudes},
+            "routes": {r["id"]: {"origin": r["origin"], "destination": r["destination"], "time_travel": r["time_travel"]}
+                       for r in snapshot.routes},
             "vessels": vessels_dict,
             "vessel_routes": [],  # TODO: Load from database
             "vessel_types": [],   # TODO: Load from database
-            "plants": load_plant(),
-            "feedstock_requirements": convert_requirements_to_json(load_feedstock_requirements()),
+            "plants": snapshot.plants[0] if snapshot.plants else {},
+            "feedstock_requirements": convert_requirements_to_json(
+                load_feedstock_requirements(db, snapshot.feedstock_requirements)),
             "feedstock_parcels": [],  # Can be derived from vessels
             "schedule": schedule_data,
-        })
+        }), etag)
     except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+        return ojsonify({"success": False, "error": str(e)}), 500
 
 @app.route('/api/save-data', methods=['POST'])
 def save_data():
@@ -336,6 +233,14 @@ def save_data():
         data_type = data.get('type')
         content = data.get('content')
         
+        # Skip the write entirely when this exact content was the last thing saved
+        save_key = None
+        if data_type in SAVE_KEYS and isinstance(content, dict):
+            save_key = (data_type, content.get(SAVE_KEYS[data_type]))
+            digest = content_digest(content)
+            if _last_saved.get(save_key) == (digest, db.get_schema_version()):
+                return ojsonify({"success": True, "unchanged": True})
+        
         if data_type == 'tanks':
             tank_name = content.get('name')
             if tank_name:
@@ -345,43 +250,37 @@ def save_data():
                     'capacity': content.get('capacity', 0),
                     'plant_id': content.get('plant_id', 1)  # Default plant
                 }
-                db.save_tank(tank_data)
-                
-                # Update tank contents
-                db.clear_tank_contents(tank_name)
-                for content_item in content.get('content', []):
-                    for grade, volume in content_item.items():
-                        db.add_tank_content({
-                            'tank_name': tank_name,
-                            'crude_grade': grade,
-                            'volume': volume
-                        })
+                # Tank and its contents are replaced in one transaction
+                content_rows = [
+                    (grade, volume)
+                    for content_item in content.get('content', [])
+                    for grade, volume in content_item.items()
+                ]
+                db.save_tank(tank_data, content_rows)
                         
         elif data_type == 'vessels':
             vessel_id = content.get('vessel_id')
             if vessel_id:
-                # Save vessel
-                vessel_data = {
-                    'vessel_id': vessel_id,
-                    'capacity': content.get('capacity', 0),
-                    'cost': content.get('cost', 0),
-                    'arrival_day': content.get('arrival_day', 0),
-                    'days_held': content.get('days_held', 0)
-                }
-                db.save_vessel(vessel_data)
-                
-                # Save vessel cargo
-                db.clear_vessel_cargo(vessel_id)
-                for cargo_item in content.get('cargo', []):
-                    cargo_data = {
-                        'vessel_id': vessel_id,
-                        'grade': cargo_item.get('grade', ''),
-                        'volume': cargo_item.get('volume', 0),
-                        'origin': cargo_item.get('origin', ''),
-                        'loading_start_day': cargo_item.get('loading_start_day', 0),
-                        'loading_end_day': cargo_item.get('loading_end_day', 0)
-                    }
-                    db.add_vessel_cargo(cargo_data)
+                # Vessel and its cargo are replaced in one transaction
+                vessel_row = (
+                    vessel_id,
+                    content.get('arrival_day', 0),
+                    content.get('capacity', 0),
+                    content.get('cost', 0),
+                    content.get('days_held', 0)
+                )
+                cargo_rows = [
+                    (
+                        vessel_id,
+                        cargo_item.get('grade', ''),
+                        cargo_item.get('volume', 0),
+                        cargo_item.get('origin', ''),
+                        cargo_item.get('loading_start_day', 0),
+                        cargo_item.get('loading_end_day', 0)
+                    )
+                    for cargo_item in content.get('cargo', ())
+                ]
+                db.save_vessels_bulk([vessel_row], cargo_rows)
                     
         elif data_type == 'crudes':
             crude_name = content.get('name')
@@ -416,12 +315,14 @@ def save_data():
                 }
                 db.save_route(route_data)
         else:
-            return jsonify({"success": False, "error": f"Unknown data type: {data_type}"}), 400
+            return ojsonify({"success": False, "error": f"Unknown data type: {data_type}"}), 400
         
-        return jsonify({"success": True})
+        if save_key is not None:
+            _last_saved[save_key] = (digest, db.get_schema_version())
+        return ojsonify({"success": True})
         
     except Exception as e:
-        return jsonify({
+        return ojsonify({
             "success": False,
             "error": str(e)
         }), 500
@@ -439,18 +340,18 @@ def run_scheduler():
         days = data.get('days', 30)
         
         # Load required data from database
-        tanks = load_tanks()
-        recipes = load_recipes()
-        crudes = load_crudes()
-        vessels = load_vessels()
+        tanks = load_tanks(db)
+        recipes = load_recipes(db)
+        crudes = load_crudes(db)
+        vessels = load_vessels(db)
         
         # Validate required data
         if not tanks:
-            return jsonify({"success": False, "error": "No tanks available"}), 400
+            return ojsonify({"success": False, "error": "No tanks available"}), 400
         if not recipes:
-            return jsonify({"success": False, "error": "No blending recipes available"}), 400
+            return ojsonify({"success": False, "error": "No blending recipes available"}), 400
         if not crudes:
-            return jsonify({"success": False, "error": "No crude data available"}), 400
+            return ojsonify({"success": False, "error": "No crude data available"}), 400
         
         # Create and run scheduler
         max_processing_rate = 100
@@ -464,46 +365,46 @@ def run_scheduler():
         )
         
         print(f"Running scheduler for {days} days")
+        previous_mtime = os.path.getmtime(SCHEDULE_PATH) if os.path.exists(SCHEDULE_PATH) else None
         result = scheduler.run(days, save_output=True)
         
-        # Load the standardized JSON file
-        json_file = os.path.join(os.path.dirname(__file__), "output", "schedule_results.json")
+        # A successful run has just written result to the standardized JSON file;
+        # reuse it instead of parsing the file straight back in
+        if os.path.exists(SCHEDULE_PATH) and os.path.getmtime(SCHEDULE_PATH) != previous_mtime:
+            loaders.remember_daily_plans(SCHEDULE_PATH, result)
         
         try:
-            with open(json_file, 'r') as f:
-                schedule_data = json.load(f)
-                
-            return jsonify({
+            return ojsonify({
                 "success": True,
                 "days": days,
-                "daily_plans": schedule_data.get("daily_plans", [])
+                "daily_plans": loaders.load_daily_plans(SCHEDULE_PATH)
             })
             
         except Exception as file_error:
-            return jsonify({"success": False, "error": f"Failed to load schedule results: {str(file_error)}"}), 500
+            return ojsonify({"success": False, "error": f"Failed to load schedule results: {str(file_error)}"}), 500
         
     except Exception as e:
         import traceback
         traceback.print_exc()
-        return jsonify({"success": False, "error": str(e)}), 500
+        return ojsonify({"success": False, "error": str(e)}), 500
 
 @app.route('/api/vessel-optimizer/optimize', methods=['POST'])
 def optimize_vessels():
     """Optimize vessel scheduling based on feedstock requirements"""
+    global _last_vessel_write
     try:
         data = request.json
         horizon_days = data.get('horizon_days', 60)
         
         # Load data from database
-        requirements = load_feedstock_requirements()
-        routes = load_routes()
+        requirements = load_feedstock_requirements(db)
+        routes = load_routes(db)
         
         # For vessel types, we need to load from static data or database
         # This might need to be migrated to database as well
         vessel_types_file = os.path.join(os.path.dirname(__file__), "static_data", "vessel_types.json")
         try:
-            with open(vessel_types_file, 'r') as f:
-                vessel_types = json.load(f)
+            vessel_types = read_json_file(vessel_types_file)
         except:
             vessel_types = []
         
@@ -517,41 +418,40 @@ def optimize_vessels():
         # Run optimization
         vessels = vessel_optimizer.optimize(horizon_days=horizon_days)
         
-        # Save vessels to database
-        for vessel in vessels:
-            vessel_data = {
-                'vessel_id': vessel.vessel_id,
-                'capacity': vessel.capacity,
-                'cost': vessel.cost,
-                'arrival_day': vessel.arrival_day,
-                'days_held': vessel.days_held
-            }
-            db.save_vessel(vessel_data)
-            
-            # Save cargo
-            for cargo in vessel.cargo:
-                cargo_data = {
-                    'vessel_id': vessel.vessel_id,
-                    'grade': cargo.grade,
-                    'volume': cargo.volume,
-                    'origin': cargo.origin,
-                    'loading_start_day': next(iter(cargo.ldr.keys())) if cargo.ldr else 0,
-                    'loading_end_day': next(iter(cargo.ldr.values())) if cargo.ldr else 0
-                }
-                db.add_vessel_cargo(cargo_data)
+        # Queue the vessels and their cargo for a single-transaction save and
+        # respond straight from the optimizer's in-memory result
+        vessel_rows = [
+            (vessel.vessel_id, vessel.arrival_day, vessel.capacity, vessel.cost, vessel.days_held)
+            for vessel in vessels
+        ]
+        cargo_rows = [
+            (
+                vessel.vessel_id,
+                cargo.grade,
+                cargo.volume,
+                cargo.origin,
+                *cargo.ldr_window
+            )
+            for vessel in vessels
+            for cargo in vessel.cargo
+        ]
+        _last_vessel_write = vessel_writer.submit(db.save_vessels_bulk, vessel_rows, cargo_rows)
         
         # Convert vessels to JSON for response
         vessels_json = convert_vessels_to_json(vessels)
         
-        return jsonify({
+        # The optimization succeeded; the database write is still in flight and
+        # any failure is reported in the server log, not in this response
+        return ojsonify({
             "success": True,
-            "vessels": vessels_json
+            "vessels": vessels_json,
+            "save_status": "queued"
         })
         
     except Exception as e:
         import traceback
         traceback.print_exc()
-        return jsonify({"success": False, "error": str(e)}), 500
+        return ojsonify({"success": False, "error": str(e)}), 500
 
 @app.route('/api/save-schedule', methods=['POST'])
 def save_schedule():
@@ -561,19 +461,18 @@ def save_schedule():
         schedule = data.get('schedule', [])
         
         if not schedule:
-            return jsonify({"success": False, "error": "No schedule data provided"}), 400
+            return ojsonify({"success": False, "error": "No schedule data provided"}), 400
         
         # Save to schedule_results.json (keep file-based for schedule output)
         output_path = os.path.join(os.path.dirname(__file__), "output", "schedule_results.json")
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         
-        with open(output_path, 'w') as f:
-            json.dump({"daily_plans": schedule}, f, indent=2)
+        loaders.save_daily_plans(output_path, schedule)
         
-        return jsonify({"success": True})
+        return ojsonify({"success": True})
         
     except Exception as e:
-        return jsonify({
+        return ojsonify({
             "success": False,
             "error": str(e)
         }), 500
@@ -586,30 +485,32 @@ def save_schedule():
 def get_database_status():
     """Get database status and migration information"""
     try:
+        etag = data_etag()
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
         is_migrated = os.path.exists(MIGRATION_FLAG)
         
         # Get table counts
         table_counts = {}
         if is_migrated:
-            table_counts = {
-                'tanks': len(db.get_all_tanks()),
-                'vessels': len(db.get_all_vessels()),
-                'crudes': len(db.get_all_crudes()),
-                'recipes': len(db.get_all_blending_recipes()),
-                'routes': len(db.get_all_routes()),
-                'feedstock_requirements': len(db.get_all_feedstock_requirements()),
-            }
-        
-        return jsonify({
+            counts = db.get_table_counts([
+                'tanks', 'vessels', 'crudes', 'blending_recipes', 'routes', 'feedstock_requirements'
+            ])
+            counts['recipes'] = counts.pop('blending_recipes')
+            table_counts = counts
+        
+        return with_etag(ojsonify({
             "success": True,
             "migration_completed": is_migrated,
             "database_path": DB_PATH,
             "database_exists": os.path.exists(DB_PATH),
             "table_counts": table_counts
-        })
+        }), etag)
         
     except Exception as e:
-        return jsonify({
+        return ojsonify({
             "success": False,
             "error": str(e)
         }), 500
@@ -629,18 +530,18 @@ def migrate_database():
             with open(MIGRATION_FLAG, 'w') as f:
                 f.write(f"Migration completed at {datetime.now()}")
             
-            return jsonify({
+            return ojsonify({
                 "success": True,
                 "message": "Database migration completed successfully"
             })
         else:
-            return jsonify({
+            return ojsonify({
                 "success": False,
                 "error": "Migration failed"
             }), 500
             
     except Exception as e:
-        return jsonify({
+        return ojsonify({
             "success": False,
             "error": str(e)
         }), 500
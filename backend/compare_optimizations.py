@@ -7,61 +7,84 @@ This script runs both optimization models and provides detailed comparison analy
 """
 
 import subprocess
+import sys
+import tempfile
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+import numpy as np
 import pandas as pd
 from datetime import datetime
 import os
 
+# Only the end of a failed run's stderr is echoed; the full text is returned
+STDERR_TAIL_CHARS = 4000
+
 def run_optimization(script_name, description):
-    """Run an optimization script and capture results"""
-    print(f"\n🚀 Running {description}...")
-    print("=" * 60)
+    """Run an optimization script and capture results.
+    
+    Safe to call from several threads at once: progress messages are buffered
+    and printed as one block when the run finishes.
+    """
+    log = [f"\n🚀 Running {description}...", "=" * 60]
     
     start_time = time.time()
     
     try:
-        # Run the optimization script
-        result = subprocess.run(['python', script_name], 
-                              capture_output=True, 
-                              text=True, 
-                              timeout=7200)  # 2 hour timeout
+        # Run the optimization script with this interpreter; output goes to temp
+        # files so a multi-hour run cannot fill a pipe buffer and stall
+        with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+            process = subprocess.Popen([sys.executable, '-u', script_name], stdout=out, stderr=err)
+            try:
+                returncode = process.wait(timeout=7200)  # 2 hour timeout
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+                raise
+            
+            out.seek(0)
+            err.seek(0)
+            stdout = out.read().decode(errors='replace')
+            stderr = err.read().decode(errors='replace')
         
         execution_time = time.time() - start_time
         
-        if result.returncode == 0:
-            print(f"✅ {description} completed successfully")
-            print(f"⏱️ Execution time: {execution_time:.2f} seconds")
+        if returncode == 0:
+            log.append(f"✅ {description} completed successfully")
+            log.append(f"⏱️ Execution time: {execution_time:.2f} seconds")
             return {
                 'success': True,
                 'execution_time': execution_time,
-                'stdout': result.stdout,
-                'stderr': result.stderr
+                'stdout': stdout,
+                'stderr': stderr
             }
         else:
-            print(f"❌ {description} failed")
-            print(f"Error: {result.stderr}")
+            log.append(f"❌ {description} failed")
+            log.append(f"Error: {stderr[-STDERR_TAIL_CHARS:]}")
             return {
                 'success': False,
                 'execution_time': execution_time,
-                'stdout': result.stdout,
-                'stderr': result.stderr
+                'stdout': stdout,
+                'stderr': stderr
             }
             
     except subprocess.TimeoutExpired:
-        print(f"⏰ {description} timed out after 2 hours")
+        log.append(f"⏰ {description} timed out after 2 hours")
         return {
             'success': False,
             'execution_time': 7200,
             'error': 'Timeout'
         }
     except Exception as e:
-        print(f"❌ Error running {description}: {e}")
+        log.append(f"❌ Error running {description}: {e}")
         return {
             'success': False,
             'execution_time': time.time() - start_time,
             'error': str(e)
         }
+    finally:
+        print("\n".join(log))
 
 def load_results(filename):
     """Load optimization results from JSON file"""
@@ -76,6 +99,18 @@ def load_results(filename):
         print(f"❌ Error loading {filename}: {e}")
         return None
 
+def summary_metrics(results, execution_time):
+    """Key metrics from a results file's summary section"""
+    summary = SimpleNamespace(**results['summary'])
+    return {
+        "profit": summary.total_profit,
+        "revenue": summary.total_revenue,
+        "crude_cost": summary.total_crude_cost,
+        "vessel_cost": summary.total_vessel_cost,
+        "vessels_used": summary.vessels_used,
+        "execution_time": execution_time
+    }
+
 def compare_results(single_tank_results, five_tank_results, single_tank_time, five_tank_time):
     """Compare optimization results between single tank and 5-tank approaches"""
     print("\n📊 COMPARATIVE ANALYSIS")
@@ -91,29 +126,15 @@ def compare_results(single_tank_results, five_tank_results, single_tank_time, fi
     
     # Extract key metrics
     if single_tank_results:
-        comparison["single_tank"] = {
-            "profit": single_tank_results['summary']['total_profit'],
-            "revenue": single_tank_results['summary']['total_revenue'],
-            "crude_cost": single_tank_results['summary']['total_crude_cost'],
-            "vessel_cost": single_tank_results['summary']['total_vessel_cost'],
-            "vessels_used": single_tank_results['summary']['vessels_used'],
-            "execution_time": single_tank_time
-        }
+        comparison["single_tank"] = summary_metrics(single_tank_results, single_tank_time)
     
     if five_tank_results:
-        comparison["five_tank"] = {
-            "profit": five_tank_results['summary']['total_profit'],
-            "revenue": five_tank_results['summary']['total_revenue'],
-            "crude_cost": five_tank_results['summary']['total_crude_cost'],
-            "vessel_cost": five_tank_results['summary']['total_vessel_cost'],
-            "vessels_used": five_tank_results['summary']['vessels_used'],
-            "execution_time": five_tank_time
-        }
+        comparison["five_tank"] = summary_metrics(five_tank_results, five_tank_time)
     
     # Calculate differences
     if single_tank_results and five_tank_results:
-        st_profit = single_tank_results['summary']['total_profit']
-        ft_profit = five_tank_results['summary']['total_profit']
+        st_profit = comparison["single_tank"]["profit"]
+        ft_profit = comparison["five_tank"]["profit"]
         
         profit_diff = ft_profit - st_profit
         profit_percent = (profit_diff / st_profit) * 100 if st_profit != 0 else 0
@@ -163,26 +184,30 @@ def analyze_tank_utilization(five_tank_results):
     print(f"\n🏗️ TANK UTILIZATION ANALYSIS (5-Tank Model)")
     print("=" * 60)
     
-    # Calculate average utilization per tank
-    tank_stats = {}
+    # Flatten {day: {tank: data}} into a days x tanks array (NaN where a tank is missing)
+    daily_data = list(five_tank_results['tank_utilization'].values())
+    tank_index = {}
+    capacities = []
+    for day_data in daily_data:
+        for tank, tank_data in day_data.items():
+            if tank not in tank_index:
+                tank_index[tank] = len(tank_index)
+                capacities.append(tank_data['capacity'])
     
-    for day, day_data in five_tank_results['tank_utilization'].items():
+    utilizations = np.full((len(daily_data), len(tank_index)), np.nan)
+    for day_idx, day_data in enumerate(daily_data):
         for tank, tank_data in day_data.items():
-            if tank not in tank_stats:
-                tank_stats[tank] = {
-                    'utilizations': [],
-                    'capacity': tank_data['capacity']
-                }
-            tank_stats[tank]['utilizations'].append(tank_data['utilization_percent'])
+            utilizations[day_idx, tank_index[tank]] = tank_data['utilization_percent']
+    
+    # Per-tank statistics in one vectorized pass over the columns
+    avg_utils = np.nanmean(utilizations, axis=0)
+    max_utils = np.nanmax(utilizations, axis=0)
+    min_utils = np.nanmin(utilizations, axis=0)
     
     print(f"Tank Utilization Summary:")
-    for tank, stats in tank_stats.items():
-        avg_util = sum(stats['utilizations']) / len(stats['utilizations'])
-        max_util = max(stats['utilizations'])
-        min_util = min(stats['utilizations'])
-        
-        print(f"   {tank}: Capacity={stats['capacity']:,} barrels")
-        print(f"        Avg: {avg_util:.1f}%, Max: {max_util:.1f}%, Min: {min_util:.1f}%")
+    for tank, col in tank_index.items():
+        print(f"   {tank}: Capacity={capacities[col]:,} barrels")
+        print(f"        Avg: {avg_utils[col]:.1f}%, Max: {max_utils[col]:.1f}%, Min: {min_utils[col]:.1f}%")
 
 def generate_recommendations(comparison):
     """Generate recommendations based on comparison results"""
@@ -229,11 +254,15 @@ def main():
     print("Single Tank vs 5-Tank Approach")
     print("=" * 60)
     
-    # Run single tank optimization
-    single_tank_exec = run_optimization('margin_optimization.py', 'Single Tank Optimization')
-    
-    # Run 5-tank optimization
-    five_tank_exec = run_optimization('margin_optimization_5tanks.py', '5-Tank Optimization')
+    # Run both optimizations concurrently; they are independent processes
+    # writing to separate result files
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        single_tank_future = executor.submit(
+            run_optimization, 'margin_optimization.py', 'Single Tank Optimization')
+        five_tank_future = executor.submit(
+            run_optimization, 'margin_optimization_5tanks.py', '5-Tank Optimization')
+        single_tank_exec = single_tank_future.result()
+        five_tank_exec = five_tank_future.result()
     
     # Load results
     single_tank_results = load_results('margin_optimization_results.json')
@@ -0,0 +1,67 @@
+"""
+OASIS Response Compression
+Compresses large JSON responses on the fly for clients that accept it.
+
+Schedule and vessel payloads are highly repetitive numeric JSON, so even a
+low compression level shrinks them several times over. Brotli is used when
+installed and requested, gzip (stdlib) otherwise.
+
+Copyright (c) by Abu Huzaifah Bidin with help from Github Copilot
+"""
+
+import gzip
+
+from flask import Flask, Response, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESS_MIMETYPES = ('application/json',)
+COMPRESS_LEVEL = 4
+COMPRESS_MIN_SIZE = 4096
+
+
+def _accepted_encodings() -> set:
+    header = request.headers.get('Accept-Encoding', '')
+    return {part.split(';')[0].strip().lower() for part in header.split(',') if part.strip()}
+
+
+def compress_response(response: Response) -> Response:
+    """after_request hook: gzip/br-encode eligible JSON bodies."""
+    if (response.direct_passthrough or response.is_streamed
+            or response.status_code < 200 or response.status_code in (204, 304)
+            or response.mimetype not in COMPRESS_MIMETYPES
+            or 'Content-Encoding' in response.headers):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    accepted = _accepted_encodings()
+    if brotli is not None and 'br' in accepted:
+        encoding = 'br'
+    elif 'gzip' in accepted:
+        encoding = 'gzip'
+    else:
+        return response
+
+    payload = response.get_data()
+    if len(payload) < COMPRESS_MIN_SIZE:
+        return response
+
+    if encoding == 'br':
+        response.set_data(brotli.compress(payload, quality=COMPRESS_LEVEL))
+    else:
+        response.set_data(gzip.compress(payload, compresslevel=COMPRESS_LEVEL))
+    response.headers['Content-Encoding'] = encoding
+
+    # A strong validator describes the identity body; weaken it for the encoded one
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_compression(app: Flask) -> None:
+    """Register response compression on a Flask app."""
+    app.after_request(compress_response)
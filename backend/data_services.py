@@ -7,9 +7,15 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime
 from database.extended_ops import DatabaseManagerExtended
 from scheduler.models import Tank, Vessel, Crude, BlendingRecipe, FeedstockParcel
+from loaders import save_daily_plans
 import os
 import json
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 class DataService:
     def __init__(self, db: DatabaseManagerExtended):
         self.db = db
@@ -64,8 +70,8 @@ class DataService:
     def load_schedule(self) -> List[Dict[str, Any]]:
         schedule_path = os.path.join(os.path.dirname(__file__), "../output/schedule_results.json")
         try:
-            with open(schedule_path, 'r') as f:
-                schedule_json = json.load(f)
+            with open(schedule_path, 'rb') as f:
+                schedule_json = orjson.loads(f.read()) if orjson else json.load(f)
                 return schedule_json.get('daily_plans', [])
         except (FileNotFoundError, json.JSONDecodeError):
             return []
@@ -73,9 +79,7 @@ class DataService:
     def save_schedule(self, schedule: List[Dict[str, Any]]) -> bool:
         output_path = os.path.join(os.path.dirname(__file__), "../output/schedule_results.json")
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        schedule_data = {"daily_plans": schedule}
-        with open(output_path, 'w') as f:
-            json.dump(schedule_data, f, indent=2)
+        save_daily_plans(output_path, schedule)
         return True
 
     # Vessel Types
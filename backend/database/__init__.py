@@ -6,11 +6,13 @@ Replaces vulnerable JSON file operations with ACID-compliant database transactio
 Copyright (c) by Abu Huzaifah Bidin with help from Github Copilot
 """
 
-from .db_manager import DatabaseManager
+from .db_manager import DatabaseManager, timestamp_to_iso, with_iso_timestamps
 from .extended_ops import DatabaseManagerExtended
 # from .migration import DatabaseMigration  # Migration doesn't export a class
 
 __all__ = [
     'DatabaseManager',
-    'DatabaseManagerExtended'
+    'DatabaseManagerExtended',
+    'timestamp_to_iso',
+    'with_iso_timestamps'
 ]
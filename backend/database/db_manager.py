@@ -8,417 +8,906 @@ Copyright (c) by Abu Huzaifah Bidin with help from Github Copilot
 
 import sqlite3
 import json
+import logging
+import os
+import re
+import queue
 import threading
-from typing import Dict, List, Any, Optional, Union
+import atexit
+from typing import Dict, List, Any, Optional, Union, Iterable, Iterator, Tuple
 from contextlib import contextmanager
-from datetime import datetime
+from functools import lru_cache
+from itertools import combinations
+from datetime import datetime, timezone
 from pathlib import Path
 
 
+# INSERT ... RETURNING needs SQLite 3.35+
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# Static statements are module constants so every call hands sqlite3 the
+# identical SQL text and hits its per-connection prepared-statement cache
+_SQL_SCHEMA_VERSION = "SELECT value FROM meta WHERE key = 'schema_version'"
+_SQL_BUMP_SCHEMA_VERSION = "UPDATE meta SET value = value + 1 WHERE key = 'schema_version'"
+
+_SQL_INSERT_PLANT = "INSERT INTO plants (name, capacity, base_crude_capacity, max_inventory) VALUES (?, ?, ?, ?)"
+_PLANT_COLS = "id, name, capacity, base_crude_capacity, max_inventory"
+_SQL_PLANT_BY_ID = f"SELECT {_PLANT_COLS} FROM plants WHERE id = ?"
+_SQL_PLANT_BY_NAME = f"SELECT {_PLANT_COLS} FROM plants WHERE name = ?"
+_SQL_ALL_PLANTS = f"SELECT {_PLANT_COLS} FROM plants ORDER BY name"
+_SQL_DELETE_PLANT = "DELETE FROM plants WHERE id = ?"
+
+_SQL_INSERT_CRUDE = "INSERT INTO crudes (name, margin, origin) VALUES (?, ?, ?)"
+_CRUDE_COLS = "id, name, margin, origin"
+_SQL_CRUDE_BY_ID = f"SELECT {_CRUDE_COLS} FROM crudes WHERE id = ?"
+_SQL_CRUDE_BY_NAME = f"SELECT {_CRUDE_COLS} FROM crudes WHERE name = ?"
+_SQL_ALL_CRUDES = f"SELECT {_CRUDE_COLS} FROM crudes ORDER BY name"
+_SQL_DELETE_CRUDE = "DELETE FROM crudes WHERE id = ?"
+_SQL_CRUDE_IDS = "SELECT name, id FROM crudes"
+_SQL_UPSERT_CRUDE = """
+    INSERT INTO crudes (name, margin, origin) VALUES (?, ?, ?)
+    ON CONFLICT(name) DO UPDATE SET
+        margin = excluded.margin,
+        origin = excluded.origin,
+        updated_at = strftime('%s', 'now')
+"""
+
+
+# Version of the DDL in _init_database, stored in PRAGMA user_version; bump it
+# whenever the schema script changes so existing databases pick the change up
+SCHEMA_USER_VERSION = 4
+
+# Link tables keyed by their natural composite key: stored as a single
+# WITHOUT ROWID B-tree instead of a rowid table plus a UNIQUE index. tank_contents
+# keeps its rowid, its id preserves the order of a tank's content entries.
+_WITHOUT_ROWID_TABLES = ('vessel_daily_locations', 'daily_plan_processing', 'daily_inventory')
+
+# Schema script, one statement per entry so _init_database can run it inside a
+# single transaction (executescript would COMMIT first and run outside one).
+# created_at/updated_at hold unix epoch seconds: strftime('%s') returns text,
+# which the INTEGER column affinity stores as an integer.
+_SCHEMA_DDL = (
+    # Plants table
+    """CREATE TABLE IF NOT EXISTS plants (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE NOT NULL,
+        capacity REAL NOT NULL,
+        base_crude_capacity REAL NOT NULL,
+        max_inventory REAL NOT NULL,
+        created_at INTEGER DEFAULT (strftime('%s', 'now')),
+        updated_at INTEGER DEFAULT (strftime('%s', 'now'))
+    )""",
+
+    # Crudes table
+    """CREATE TABLE IF NOT EXISTS crudes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE NOT NULL,
+        margin REAL NOT NULL,
+        origin TEXT NOT NULL,
+        created_at INTEGER DEFAULT (strftime('%s', 'now')),
+        updated_at INTEGER DEFAULT (strftime('%s', 'now'))
+    )""",
+
+    # Tanks table
+    """CREATE TABLE IF NOT EXISTS tanks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE NOT NULL,
+        capacity REAL NOT NULL,
+        plant_id INTEGER,
+        created_at INTEGER DEFAULT (strftime('%s', 'now')),
+        updated_at INTEGER DEFAULT (strftime('%s', 'now')),
+        FOREIGN KEY (plant_id) REFERENCES plants(id)
+    )""",
+
+    # Tank contents table (normalized storage)
+    """CREATE TABLE IF NOT EXISTS tank_contents (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        tank_id INTEGER NOT NULL,
+        crude_id INTEGER NOT NULL,
+        volume REAL NOT NULL DEFAULT 0,
+        created_at INTEGER DEFAULT (strftime('%s', 'now')),
+        updated_at INTEGER DEFAULT (strftime('%s', 'now')),
+        FOREIGN KEY (tank_id) REFERENCES tanks(id) ON DELETE CASCADE,
+        FOREIGN KEY (crude_id) REFERENCES crudes(id),
+        UNIQUE(tank_id, crude_id)
+    )""",
+
+    # Routes table
+    """CREATE TABLE IF NOT EXISTS routes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        origin TEXT NOT NULL,
+        destination TEXT NOT NULL,
+        time_travel REAL NOT NULL,
+        cost REAL DEFAULT 10000.0,
+        created_at INTEGER DEFAULT (strftime('%s', 'now')),
+        updated_at INTEGER DEFAULT (strftime('%s', 'now')),
+        UNIQUE(origin, destination)
+    )""",
+
+    # Blending recipes table
+    """CREATE TABLE IF NOT EXISTS blending_recipes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE NOT NULL,
+        primary_grade_id INTEGER NOT NULL,
+        secondary_grade_id INTEGER,
+        max_rate REAL NOT NULL,
+        primary_fraction REAL NOT NULL,
+        created_at INTEGER DEFAULT (strftime('%s', 'now')),
+        updated_at INTEGER DEFAULT (strftime('%s', 'now')),
+        FOREIGN KEY (primary_grade_id) REFERENCES crudes(id),
+        FOREIGN KEY (secondary_grade_id) REFERENCES crudes(id)
+    )""",
+
+    # Vessels table
+    """CREATE TABLE IF NOT EXISTS vessels (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        vessel_id TEXT UNIQUE NOT NULL,
+        arrival_day INTEGER NOT NULL,
+        capacity REAL NOT NULL,
+        cost REAL NOT NULL,
+        days_held INTEGER DEFAULT 0,
+        created_at INTEGER DEFAULT (strftime('%s', 'now')),
+        updated_at INTEGER DEFAULT (strftime('%s', 'now'))
+    )""",
+
+    # Vessel cargo table (many-to-many with crudes)
+    """CREATE TABLE IF NOT EXISTS vessel_cargo (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        vessel_id INTEGER NOT NULL,
+        crude_id INTEGER NOT NULL,
+        volume REAL NOT NULL,
+        origin TEXT NOT NULL,
+        loading_start_day INTEGER DEFAULT 0,
+        loading_end_day INTEGER DEFAULT 0,
+        created_at INTEGER DEFAULT (strftime('%s', 'now')),
+        FOREIGN KEY (vessel_id) REFERENCES vessels(id) ON DELETE CASCADE,
+        FOREIGN KEY (crude_id) REFERENCES crudes(id)
+    )""",
+
+    # Vessel routes table (normalized route segments)
+    """CREATE TABLE IF NOT EXISTS vessel_routes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        vessel_id INTEGER NOT NULL,
+        route_id INTEGER NOT NULL,
+        day_start_travel INTEGER,
+        day_end_travel INTEGER,
+        day_start_wait INTEGER,
+        day_end_wait INTEGER,
+        action TEXT,
+        segment_order INTEGER NOT NULL,
+        created_at INTEGER DEFAULT (strftime('%s', 'now')),
+        FOREIGN KEY (vessel_id) REFERENCES vessels(id) ON DELETE CASCADE,
+        FOREIGN KEY (route_id) REFERENCES routes(id)
+    )""",
+
+    # Daily vessel locations (tracking table)
+    """CREATE TABLE IF NOT EXISTS vessel_daily_locations (
+        vessel_id INTEGER NOT NULL,
+        day INTEGER NOT NULL,
+        location TEXT NOT NULL,
+        created_at INTEGER DEFAULT (strftime('%s', 'now')),
+        FOREIGN KEY (vessel_id) REFERENCES vessels(id) ON DELETE CASCADE,
+        PRIMARY KEY (vessel_id, day)
+    ) WITHOUT ROWID""",
+
+    # Feedstock requirements table
+    """CREATE TABLE IF NOT EXISTS feedstock_requirements (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        crude_id INTEGER NOT NULL,
+        volume REAL NOT NULL,
+        origin TEXT NOT NULL,
+        allowed_ldr_start INTEGER NOT NULL,
+        allowed_ldr_end INTEGER NOT NULL,
+        required_arrival_by INTEGER NOT NULL,
+        created_at INTEGER DEFAULT (strftime('%s', 'now')),
+        updated_at INTEGER DEFAULT (strftime('%s', 'now')),
+        FOREIGN KEY (crude_id) REFERENCES crudes(id)
+    )""",
+
+    # Daily plans table
+    """CREATE TABLE IF NOT EXISTS daily_plans (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        day INTEGER UNIQUE NOT NULL,
+        total_processing_rate REAL DEFAULT 0,
+        inventory REAL DEFAULT 0,
+        daily_margin REAL DEFAULT 0,
+        created_at INTEGER DEFAULT (strftime('%s', 'now')),
+        updated_at INTEGER DEFAULT (strftime('%s', 'now'))
+    )""",
+
+    # Daily plan processing rates (many-to-many with recipes)
+    """CREATE TABLE IF NOT EXISTS daily_plan_processing (
+        daily_plan_id INTEGER NOT NULL,
+        recipe_id INTEGER NOT NULL,
+        processing_rate REAL NOT NULL,
+        FOREIGN KEY (daily_plan_id) REFERENCES daily_plans(id) ON DELETE CASCADE,
+        FOREIGN KEY (recipe_id) REFERENCES blending_recipes(id),
+        PRIMARY KEY (daily_plan_id, recipe_id)
+    ) WITHOUT ROWID""",
+
+    # Daily inventory by grade
+    """CREATE TABLE IF NOT EXISTS daily_inventory (
+        daily_plan_id INTEGER NOT NULL,
+        crude_id INTEGER NOT NULL,
+        volume REAL NOT NULL,
+        FOREIGN KEY (daily_plan_id) REFERENCES daily_plans(id) ON DELETE CASCADE,
+        FOREIGN KEY (crude_id) REFERENCES crudes(id),
+        PRIMARY KEY (daily_plan_id, crude_id)
+    ) WITHOUT ROWID""",
+
+    # Vessel types table
+    """CREATE TABLE IF NOT EXISTS vessel_types (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        capacity REAL NOT NULL,
+        cost REAL NOT NULL,
+        created_at INTEGER DEFAULT (strftime('%s', 'now')),
+        updated_at INTEGER DEFAULT (strftime('%s', 'now'))
+    )""",
+
+    # Metadata table (schema_version is bumped by every write transaction)
+    """CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    )""",
+    "INSERT OR IGNORE INTO meta (key, value) VALUES ('schema_version', 0)",
+
+    # Create indexes for performance
+    "CREATE INDEX IF NOT EXISTS idx_tank_contents_crude_id ON tank_contents(crude_id)",
+    "CREATE INDEX IF NOT EXISTS idx_vessel_cargo_vessel_id ON vessel_cargo(vessel_id)",
+    "CREATE INDEX IF NOT EXISTS idx_vessel_routes_vessel_segment ON vessel_routes(vessel_id, segment_order)",
+
+    # Covering indexes for per-crude / per-recipe aggregates across days and
+    # vessels: the value column sits in the index, so no table lookups
+    "CREATE INDEX IF NOT EXISTS idx_daily_inventory_crude_cover ON daily_inventory(crude_id, daily_plan_id, volume)",
+    "CREATE INDEX IF NOT EXISTS idx_daily_plan_processing_recipe_cover "
+    "ON daily_plan_processing(recipe_id, daily_plan_id, processing_rate)",
+    "CREATE INDEX IF NOT EXISTS idx_vessel_cargo_crude_cover ON vessel_cargo(crude_id, vessel_id, volume)",
+
+    # Indexes duplicating a UNIQUE constraint, primary key or a wider index's
+    # prefix: they only cost an extra B-tree write per INSERT
+    "DROP INDEX IF EXISTS idx_tank_contents_tank_id",
+    "DROP INDEX IF EXISTS idx_vessel_cargo_crude_id",
+    "DROP INDEX IF EXISTS idx_vessel_routes_vessel_id",
+    "DROP INDEX IF EXISTS idx_vessel_daily_locations_vessel_day",
+    "DROP INDEX IF EXISTS idx_daily_plans_day",
+    "DROP INDEX IF EXISTS idx_daily_plan_processing_plan_id",
+    "DROP INDEX IF EXISTS idx_daily_inventory_plan_id",
+
+    # updated_at is set by the UPDATE statements themselves; drop the
+    # AFTER UPDATE triggers older databases carry, they rewrote every row twice
+    "DROP TRIGGER IF EXISTS update_plants_timestamp",
+    "DROP TRIGGER IF EXISTS update_crudes_timestamp",
+    "DROP TRIGGER IF EXISTS update_tanks_timestamp",
+    "DROP TRIGGER IF EXISTS update_tank_contents_timestamp",
+    "DROP TRIGGER IF EXISTS update_blending_recipes_timestamp",
+    "DROP TRIGGER IF EXISTS update_vessels_timestamp",
+    "DROP TRIGGER IF EXISTS update_feedstock_requirements_timestamp",
+    "DROP TRIGGER IF EXISTS update_daily_plans_timestamp",
+)
+
+
+def _update_templates(table: str, fields: Tuple[str, ...], key_column: str = 'id') -> Dict[Tuple[str, ...], str]:
+    """UPDATE statements for every non-empty subset of fields, keyed by the subset in field order."""
+    return {
+        combo: f"UPDATE {table} SET {', '.join(f'{key} = ?' for key in combo)}, "
+               f"updated_at = strftime('%s', 'now') WHERE {key_column} = ?"
+        for size in range(1, len(fields) + 1)
+        for combo in combinations(fields, size)
+    }
+
+
+_PLANT_FIELDS = ('name', 'capacity', 'base_crude_capacity', 'max_inventory')
+_CRUDE_FIELDS = ('name', 'margin', 'origin')
+_SQL_UPDATE_PLANT = _update_templates('plants', _PLANT_FIELDS)
+_SQL_UPDATE_CRUDE = _update_templates('crudes', _CRUDE_FIELDS)
+
+
+@lru_cache(maxsize=512)
+def _cached_reference_row(db: "DatabaseManager", query: str, param: Any,
+                          schema_version: int) -> Optional[Dict[str, Any]]:
+    # schema_version is part of the key only: every committed write, from any
+    # process, bumps it and so retires the entries cached under the old value
+    with db._read_conn() as conn:
+        row = conn.execute(query, (param,)).fetchone()
+    return dict(row) if row else None
+
+
+@lru_cache(maxsize=8)
+def _cached_id_map(db: "DatabaseManager", query: str, schema_version: int) -> Dict[Any, int]:
+    # Keyed on schema_version like _cached_reference_row; query selects (key, id) pairs
+    with db._read_conn() as conn:
+        return dict(conn.execute(query).fetchall())
+
+
+def _insert_returning_id(conn: sqlite3.Connection, sql: str, params: Tuple) -> int:
+    """Run a single-row INSERT and return the new id, via RETURNING where SQLite supports it."""
+    if _HAS_RETURNING:
+        return conn.execute(f"{sql} RETURNING id", params).fetchall()[0][0]
+    return conn.execute(sql, params).lastrowid
+
+
+def _iter_dicts(cursor: sqlite3.Cursor) -> Iterator[Dict[str, Any]]:
+    """Yield a cursor's rows as dicts as SQLite steps them, reading the column names once."""
+    columns = [description[0] for description in cursor.description]
+    for row in cursor:
+        yield dict(zip(columns, row))
+
+
+def _rows_to_dicts(cursor: sqlite3.Cursor) -> List[Dict[str, Any]]:
+    """Materialize a cursor as dicts, reading the column names once per query."""
+    return list(_iter_dicts(cursor))
+
+
+def timestamp_to_iso(value: Optional[int]) -> Optional[str]:
+    """Format a created_at/updated_at epoch value as the 'YYYY-MM-DD HH:MM:SS' UTC text CURRENT_TIMESTAMP gave."""
+    if value is None:
+        return None
+    return datetime.fromtimestamp(value, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def with_iso_timestamps(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copy of a record with its created_at/updated_at passed through timestamp_to_iso.
+    
+    API payloads use this to keep returning the text timestamps they always have;
+    the record itself is left untouched, since it may be shared from a cache.
+    """
+    if 'created_at' not in record and 'updated_at' not in record:
+        return record
+    record = dict(record)
+    for field in ('created_at', 'updated_at'):
+        if field in record:
+            record[field] = timestamp_to_iso(record[field])
+    return record
+
+
+def _copy_expressions(columns: Iterable[str]) -> str:
+    """SELECT list copying columns as-is, converting legacy TEXT timestamps to epoch seconds."""
+    return ", ".join(
+        f"CASE WHEN typeof({column}) = 'text' THEN CAST(strftime('%s', {column}) AS INTEGER) "
+        f"ELSE {column} END"
+        if column in ('created_at', 'updated_at') else column
+        for column in columns
+    )
+
+
+class _OasisConnection(sqlite3.Connection):
+    """Connection returning sqlite3.Row results, set up once at construction."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.row_factory = sqlite3.Row
+
+
+# Pragmas applied to every new connection in one executescript call
+_SHARED_PRAGMAS = """
+    PRAGMA temp_store = MEMORY;
+    PRAGMA mmap_size = 268435456;
+    -- 64 MiB page cache; wait up to 5s for a competing writer instead of failing
+    PRAGMA cache_size = -65536;
+    PRAGMA busy_timeout = 5000;
+"""
+# WAL lets readers proceed during writes; NORMAL sync is durable under WAL
+_MEMORY_WRITER_PRAGMAS = """
+    PRAGMA foreign_keys = ON;
+    PRAGMA synchronous = NORMAL;
+""" + _SHARED_PRAGMAS
+# Checkpoint the WAL back into the database every 1000 pages (~4 MiB) so
+# the log, and the reads that have to search it, stay small
+_WRITER_PRAGMAS = """
+    PRAGMA journal_mode = WAL;
+    PRAGMA wal_autocheckpoint = 1000;
+""" + _MEMORY_WRITER_PRAGMAS
+# query_only is a runtime guard on top of the mode=ro URI
+_READER_PRAGMAS = "PRAGMA query_only = ON;" + _SHARED_PRAGMAS
+# How long a read waits for a pooled connection once all of them are borrowed,
+# matching busy_timeout
+_READER_WAIT_SECONDS = 5.0
+
+
 class DatabaseManager:
     """
     Main database manager for OASIS system.
     Provides thread-safe ACID transactions for all data operations.
     """
     
-    def __init__(self, db_path: str = "oasis.db"):
+    def __init__(self, db_path: str = "oasis.db", max_readers: Optional[int] = None):
         """
         Initialize database manager.
         
         Args:
             db_path: Path to SQLite database file
+            max_readers: Size of the read-only connection pool (defaults to the CPU count)
         """
         self.db_path = db_path
         self._local = threading.local()
+        # One read-write connection shared by all threads, serialized by the lock;
+        # reads go through a bounded pool so WAL can serve them concurrently
+        self._writer_conn: Optional[sqlite3.Connection] = None
+        self._writer_lock = threading.RLock()
+        self._max_readers = max_readers or os.cpu_count() or 4
+        self._reader_pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._readers_opened = 0
+        self._pool_lock = threading.Lock()
         self._init_database()
+        atexit.register(self.close)
+    
+    def _open_connection(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open a connection with the OASIS pragma set."""
+        # Readers open the file read-only, so SQLite skips the write-side setup;
+        # the writer has already put the file in WAL mode by the time they connect
+        read_only = read_only and self.db_path != ':memory:'
+        if read_only:
+            database, uri, pragmas = f"{Path(self.db_path).resolve().as_uri()}?mode=ro", True, _READER_PRAGMAS
+        else:
+            database, uri = self.db_path, False
+            pragmas = _WRITER_PRAGMAS if self.db_path != ':memory:' else _MEMORY_WRITER_PRAGMAS
+        conn = sqlite3.connect(
+            database,
+            uri=uri,
+            check_same_thread=False,
+            isolation_level=None,  # Autocommit mode
+            # sqlite3 reuses prepared statements for identical SQL text; size the
+            # cache for the number of distinct statements across the managers
+            cached_statements=256,
+            factory=_OasisConnection
+        )
+        conn.executescript(pragmas)
+        return conn
     
     def _get_connection(self) -> sqlite3.Connection:
-        """Get thread-local database connection."""
-        if not hasattr(self._local, 'connection'):
-            self._local.connection = sqlite3.connect(
-                self.db_path,
-                check_same_thread=False,
-                isolation_level=None  # Autocommit mode
-            )
-            self._local.connection.row_factory = sqlite3.Row
-            # Enable foreign keys
-            self._local.connection.execute("PRAGMA foreign_keys = ON")
-        return self._local.connection
+        """
+        Get the shared read-write connection.
+        
+        Writes belong inside transaction(), which holds the writer lock; read-only
+        methods should use _read_conn() instead.
+        """
+        if self._writer_conn is None:
+            with self._writer_lock:
+                if self._writer_conn is None:
+                    self._writer_conn = self._open_connection()
+        return self._writer_conn
     
     @contextmanager
-    def transaction(self):
-        """Context manager for database transactions."""
-        conn = self._get_connection()
+    def _read_conn(self):
+        """
+        Borrow a read-only connection from the pool for the duration of the block.
+        
+        Nested reads on the same thread reuse the borrowed connection, and reads
+        inside transaction() use the writer so they see its uncommitted changes.
+        A :memory: database exists only on the writer, so its reads take the
+        writer under the lock. Raises sqlite3.OperationalError if no pooled
+        connection frees up within _READER_WAIT_SECONDS.
+        """
+        if getattr(self._local, 'depth', 0):
+            yield self._get_connection()
+            return
+        if self.db_path == ':memory:':
+            with self._writer_lock:
+                yield self._get_connection()
+            return
+        conn = getattr(self._local, 'reader', None)
+        if conn is not None:
+            yield conn
+            return
+        
+        try:
+            conn = self._reader_pool.get_nowait()
+        except queue.Empty:
+            with self._pool_lock:
+                can_open = self._readers_opened < self._max_readers
+                if can_open:
+                    self._readers_opened += 1
+            if can_open:
+                conn = self._open_connection(read_only=True)
+            else:
+                try:
+                    conn = self._reader_pool.get(timeout=_READER_WAIT_SECONDS)
+                except queue.Empty:
+                    raise sqlite3.OperationalError(
+                        f"No read connection became free within {_READER_WAIT_SECONDS}s"
+                    ) from None
+        
+        self._local.reader = conn
         try:
-            conn.execute("BEGIN")
             yield conn
-            conn.execute("COMMIT")
-        except Exception:
-            conn.execute("ROLLBACK")
-            raise
+        finally:
+            del self._local.reader
+            self._reader_pool.put(conn)
     
-    def _init_database(self):
-        """Initialize database schema."""
-        conn = self._get_connection()
-        
-        # Create tables with proper relationships
-        conn.executescript("""
-        -- Plants table
-        CREATE TABLE IF NOT EXISTS plants (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT UNIQUE NOT NULL,
-            capacity REAL NOT NULL,
-            base_crude_capacity REAL NOT NULL,
-            max_inventory REAL NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-        
-        -- Crudes table
-        CREATE TABLE IF NOT EXISTS crudes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT UNIQUE NOT NULL,
-            margin REAL NOT NULL,
-            origin TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-        
-        -- Tanks table
-        CREATE TABLE IF NOT EXISTS tanks (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT UNIQUE NOT NULL,
-            capacity REAL NOT NULL,
-            plant_id INTEGER,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (plant_id) REFERENCES plants(id)
-        );
-        
-        -- Tank contents table (normalized storage)
-        CREATE TABLE IF NOT EXISTS tank_contents (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            tank_id INTEGER NOT NULL,
-            crude_id INTEGER NOT NULL,
-            volume REAL NOT NULL DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (tank_id) REFERENCES tanks(id) ON DELETE CASCADE,
-            FOREIGN KEY (crude_id) REFERENCES crudes(id),
-            UNIQUE(tank_id, crude_id)
-        );
-        
-        -- Routes table
-        CREATE TABLE IF NOT EXISTS routes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            origin TEXT NOT NULL,
-            destination TEXT NOT NULL,
-            time_travel REAL NOT NULL,
-            cost REAL DEFAULT 10000.0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(origin, destination)
-        );
-        
-        -- Blending recipes table
-        CREATE TABLE IF NOT EXISTS blending_recipes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT UNIQUE NOT NULL,
-            primary_grade_id INTEGER NOT NULL,
-            secondary_grade_id INTEGER,
-            max_rate REAL NOT NULL,
-            primary_fraction REAL NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (primary_grade_id) REFERENCES crudes(id),
-            FOREIGN KEY (secondary_grade_id) REFERENCES crudes(id)
-        );
-        
-        -- Vessels table
-        CREATE TABLE IF NOT EXISTS vessels (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            vessel_id TEXT UNIQUE NOT NULL,
-            arrival_day INTEGER NOT NULL,
-            capacity REAL NOT NULL,
-            cost REAL NOT NULL,
-            days_held INTEGER DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-        
-        -- Vessel cargo table (many-to-many with crudes)
-        CREATE TABLE IF NOT EXISTS vessel_cargo (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            vessel_id INTEGER NOT NULL,
-            crude_id INTEGER NOT NULL,
-            volume REAL NOT NULL,
-            origin TEXT NOT NULL,
-            loading_start_day INTEGER DEFAULT 0,
-            loading_end_day INTEGER DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (vessel_id) REFERENCES vessels(id) ON DELETE CASCADE,
-            FOREIGN KEY (crude_id) REFERENCES crudes(id)
-        );
-        
-        -- Vessel routes table (normalized route segments)
-        CREATE TABLE IF NOT EXISTS vessel_routes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            vessel_id INTEGER NOT NULL,
-            route_id INTEGER NOT NULL,
-            day_start_travel INTEGER,
-            day_end_travel INTEGER,
-            day_start_wait INTEGER,
-            day_end_wait INTEGER,
-            action TEXT,
-            segment_order INTEGER NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (vessel_id) REFERENCES vessels(id) ON DELETE CASCADE,
-            FOREIGN KEY (route_id) REFERENCES routes(id)
-        );
-        
-        -- Daily vessel locations (tracking table)
-        CREATE TABLE IF NOT EXISTS vessel_daily_locations (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            vessel_id INTEGER NOT NULL,
-            day INTEGER NOT NULL,
-            location TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (vessel_id) REFERENCES vessels(id) ON DELETE CASCADE,
-            UNIQUE(vessel_id, day)
-        );
-        
-        -- Feedstock requirements table
-        CREATE TABLE IF NOT EXISTS feedstock_requirements (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            crude_id INTEGER NOT NULL,
-            volume REAL NOT NULL,
-            origin TEXT NOT NULL,
-            allowed_ldr_start INTEGER NOT NULL,
-            allowed_ldr_end INTEGER NOT NULL,
-            required_arrival_by INTEGER NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (crude_id) REFERENCES crudes(id)
-        );
-        
-        -- Daily plans table
-        CREATE TABLE IF NOT EXISTS daily_plans (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            day INTEGER UNIQUE NOT NULL,
-            total_processing_rate REAL DEFAULT 0,
-            inventory REAL DEFAULT 0,
-            daily_margin REAL DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-        
-        -- Daily plan processing rates (many-to-many with recipes)
-        CREATE TABLE IF NOT EXISTS daily_plan_processing (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            daily_plan_id INTEGER NOT NULL,
-            recipe_id INTEGER NOT NULL,
-            processing_rate REAL NOT NULL,
-            FOREIGN KEY (daily_plan_id) REFERENCES daily_plans(id) ON DELETE CASCADE,
-            FOREIGN KEY (recipe_id) REFERENCES blending_recipes(id),
-            UNIQUE(daily_plan_id, recipe_id)
-        );
-        
-        -- Daily inventory by grade
-        CREATE TABLE IF NOT EXISTS daily_inventory (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            daily_plan_id INTEGER NOT NULL,
-            crude_id INTEGER NOT NULL,
-            volume REAL NOT NULL,
-            FOREIGN KEY (daily_plan_id) REFERENCES daily_plans(id) ON DELETE CASCADE,
-            FOREIGN KEY (crude_id) REFERENCES crudes(id),
-            UNIQUE(daily_plan_id, crude_id)
-        );
-        
-        -- Vessel types table
-        CREATE TABLE IF NOT EXISTS vessel_types (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            capacity REAL NOT NULL,
-            cost REAL NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-        
-        -- Create indexes for performance
-        CREATE INDEX IF NOT EXISTS idx_tank_contents_tank_id ON tank_contents(tank_id);
-        CREATE INDEX IF NOT EXISTS idx_tank_contents_crude_id ON tank_contents(crude_id);
-        CREATE INDEX IF NOT EXISTS idx_vessel_cargo_vessel_id ON vessel_cargo(vessel_id);
-        CREATE INDEX IF NOT EXISTS idx_vessel_cargo_crude_id ON vessel_cargo(crude_id);
-        CREATE INDEX IF NOT EXISTS idx_vessel_routes_vessel_id ON vessel_routes(vessel_id);
-        CREATE INDEX IF NOT EXISTS idx_vessel_daily_locations_vessel_day ON vessel_daily_locations(vessel_id, day);
-        CREATE INDEX IF NOT EXISTS idx_daily_plans_day ON daily_plans(day);
-        CREATE INDEX IF NOT EXISTS idx_daily_plan_processing_plan_id ON daily_plan_processing(daily_plan_id);
-        CREATE INDEX IF NOT EXISTS idx_daily_inventory_plan_id ON daily_inventory(daily_plan_id);
-        
-        -- Create triggers for updated_at timestamps
-        CREATE TRIGGER IF NOT EXISTS update_plants_timestamp 
-        AFTER UPDATE ON plants FOR EACH ROW
-        BEGIN
-            UPDATE plants SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
-        END;
-        
-        CREATE TRIGGER IF NOT EXISTS update_crudes_timestamp 
-        AFTER UPDATE ON crudes FOR EACH ROW
-        BEGIN
-            UPDATE crudes SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
-        END;
+    @contextmanager
+    def _read_snapshot(self):
+        """Run several reads against one consistent snapshot of the database."""
+        with self._read_conn() as conn:
+            # The writer (a :memory: database's only connection) is already
+            # consistent for as long as _read_conn holds its lock
+            if conn.in_transaction or conn is self._writer_conn:
+                yield conn
+                return
+            conn.execute("BEGIN")
+            try:
+                yield conn
+            finally:
+                conn.execute("COMMIT")
+    
+    def close(self):
+        """
+        Close every pooled reader, then checkpoint and close the writer.
         
-        CREATE TRIGGER IF NOT EXISTS update_tanks_timestamp 
-        AFTER UPDATE ON tanks FOR EACH ROW
-        BEGIN
-            UPDATE tanks SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
-        END;
+        Readers go first so none pins the WAL; the writer then truncates the
+        -wal file and lets PRAGMA optimize refresh stale planner statistics.
+        """
+        with self._pool_lock:
+            while True:
+                try:
+                    self._reader_pool.get_nowait().close()
+                except queue.Empty:
+                    break
+                self._readers_opened -= 1
+        with self._writer_lock:
+            if self._writer_conn is not None:
+                try:
+                    self._writer_conn.executescript(
+                        "PRAGMA wal_checkpoint(TRUNCATE); PRAGMA optimize;"
+                    )
+                except sqlite3.Error as e:
+                    logging.getLogger("oasis.data").warning(f"Could not checkpoint {self.db_path} on close: {e}")
+                self._writer_conn.close()
+                self._writer_conn = None
+    
+    def backup(self, backup_path: str) -> None:
+        """Write a consistent copy of the database (including WAL content) to backup_path."""
+        target = sqlite3.connect(backup_path)
+        try:
+            # A :memory: database is read through the writer (see _read_conn)
+            with self._read_conn() as conn:
+                conn.backup(target)
+        finally:
+            target.close()
+    
+    def analyze(self) -> None:
+        """Refresh planner statistics so SQLite picks the foreign-key indexes after bulk loads."""
+        with self._writer_lock:
+            self._get_connection().execute("ANALYZE")
+    
+    @contextmanager
+    def transaction(self, mode: str = "DEFERRED"):
+        """
+        Context manager for database transactions on the shared writer connection.
         
-        CREATE TRIGGER IF NOT EXISTS update_tank_contents_timestamp 
-        AFTER UPDATE ON tank_contents FOR EACH ROW
-        BEGIN
-            UPDATE tank_contents SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
-        END;
+        A transaction() opened inside another on the same thread becomes a
+        SAVEPOINT, so composite operations can call the single-item methods and
+        still commit once; an exception rolls back only the inner block. Any
+        BaseException (a gevent Timeout, KeyboardInterrupt, GeneratorExit) rolls
+        back too, so the shared writer never stays inside an open transaction.
         
-        CREATE TRIGGER IF NOT EXISTS update_blending_recipes_timestamp 
-        AFTER UPDATE ON blending_recipes FOR EACH ROW
-        BEGIN
-            UPDATE blending_recipes SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
-        END;
+        Args:
+            mode: DEFERRED for read-mostly work; IMMEDIATE for writes, which takes
+                the write lock up front (waiting up to busy_timeout) rather than
+                failing on a lock upgrade halfway through. Ignored when nested.
+        """
+        with self._writer_lock:
+            conn = self._get_connection()
+            depth = getattr(self._local, 'depth', 0)
+            self._local.depth = depth + 1
+            try:
+                if depth:
+                    savepoint = f"sp{depth}"
+                    conn.execute(f"SAVEPOINT {savepoint}")
+                    try:
+                        yield conn
+                        conn.execute(f"RELEASE {savepoint}")
+                    except BaseException:
+                        conn.execute(f"ROLLBACK TO {savepoint}")
+                        conn.execute(f"RELEASE {savepoint}")
+                        raise
+                    return
+                
+                conn.execute(f"BEGIN {mode}")
+                changes = conn.total_changes
+                try:
+                    yield conn
+                    if conn.total_changes != changes:
+                        # Bump the data version so HTTP caches keyed on it revalidate
+                        conn.execute(_SQL_BUMP_SCHEMA_VERSION)
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            finally:
+                self._local.depth = depth
+
+    @contextmanager
+    def replace_transaction(self):
+        """
+        IMMEDIATE transaction for full-table replaces, run with foreign-key
+        enforcement off so an unqualified DELETE FROM takes SQLite's truncate
+        path instead of visiting every row.
+
+        Callers must clear child tables themselves and insert only references
+        resolved by join. foreign_keys cannot change inside a transaction, so
+        when nested this is a plain savepoint with enforcement left on.
+        Planner statistics are refreshed afterwards, since a replace can change
+        table sizes by orders of magnitude.
+        """
+        with self._writer_lock:
+            conn = self._get_connection()
+            outermost = not getattr(self._local, 'depth', 0)
+            if outermost:
+                conn.execute("PRAGMA foreign_keys = OFF")
+            try:
+                with self.transaction("IMMEDIATE") as conn:
+                    yield conn
+            finally:
+                if outermost:
+                    conn.execute("PRAGMA foreign_keys = ON")
+            if outermost:
+                conn.execute("PRAGMA optimize")
+
+    def _init_database(self):
+        """Initialize or upgrade the database schema, skipped once PRAGMA user_version is current."""
+        conn = self._get_connection()
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_USER_VERSION:
+            return
+        
+        # One transaction for the whole upgrade: a single commit, and a concurrent
+        # process starting up waits on the write lock then sees the new user_version.
+        # Table rebuilds drop parent tables, which must not cascade to their children
+        # (the pragma is a no-op inside a transaction, so it is set around it)
+        conn.execute("PRAGMA foreign_keys = OFF")
+        try:
+            with self.transaction("IMMEDIATE") as conn:
+                if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_USER_VERSION:
+                    return
+                self._stash_rowid_link_tables(conn)
+                self._rebuild_text_timestamp_tables(conn)
+                
+                # Create tables with proper relationships
+                for statement in _SCHEMA_DDL:
+                    conn.execute(statement)
+                self._restore_rowid_link_tables(conn)
+                conn.execute(f"PRAGMA user_version = {SCHEMA_USER_VERSION}")
+        finally:
+            conn.execute("PRAGMA foreign_keys = ON")
+    
+    def _stash_rowid_link_tables(self, conn: sqlite3.Connection) -> None:
+        """Rename pre-WITHOUT ROWID link tables aside so the schema script recreates them."""
+        for table in _WITHOUT_ROWID_TABLES:
+            row = conn.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+            ).fetchone()
+            legacy_exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (f"{table}_legacy",)
+            ).fetchone()
+            if row is None or 'WITHOUT ROWID' in row['sql'].upper() or legacy_exists:
+                continue
+            # Indexes follow the renamed table; drop them so their names can be reused
+            for index in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+                (table,)
+            ).fetchall():
+                conn.execute(f"DROP INDEX {index['name']}")
+            conn.execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+    
+    def _restore_rowid_link_tables(self, conn: sqlite3.Connection) -> None:
+        """Copy rows from stashed legacy link tables into their WITHOUT ROWID replacements."""
+        for table in _WITHOUT_ROWID_TABLES:
+            legacy = f"{table}_legacy"
+            if not conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (legacy,)
+            ).fetchone():
+                continue
+            new_columns = {row['name'] for row in conn.execute(f"PRAGMA table_info({table})")}
+            columns = [
+                row['name'] for row in conn.execute(f"PRAGMA table_info({legacy})")
+                if row['name'] in new_columns
+            ]
+            conn.execute(
+                f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) "
+                f"SELECT {_copy_expressions(columns)} FROM {legacy}"
+            )
+            conn.execute(f"DROP TABLE {legacy}")
+    
+    def _rebuild_text_timestamp_tables(self, conn: sqlite3.Connection) -> None:
+        """
+        Rebuild tables created with CURRENT_TIMESTAMP defaults to the epoch-second schema.
         
-        CREATE TRIGGER IF NOT EXISTS update_vessels_timestamp 
-        AFTER UPDATE ON vessels FOR EACH ROW
-        BEGIN
-            UPDATE vessels SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
-        END;
+        SQLite cannot alter a column default, so each table is copied into a new one
+        built from _SCHEMA_DDL, dropped and replaced; the schema script then recreates
+        the indexes. Needs foreign_keys OFF.
+        """
+        for statement in _SCHEMA_DDL:
+            match = re.match(r"CREATE TABLE IF NOT EXISTS (\w+) \(", statement)
+            if not match:
+                continue
+            table = match.group(1)
+            row = conn.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+            ).fetchone()
+            if row is None or 'CURRENT_TIMESTAMP' not in row['sql'].upper():
+                continue
+            
+            conn.execute(statement.replace(match.group(0), f"CREATE TABLE {table}_rebuild (", 1))
+            new_columns = {info['name'] for info in conn.execute(f"PRAGMA table_info({table}_rebuild)")}
+            columns = [
+                info['name'] for info in conn.execute(f"PRAGMA table_info({table})")
+                if info['name'] in new_columns
+            ]
+            conn.execute(
+                f"INSERT INTO {table}_rebuild ({', '.join(columns)}) "
+                f"SELECT {_copy_expressions(columns)} FROM {table}"
+            )
+            conn.execute(f"DROP TABLE {table}")
+            conn.execute(f"ALTER TABLE {table}_rebuild RENAME TO {table}")
+    
+    def get_schema_version(self) -> int:
+        """Get the data version counter, incremented on every committed write."""
+        with self._read_conn() as conn:
+            row = conn.execute(_SQL_SCHEMA_VERSION).fetchone()
+        return row['value'] if row else 0
+    
+    def _lookup_reference_row(self, query: str, param: Any) -> Optional[Dict[str, Any]]:
+        """
+        Single-row lookup on a read-mostly reference table, memoized per data version.
         
-        CREATE TRIGGER IF NOT EXISTS update_feedstock_requirements_timestamp 
-        AFTER UPDATE ON feedstock_requirements FOR EACH ROW
-        BEGIN
-            UPDATE feedstock_requirements SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
-        END;
+        Inside transaction() the cache is bypassed so uncommitted changes are visible.
+        """
+        if getattr(self._local, 'depth', 0):
+            row = self._get_connection().execute(query, (param,)).fetchone()
+            return dict(row) if row else None
+        with self._read_snapshot():
+            return _cached_reference_row(self, query, param, self.get_schema_version())
+    
+    def _crude_ids(self) -> Dict[str, int]:
+        """
+        Crude name -> id map, memoized per data version; callers must not mutate it.
         
-        CREATE TRIGGER IF NOT EXISTS update_daily_plans_timestamp 
-        AFTER UPDATE ON daily_plans FOR EACH ROW
-        BEGIN
-            UPDATE daily_plans SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
-        END;
-        """)
+        Inside transaction() it is read from the writer so uncommitted crudes are included.
+        """
+        if getattr(self._local, 'depth', 0):
+            return dict(self._get_connection().execute(_SQL_CRUDE_IDS).fetchall())
+        with self._read_snapshot():
+            return _cached_id_map(self, _SQL_CRUDE_IDS, self.get_schema_version())
     
     # CRUD Operations for Plants
     def create_plant(self, name: str, capacity: float, base_crude_capacity: float, max_inventory: float) -> int:
         """Create a new plant."""
-        with self.transaction() as conn:
-            cursor = conn.execute(
-                "INSERT INTO plants (name, capacity, base_crude_capacity, max_inventory) VALUES (?, ?, ?, ?)",
-                (name, capacity, base_crude_capacity, max_inventory)
+        with self.transaction("IMMEDIATE") as conn:
+            return _insert_returning_id(
+                conn, _SQL_INSERT_PLANT, (name, capacity, base_crude_capacity, max_inventory)
             )
-            return cursor.lastrowid
+    
+    def create_plants_bulk(self, rows: Iterable[Tuple[str, float, float, float]]) -> None:
+        """
+        Insert many plants in one transaction.
+        
+        Pass (name, capacity, base_crude_capacity, max_inventory) tuples (a list or
+        generator) instead of looping create_plant, which commits once per row.
+        """
+        with self.transaction("IMMEDIATE") as conn:
+            conn.executemany(_SQL_INSERT_PLANT, rows)
     
     def get_plant(self, plant_id: int = None, name: str = None) -> Optional[Dict[str, Any]]:
         """Get plant by ID or name."""
-        conn = self._get_connection()
         if plant_id:
-            cursor = conn.execute("SELECT * FROM plants WHERE id = ?", (plant_id,))
+            query, param = _SQL_PLANT_BY_ID, plant_id
         elif name:
-            cursor = conn.execute("SELECT * FROM plants WHERE name = ?", (name,))
+            query, param = _SQL_PLANT_BY_NAME, name
         else:
             raise ValueError("Either plant_id or name must be provided")
         
-        row = cursor.fetchone()
+        row = self._lookup_reference_row(query, param)
         return dict(row) if row else None
     
     def get_all_plants(self) -> List[Dict[str, Any]]:
         """Get all plants."""
-        conn = self._get_connection()
-        cursor = conn.execute("SELECT * FROM plants ORDER BY name")
-        return [dict(row) for row in cursor.fetchall()]
+        with self._read_conn() as conn:
+            return _rows_to_dicts(conn.execute(_SQL_ALL_PLANTS))
+    
+    def iter_plants(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield plants one at a time instead of building the full list.
+        
+        The pooled reader is held until the iterator is exhausted or closed, so
+        consume it promptly and on the thread that started it.
+        """
+        with self._read_conn() as conn:
+            yield from _iter_dicts(conn.execute(_SQL_ALL_PLANTS))
+    
+    def get_all_plants_raw(self) -> List[sqlite3.Row]:
+        """Get all plants as sqlite3.Row objects (index or key access, no dict copies)."""
+        with self._read_conn() as conn:
+            return conn.execute(_SQL_ALL_PLANTS).fetchall()
     
     def update_plant(self, plant_id: int, **kwargs) -> bool:
         """Update plant fields."""
-        if not kwargs:
-            return False
-        
-        fields = []
-        values = []
-        for key, value in kwargs.items():
-            if key in ['name', 'capacity', 'base_crude_capacity', 'max_inventory']:
-                fields.append(f"{key} = ?")
-                values.append(value)
-        
+        fields = tuple(key for key in _PLANT_FIELDS if key in kwargs)
         if not fields:
             return False
         
+        values = [kwargs[key] for key in fields]
         values.append(plant_id)
-        with self.transaction() as conn:
-            cursor = conn.execute(
-                f"UPDATE plants SET {', '.join(fields)} WHERE id = ?",
-                values
-            )
+        with self.transaction("IMMEDIATE") as conn:
+            cursor = conn.execute(_SQL_UPDATE_PLANT[fields], values)
             return cursor.rowcount > 0
     
     def delete_plant(self, plant_id: int) -> bool:
         """Delete a plant."""
-        with self.transaction() as conn:
-            cursor = conn.execute("DELETE FROM plants WHERE id = ?", (plant_id,))
+        with self.transaction("IMMEDIATE") as conn:
+            cursor = conn.execute(_SQL_DELETE_PLANT, (plant_id,))
             return cursor.rowcount > 0
     
     # CRUD Operations for Crudes
     def create_crude(self, name: str, margin: float, origin: str) -> int:
         """Create a new crude."""
-        with self.transaction() as conn:
-            cursor = conn.execute(
-                "INSERT INTO crudes (name, margin, origin) VALUES (?, ?, ?)",
-                (name, margin, origin)
-            )
-            return cursor.lastrowid
+        with self.transaction("IMMEDIATE") as conn:
+            return _insert_returning_id(conn, _SQL_INSERT_CRUDE, (name, margin, origin))
+    
+    def create_crudes_bulk(self, rows: Iterable[Tuple[str, float, str]]) -> None:
+        """
+        Insert many crudes in one transaction.
+        
+        Pass (name, margin, origin) tuples (a list or generator) instead of
+        looping create_crude, which commits once per row.
+        """
+        with self.transaction("IMMEDIATE") as conn:
+            conn.executemany(_SQL_INSERT_CRUDE, rows)
     
     def get_crude(self, crude_id: int = None, name: str = None) -> Optional[Dict[str, Any]]:
         """Get crude by ID or name."""
-        conn = self._get_connection()
         if crude_id:
-            cursor = conn.execute("SELECT * FROM crudes WHERE id = ?", (crude_id,))
+            query, param = _SQL_CRUDE_BY_ID, crude_id
         elif name:
-            cursor = conn.execute("SELECT * FROM crudes WHERE name = ?", (name,))
+            query, param = _SQL_CRUDE_BY_NAME, name
         else:
             raise ValueError("Either crude_id or name must be provided")
         
-        row = cursor.fetchone()
+        row = self._lookup_reference_row(query, param)
         return dict(row) if row else None
     
     def get_all_crudes(self) -> List[Dict[str, Any]]:
         """Get all crudes."""
-        conn = self._get_connection()
-        cursor = conn.execute("SELECT * FROM crudes ORDER BY name")
-        return [dict(row) for row in cursor.fetchall()]
+        with self._read_conn() as conn:
+            return _rows_to_dicts(conn.execute(_SQL_ALL_CRUDES))
+    
+    def iter_crudes(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield crudes one at a time instead of building the full list.
+        
+        The pooled reader is held until the iterator is exhausted or closed, so
+        consume it promptly and on the thread that started it.
+        """
+        with self._read_conn() as conn:
+            yield from _iter_dicts(conn.execute(_SQL_ALL_CRUDES))
+    
+    def get_all_crudes_raw(self) -> List[sqlite3.Row]:
+        """Get all crudes as sqlite3.Row objects (index or key access, no dict copies)."""
+        with self._read_conn() as conn:
+            return conn.execute(_SQL_ALL_CRUDES).fetchall()
     
     def update_crude(self, crude_id: int, **kwargs) -> bool:
         """Update crude fields."""
-        if not kwargs:
-            return False
-        
-        fields = []
-        values = []
-        for key, value in kwargs.items():
-            if key in ['name', 'margin', 'origin']:
-                fields.append(f"{key} = ?")
-                values.append(value)
-        
+        fields = tuple(key for key in _CRUDE_FIELDS if key in kwargs)
         if not fields:
             return False
         
+        values = [kwargs[key] for key in fields]
         values.append(crude_id)
-        with self.transaction() as conn:
-            cursor = conn.execute(
-                f"UPDATE crudes SET {', '.join(fields)} WHERE id = ?",
-                values
-            )
+        with self.transaction("IMMEDIATE") as conn:
+            cursor = conn.execute(_SQL_UPDATE_CRUDE[fields], values)
             return cursor.rowcount > 0
     
+    def save_crude(self, crude: Dict[str, Any]) -> bool:
+        """Upsert a crude by name."""
+        with self.transaction("IMMEDIATE") as conn:
+            conn.execute(_SQL_UPSERT_CRUDE, (crude['name'], crude['margin'], crude['origin']))
+        return True
+    
     def delete_crude(self, crude_id: int) -> bool:
         """Delete a crude."""
-        with self.transaction() as conn:
-            cursor = conn.execute("DELETE FROM crudes WHERE id = ?", (crude_id,))
+        with self.transaction("IMMEDIATE") as conn:
+            cursor = conn.execute(_SQL_DELETE_CRUDE, (crude_id,))
             return cursor.rowcount > 0
     
     # Continue with other CRUD operations...
@@ -5,12 +5,81 @@ Continuation of database operations for tanks, vessels, recipes, etc.
 Copyright (c) by Abu Huzaifah Bidin with help from Github Copilot
 """
 
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, NamedTuple
+import json
 import logging
 try:
-    from .db_manager import DatabaseManager
+    from .db_manager import DatabaseManager, _insert_returning_id, _rows_to_dicts, _update_templates
 except ImportError:
-    from db_manager import DatabaseManager
+    from db_manager import DatabaseManager, _insert_returning_id, _rows_to_dicts, _update_templates
+
+# orjson parses several times faster when installed; its JSONDecodeError
+# subclasses json.JSONDecodeError, so error handling is the same either way
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+# JSON1 renders REAL values with 15 significant digits; wrap a REAL column in this
+# so json_object() emits the full round-trip text instead
+_JSON_REAL = "json(printf('%!.17g', {}))"
+
+# Get-or-create inserts for names referenced by saved data, taking (name, origin)
+# and (origin, destination, time_travel). NOT EXISTS instead of INSERT OR IGNORE:
+# an ignored insert still consumes an AUTOINCREMENT id
+_SQL_CREATE_MISSING_CRUDE = """
+    INSERT INTO crudes (name, margin, origin)
+    SELECT ?1, 15.0, ?2 WHERE NOT EXISTS (SELECT 1 FROM crudes WHERE name = ?1)
+"""
+_SQL_CREATE_MISSING_ROUTE = """
+    INSERT INTO routes (origin, destination, time_travel)
+    SELECT ?1, ?2, ?3 WHERE NOT EXISTS (SELECT 1 FROM routes WHERE origin = ?1 AND destination = ?2)
+"""
+
+# update_tank statements for each field subset, matching on id or on name
+_TANK_FIELDS = ('name', 'capacity', 'plant_id')
+_SQL_UPDATE_TANK = {
+    key_column: _update_templates('tanks', _TANK_FIELDS, key_column) for key_column in ('id', 'name')
+}
+
+# Per-entity child lookups for get_tank/get_vessel, keyed on the parent row id
+_SQL_GET_TANK_CONTENTS = """
+    SELECT c.name as crude_name, tc.volume
+    FROM tank_contents tc
+    JOIN crudes c ON tc.crude_id = c.id
+    WHERE tc.tank_id = ?
+    ORDER BY tc.id
+"""
+_SQL_GET_VESSEL_CARGO = """
+    SELECT c.name as grade, vc.volume, vc.origin,
+           vc.loading_start_day, vc.loading_end_day
+    FROM vessel_cargo vc
+    JOIN crudes c ON vc.crude_id = c.id
+    WHERE vc.vessel_id = ?
+    ORDER BY vc.id
+"""
+_SQL_GET_VESSEL_ROUTE = """
+    SELECT r.origin as from_location, r.destination as to_location,
+           vr.day_start_travel, vr.day_end_travel,
+           vr.day_start_wait, vr.day_end_wait,
+           r.time_travel as travel_days, vr.action
+    FROM vessel_routes vr
+    JOIN routes r ON vr.route_id = r.id
+    WHERE vr.vessel_id = ?
+    ORDER BY vr.segment_order
+"""
+
+
+class ConfigSnapshot(NamedTuple):
+    """All configuration tables read in one consistent snapshot."""
+    tanks: Dict[str, Dict[str, Any]]
+    vessels: Dict[str, Dict[str, Any]]
+    crudes: List[Dict[str, Any]]
+    recipes: List[Dict[str, Any]]
+    routes: List[Dict[str, Any]]
+    plants: List[Dict[str, Any]]
+    feedstock_requirements: List[Dict[str, Any]]
+    vessel_types: List[Dict[str, Any]]
 
 
 class DatabaseManagerExtended(DatabaseManager):
@@ -19,231 +88,215 @@ class DatabaseManagerExtended(DatabaseManager):
     # CRUD Operations for Tanks
     def create_tank(self, name: str, capacity: float, plant_id: int = None) -> int:
         """Create a new tank."""
-        with self.transaction() as conn:
-            cursor = conn.execute(
-                "INSERT INTO tanks (name, capacity, plant_id) VALUES (?, ?, ?)",
+        with self.transaction("IMMEDIATE") as conn:
+            return _insert_returning_id(
+                conn, "INSERT INTO tanks (name, capacity, plant_id) VALUES (?, ?, ?)",
                 (name, capacity, plant_id)
             )
-            return cursor.lastrowid
     
     def get_tank(self, tank_id: int = None, name: str = None) -> Optional[Dict[str, Any]]:
         """Get tank by ID or name with contents."""
-        conn = self._get_connection()
-        
         if tank_id:
-            tank_query = "SELECT * FROM tanks WHERE id = ?"
+            tank_query = "SELECT id, name, capacity, plant_id, created_at, updated_at FROM tanks WHERE id = ?"
             param = (tank_id,)
         elif name:
-            tank_query = "SELECT * FROM tanks WHERE name = ?"
+            tank_query = "SELECT id, name, capacity, plant_id, created_at, updated_at FROM tanks WHERE name = ?"
             param = (name,)
         else:
             raise ValueError("Either tank_id or name must be provided")
         
-        cursor = conn.execute(tank_query, param)
-        tank_row = cursor.fetchone()
-        
-        if not tank_row:
-            return None
-        
-        tank = dict(tank_row)
-        
-        # Get tank contents
-        cursor = conn.execute("""
-            SELECT c.name as crude_name, tc.volume 
-            FROM tank_contents tc 
-            JOIN crudes c ON tc.crude_id = c.id 
-            WHERE tc.tank_id = ?
-        """, (tank['id'],))
-        
-        contents = []
-        for content_row in cursor.fetchall():
-            contents.append({content_row['crude_name']: content_row['volume']})
-        
-        tank['content'] = contents
-        return tank
-    
-    def get_all_tanks(self) -> Dict[str, Dict[str, Any]]:
-        """Get all tanks with contents in JSON-compatible format."""
-        conn = self._get_connection()
-        
-        # Get all tanks
-        cursor = conn.execute("SELECT * FROM tanks ORDER BY name")
-        tanks = {}
-        
-        for tank_row in cursor.fetchall():
+        with self._read_snapshot() as conn:
+            cursor = conn.execute(tank_query, param)
+            tank_row = cursor.fetchone()
+            
+            if not tank_row:
+                return None
+            
             tank = dict(tank_row)
-            tank_name = tank['name']
             
-            # Get contents for this tank
-            content_cursor = conn.execute("""
-                SELECT c.name as crude_name, tc.volume 
-                FROM tank_contents tc 
-                JOIN crudes c ON tc.crude_id = c.id 
-                WHERE tc.tank_id = ?
-            """, (tank['id'],))
+            # Get tank contents
+            cursor = conn.execute(_SQL_GET_TANK_CONTENTS, (tank['id'],))
             
             contents = []
-            for content_row in content_cursor.fetchall():
+            for content_row in cursor:
                 contents.append({content_row['crude_name']: content_row['volume']})
             
-            tanks[tank_name] = {
-                'name': tank_name,
-                'capacity': tank['capacity'],
-                'content': contents
-            }
-        
-        return tanks
+            tank['content'] = contents
+            return tank
+    
+    def get_all_tanks(self) -> Dict[str, Dict[str, Any]]:
+        """Get all tanks with contents in JSON-compatible format."""
+        with self._read_conn() as conn:
+            return self._fetch_all_tanks(conn)
     
     def update_tank(self, tank_id: int = None, name: str = None, **kwargs) -> bool:
         """Update tank fields."""
-        if not kwargs:
-            return False
-        
-        # Get tank ID if name provided
-        if name and not tank_id:
-            tank = self.get_tank(name=name)
-            if not tank:
-                return False
-            tank_id = tank['id']
-        
-        fields = []
-        values = []
-        for key, value in kwargs.items():
-            if key in ['name', 'capacity', 'plant_id']:
-                fields.append(f"{key} = ?")
-                values.append(value)
-        
+        fields = tuple(key for key in _TANK_FIELDS if key in kwargs)
         if not fields:
             return False
         
-        values.append(tank_id)
-        with self.transaction() as conn:
-            cursor = conn.execute(
-                f"UPDATE tanks SET {', '.join(fields)} WHERE id = ?",
-                values
-            )
+        # Match on name directly when no id is given, no id lookup needed
+        key_column, key = ('name', name) if name and not tank_id else ('id', tank_id)
+        values = [kwargs[field] for field in fields]
+        values.append(key)
+        with self.transaction("IMMEDIATE") as conn:
+            cursor = conn.execute(_SQL_UPDATE_TANK[key_column][fields], values)
             return cursor.rowcount > 0
     
     def delete_tank(self, tank_id: int = None, name: str = None) -> bool:
         """Delete a tank and its contents."""
-        if name and not tank_id:
-            tank = self.get_tank(name=name)
-            if not tank:
-                return False
-            tank_id = tank['id']
-        
-        with self.transaction() as conn:
-            cursor = conn.execute("DELETE FROM tanks WHERE id = ?", (tank_id,))
+        with self.transaction("IMMEDIATE") as conn:
+            if name and not tank_id:
+                cursor = conn.execute("DELETE FROM tanks WHERE name = ?", (name,))
+            else:
+                cursor = conn.execute("DELETE FROM tanks WHERE id = ?", (tank_id,))
             return cursor.rowcount > 0
     
     def update_tank_content(self, tank_name: str, crude_name: str, volume: float) -> bool:
         """Update tank content for a specific crude."""
-        with self.transaction() as conn:
-            # Get tank and crude IDs
-            tank_cursor = conn.execute("SELECT id FROM tanks WHERE name = ?", (tank_name,))
-            tank_row = tank_cursor.fetchone()
-            if not tank_row:
-                return False
-            
-            crude_cursor = conn.execute("SELECT id FROM crudes WHERE name = ?", (crude_name,))
-            crude_row = crude_cursor.fetchone()
-            if not crude_row:
+        return self.update_tank_contents_bulk([(tank_name, crude_name, volume)])
+    
+    def update_tank_contents_bulk(self, entries: List[Tuple[str, str, float]]) -> bool:
+        """
+        Apply many (tank_name, crude_name, volume) updates in one transaction.
+        
+        A volume of 0 or less removes the content row. Returns False, changing
+        nothing, if any tank or crude name is unknown.
+        """
+        with self.transaction("IMMEDIATE") as conn:
+            tank_ids = dict(conn.execute("SELECT name, id FROM tanks"))
+            crude_ids = self._crude_ids()
+            if any(tank_name not in tank_ids or crude_name not in crude_ids
+                   for tank_name, crude_name, _ in entries):
                 return False
             
-            tank_id = tank_row['id']
-            crude_id = crude_row['id']
-            
-            if volume <= 0:
-                # Remove content if volume is 0 or negative
-                cursor = conn.execute(
-                    "DELETE FROM tank_contents WHERE tank_id = ? AND crude_id = ?",
-                    (tank_id, crude_id)
-                )
-            else:
-                # Insert or update content
-                cursor = conn.execute("""
-                    INSERT INTO tank_contents (tank_id, crude_id, volume) 
-                    VALUES (?, ?, ?)
-                    ON CONFLICT(tank_id, crude_id) 
-                    DO UPDATE SET volume = excluded.volume
-                """, (tank_id, crude_id, volume))
+            deletes = []
+            upserts = []
+            for tank_name, crude_name, volume in entries:
+                if volume <= 0:
+                    deletes.append((tank_ids[tank_name], crude_ids[crude_name]))
+                else:
+                    upserts.append((tank_ids[tank_name], crude_ids[crude_name], volume))
             
+            conn.executemany("DELETE FROM tank_contents WHERE tank_id = ? AND crude_id = ?", deletes)
+            self.upsert_tank_contents_bulk(upserts)
             return True
     
+    def upsert_tank_content(self, tank_id: int, crude_id: int, volume: float) -> bool:
+        """Insert or overwrite one tank content row in a single statement."""
+        return self.upsert_tank_contents_bulk([(tank_id, crude_id, volume)])
+    
+    def upsert_tank_contents_bulk(self, rows: List[Tuple[int, int, float]]) -> bool:
+        """Insert or overwrite (tank_id, crude_id, volume) rows in one transaction."""
+        with self.transaction("IMMEDIATE") as conn:
+            conn.executemany("""
+                INSERT INTO tank_contents (tank_id, crude_id, volume) VALUES (?, ?, ?)
+                ON CONFLICT(tank_id, crude_id) DO UPDATE SET
+                    volume = excluded.volume,
+                    updated_at = strftime('%s', 'now')
+            """, rows)
+        return True
+    
     def save_tanks_data(self, tanks_data: Dict[str, Dict[str, Any]]) -> bool:
         """Save complete tanks data (replaces all tank data)."""
-        with self.transaction() as conn:
-            # Clear existing tank contents
+        content_rows = [
+            (tank_name, crude_name, volume)
+            for tank_name, tank_info in tanks_data.items()
+            for content_item in tank_info.get('content', [])
+            for crude_name, volume in content_item.items()
+            if crude_name  # Skip empty crude names
+        ]
+        with self.replace_transaction() as conn:
+            # Clear existing tank contents (children first; enforcement is off)
             conn.execute("DELETE FROM tank_contents")
             conn.execute("DELETE FROM tanks")
             
-            for tank_name, tank_info in tanks_data.items():
-                # Create tank
-                cursor = conn.execute(
-                    "INSERT INTO tanks (name, capacity) VALUES (?, ?)",
-                    (tank_name, tank_info.get('capacity', 0))
-                )
-                tank_id = cursor.lastrowid
-                
-                # Add contents
-                for content_item in tank_info.get('content', []):
-                    for crude_name, volume in content_item.items():
-                        if crude_name:  # Skip empty crude names
-                            # Get or create crude
-                            crude_cursor = conn.execute("SELECT id FROM crudes WHERE name = ?", (crude_name,))
-                            crude_row = crude_cursor.fetchone()
-                            
-                            if crude_row:
-                                crude_id = crude_row['id']
-                            else:
-                                # Create crude with default values if it doesn't exist
-                                create_cursor = conn.execute(
-                                    "INSERT INTO crudes (name, margin, origin) VALUES (?, ?, ?)",
-                                    (crude_name, 15.0, "Unknown")
-                                )
-                                crude_id = create_cursor.lastrowid
-                            
-                            # Add tank content
-                            if volume > 0:
-                                conn.execute(
-                                    "INSERT INTO tank_contents (tank_id, crude_id, volume) VALUES (?, ?, ?)",
-                                    (tank_id, crude_id, volume)
-                                )
+            conn.executemany(
+                "INSERT INTO tanks (name, capacity) VALUES (?, ?)",
+                [(tank_name, tank_info.get('capacity', 0)) for tank_name, tank_info in tanks_data.items()]
+            )
+            # Create crudes with default values if they don't exist
+            conn.executemany(
+                _SQL_CREATE_MISSING_CRUDE,
+                [(crude_name, 'Unknown') for crude_name in dict.fromkeys(row[1] for row in content_rows)]
+            )
+            # Tank and crude ids are resolved by name inside the insert
+            conn.executemany("""
+                INSERT INTO tank_contents (tank_id, crude_id, volume) 
+                SELECT t.id, c.id, ? FROM tanks t, crudes c WHERE t.name = ? AND c.name = ?
+            """, [
+                (volume, tank_name, crude_name)
+                for tank_name, crude_name, volume in content_rows if volume > 0
+            ])
             
             return True
     
+    def save_tank(self, tank_data: Dict[str, Any], content_rows: List[Tuple[str, float]] = ()) -> bool:
+        """
+        Upsert one tank and replace its contents in a single transaction.
+        
+        Args:
+            tank_data: dict with name, capacity and optional plant_id
+            content_rows: (crude_grade, volume) tuples
+        """
+        tank_name = tank_data['name']
+        with self.transaction("IMMEDIATE") as conn:
+            conn.execute("""
+                INSERT INTO tanks (name, capacity, plant_id) VALUES (?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                    capacity = excluded.capacity,
+                    plant_id = excluded.plant_id,
+                    updated_at = strftime('%s', 'now')
+            """, (tank_name, tank_data.get('capacity', 0), tank_data.get('plant_id')))
+            conn.execute(
+                "DELETE FROM tank_contents WHERE tank_id = (SELECT id FROM tanks WHERE name = ?)",
+                (tank_name,)
+            )
+            
+            # Unknown grades get a crude with default values, as in save_tanks_data
+            content_rows = [(grade, volume) for grade, volume in content_rows if grade]
+            conn.executemany(
+                _SQL_CREATE_MISSING_CRUDE,
+                [(grade, 'Unknown') for grade in dict.fromkeys(grade for grade, _ in content_rows)]
+            )
+            conn.executemany("""
+                INSERT INTO tank_contents (tank_id, crude_id, volume) 
+                SELECT t.id, c.id, ? FROM tanks t, crudes c WHERE t.name = ? AND c.name = ?
+                ON CONFLICT(tank_id, crude_id) DO UPDATE SET
+                    volume = excluded.volume,
+                    updated_at = strftime('%s', 'now')
+            """, [(volume, tank_name, grade) for grade, volume in content_rows])
+        return True
+    
     # CRUD Operations for Blending Recipes
     def create_blending_recipe(self, name: str, primary_grade: str, secondary_grade: Optional[str], 
                               max_rate: float, primary_fraction: float) -> int:
         """Create a new blending recipe."""
         logger = logging.getLogger("oasis.data")
         try:
-            # Use existing connection (assume already in transaction)
-            conn = self._get_connection()
-            logger.info(f"Creating blending recipe: name={name}, primary_grade={primary_grade}, secondary_grade={secondary_grade}, max_rate={max_rate}, primary_fraction={primary_fraction}")
-            # Get primary grade ID
-            cursor = conn.execute("SELECT id FROM crudes WHERE name = ?", (primary_grade,))
-            primary_row = cursor.fetchone()
-            if not primary_row:
-                logger.error(f"Primary grade '{primary_grade}' not found in crudes table.")
-                raise ValueError(f"Primary grade '{primary_grade}' not found")
-            primary_grade_id = primary_row['id']
-            # Get secondary grade ID if provided
-            secondary_grade_id = None
-            if secondary_grade:
-                cursor = conn.execute("SELECT id FROM crudes WHERE name = ?", (secondary_grade,))
-                secondary_row = cursor.fetchone()
-                if not secondary_row:
-                    logger.error(f"Secondary grade '{secondary_grade}' not found in crudes table.")
-                    raise ValueError(f"Secondary grade '{secondary_grade}' not found")
-                secondary_grade_id = secondary_row['id']
-            cursor = conn.execute("""
-                INSERT INTO blending_recipes 
-                (name, primary_grade_id, secondary_grade_id, max_rate, primary_fraction) 
-                VALUES (?, ?, ?, ?, ?)
-            """, (name, primary_grade_id, secondary_grade_id, max_rate, primary_fraction))
-            logger.info(f"Inserted blending recipe '{name}' successfully.")
-            return cursor.lastrowid
+            # Nests as a savepoint when the caller already holds a transaction
+            with self.transaction("IMMEDIATE") as conn:
+                logger.info(f"Creating blending recipe: name={name}, primary_grade={primary_grade}, secondary_grade={secondary_grade}, max_rate={max_rate}, primary_fraction={primary_fraction}")
+                crude_ids = self._crude_ids()
+                # Get primary grade ID
+                primary_grade_id = crude_ids.get(primary_grade)
+                if primary_grade_id is None:
+                    logger.error(f"Primary grade '{primary_grade}' not found in crudes table.")
+                    raise ValueError(f"Primary grade '{primary_grade}' not found")
+                # Get secondary grade ID if provided
+                secondary_grade_id = None
+                if secondary_grade:
+                    secondary_grade_id = crude_ids.get(secondary_grade)
+                    if secondary_grade_id is None:
+                        logger.error(f"Secondary grade '{secondary_grade}' not found in crudes table.")
+                        raise ValueError(f"Secondary grade '{secondary_grade}' not found")
+                recipe_id = _insert_returning_id(conn, """
+                    INSERT INTO blending_recipes 
+                    (name, primary_grade_id, secondary_grade_id, max_rate, primary_fraction) 
+                    VALUES (?, ?, ?, ?, ?)
+                """, (name, primary_grade_id, secondary_grade_id, max_rate, primary_fraction))
+                logger.info(f"Inserted blending recipe '{name}' successfully.")
+                return recipe_id
         except Exception as e:
             logger.error(f"Error creating blending recipe '{name}': {e}")
             logger.error(f"Recipe data: name={name}, primary_grade={primary_grade}, secondary_grade={secondary_grade}, max_rate={max_rate}, primary_fraction={primary_fraction}")
@@ -251,295 +304,468 @@ class DatabaseManagerExtended(DatabaseManager):
     
     def get_all_blending_recipes(self) -> List[Dict[str, Any]]:
         """Get all blending recipes with grade names."""
-        conn = self._get_connection()
-        cursor = conn.execute("""
-            SELECT br.*, 
-                   p.name as primary_grade, 
-                   s.name as secondary_grade
-            FROM blending_recipes br
-            JOIN crudes p ON br.primary_grade_id = p.id
-            LEFT JOIN crudes s ON br.secondary_grade_id = s.id
-            ORDER BY br.name
-        """)
-        
-        recipes = []
-        for row in cursor.fetchall():
-            recipe = dict(row)
-            # Convert to match existing JSON format
-            recipes.append({
-                'name': recipe['name'],
-                'primary_grade': recipe['primary_grade'],
-                'secondary_grade': recipe['secondary_grade'],
-                'max_rate': recipe['max_rate'],
-                'primary_fraction': recipe['primary_fraction']
-            })
-        
-        return recipes
+        with self._read_conn() as conn:
+            cursor = conn.execute("""
+                SELECT br.name, br.max_rate, br.primary_fraction,
+                       p.name as primary_grade, 
+                       s.name as secondary_grade
+                FROM blending_recipes br
+                JOIN crudes p ON br.primary_grade_id = p.id
+                LEFT JOIN crudes s ON br.secondary_grade_id = s.id
+                ORDER BY br.name
+            """)
+            
+            # Build the existing JSON format straight from the rows
+            return [
+                {
+                    'name': row['name'],
+                    'primary_grade': row['primary_grade'],
+                    'secondary_grade': row['secondary_grade'],
+                    'max_rate': row['max_rate'],
+                    'primary_fraction': row['primary_fraction']
+                }
+                for row in cursor
+            ]
     
     def save_blending_recipes(self, recipes: List[Dict[str, Any]]) -> bool:
         """Save complete blending recipes data."""
         logger = logging.getLogger("oasis.data")
         try:
-            with self.transaction() as conn:
+            with self.transaction("IMMEDIATE") as conn:
                 logger.info(f"Clearing all blending_recipes before saving new ones. Incoming count: {len(recipes)}")
                 conn.execute("DELETE FROM blending_recipes")
+                crude_ids = self._crude_ids()
+                rows = []
                 for idx, recipe in enumerate(recipes):
                     # Defensive: skip dicts that are not valid recipes
                     if not (isinstance(recipe, dict) and 'name' in recipe and 'primary_grade' in recipe and 'max_rate' in recipe and 'primary_fraction' in recipe):
                         logger.warning(f"Skipping invalid recipe at index {idx}: {recipe}")
                         continue
-                    logger.info(f"Saving recipe {idx}: {recipe}")
-                    self.create_blending_recipe(
-                        name=recipe['name'],
-                        primary_grade=recipe['primary_grade'],
-                        secondary_grade=recipe.get('secondary_grade'),
-                        max_rate=recipe['max_rate'],
-                        primary_fraction=recipe['primary_fraction']
-                    )
-                logger.info("All recipes saved successfully.")
+                    primary_grade_id = crude_ids.get(recipe['primary_grade'])
+                    if primary_grade_id is None:
+                        raise ValueError(f"Primary grade '{recipe['primary_grade']}' not found")
+                    secondary_grade = recipe.get('secondary_grade')
+                    secondary_grade_id = None
+                    if secondary_grade:
+                        secondary_grade_id = crude_ids.get(secondary_grade)
+                        if secondary_grade_id is None:
+                            raise ValueError(f"Secondary grade '{secondary_grade}' not found")
+                    rows.append((recipe['name'], primary_grade_id, secondary_grade_id,
+                                 recipe['max_rate'], recipe['primary_fraction']))
+                conn.executemany("""
+                    INSERT INTO blending_recipes 
+                    (name, primary_grade_id, secondary_grade_id, max_rate, primary_fraction) 
+                    VALUES (?, ?, ?, ?, ?)
+                """, rows)
+                logger.info(f"All {len(rows)} recipes saved successfully.")
             return True
         except Exception as e:
             logger.error(f"Error saving blending recipes: {e}")
             logger.error(f"Recipes data: {recipes}")
             raise
     
+    def save_blending_recipe(self, recipe: Dict[str, Any]) -> bool:
+        """Create or replace a single blending recipe by name."""
+        with self.transaction("IMMEDIATE"):
+            self._get_connection().execute("DELETE FROM blending_recipes WHERE name = ?", (recipe['name'],))
+            self.create_blending_recipe(
+                name=recipe['name'],
+                primary_grade=recipe['primary_grade'],
+                secondary_grade=recipe.get('secondary_grade') or None,
+                max_rate=recipe['max_rate'],
+                primary_fraction=recipe['primary_fraction']
+            )
+        return True
+    
     # CRUD Operations for Vessels
     def create_vessel(self, vessel_id: str, arrival_day: int, capacity: float, 
                      cost: float, days_held: int = 0) -> int:
         """Create a new vessel."""
-        with self.transaction() as conn:
-            cursor = conn.execute("""
+        with self.transaction("IMMEDIATE") as conn:
+            return _insert_returning_id(conn, """
                 INSERT INTO vessels (vessel_id, arrival_day, capacity, cost, days_held) 
                 VALUES (?, ?, ?, ?, ?)
             """, (vessel_id, arrival_day, capacity, cost, days_held))
-            
-            return cursor.lastrowid
     
     def get_vessel(self, vessel_id: str = None, db_id: int = None) -> Optional[Dict[str, Any]]:
-        """Get vessel with cargo and route data."""
-        conn = self._get_connection()
-        
-        if vessel_id:
-            cursor = conn.execute("SELECT * FROM vessels WHERE vessel_id = ?", (vessel_id,))
-        elif db_id:
-            cursor = conn.execute("SELECT * FROM vessels WHERE id = ?", (db_id,))
-        else:
-            raise ValueError("Either vessel_id or db_id must be provided")
-        
-        vessel_row = cursor.fetchone()
-        if not vessel_row:
-            return None
+        """
+        Get vessel with cargo and route data.
         
-        vessel = dict(vessel_row)
-        vessel_db_id = vessel['id']
-        
-        # Get cargo
-        cargo_cursor = conn.execute("""
-            SELECT c.name as grade, vc.volume, vc.origin, 
-                   vc.loading_start_day, vc.loading_end_day
-            FROM vessel_cargo vc
-            JOIN crudes c ON vc.crude_id = c.id
-            WHERE vc.vessel_id = ?
-        """, (vessel_db_id,))
-        
-        cargo = []
-        for cargo_row in cargo_cursor.fetchall():
-            cargo.append({
-                'grade': cargo_row['grade'],
-                'volume': cargo_row['volume'],
-                'origin': cargo_row['origin'],
-                'loading_start_day': cargo_row['loading_start_day'],
-                'loading_end_day': cargo_row['loading_end_day']
-            })
-        
-        vessel['cargo'] = cargo
-        
-        # Get route segments
-        route_cursor = conn.execute("""
-            SELECT r.origin as from_location, r.destination as to_location,
-                   vr.day_start_travel, vr.day_end_travel, 
-                   vr.day_start_wait, vr.day_end_wait,
-                   r.time_travel as travel_days, vr.action
-            FROM vessel_routes vr
-            JOIN routes r ON vr.route_id = r.id
-            WHERE vr.vessel_id = ?
-            ORDER BY vr.segment_order
-        """, (vessel_db_id,))
-        
-        route = []
-        for route_row in route_cursor.fetchall():
-            segment = {
-                'from': route_row['from_location'],
-                'to': route_row['to_location'],
-                'travel_days': route_row['travel_days']
+        The three lookups run back to back on one snapshot: each is a single
+        index probe, so handing them to other pooled connections would cost
+        more in thread handoff than it saves, and could mix two data versions.
+        """
+        with self._read_snapshot() as conn:
+            if vessel_id:
+                cursor = conn.execute("""
+                    SELECT id, vessel_id, arrival_day, capacity, cost, days_held, created_at, updated_at
+                    FROM vessels WHERE vessel_id = ?
+                """, (vessel_id,))
+            elif db_id:
+                cursor = conn.execute("""
+                    SELECT id, vessel_id, arrival_day, capacity, cost, days_held, created_at, updated_at
+                    FROM vessels WHERE id = ?
+                """, (db_id,))
+            else:
+                raise ValueError("Either vessel_id or db_id must be provided")
+            
+            vessel_row = cursor.fetchone()
+            if not vessel_row:
+                return None
+            
+            # The internal database id is kept out of the response
+            vessel_db_id = vessel_row['id']
+            vessel = {
+                'vessel_id': vessel_row['vessel_id'],
+                'arrival_day': vessel_row['arrival_day'],
+                'capacity': vessel_row['capacity'],
+                'cost': vessel_row['cost'],
+                'days_held': vessel_row['days_held'],
+                'created_at': vessel_row['created_at'],
+                'updated_at': vessel_row['updated_at']
             }
             
-            if route_row['day_start_travel'] is not None:
-                segment['day_start_travel'] = route_row['day_start_travel']
-            if route_row['day_end_travel'] is not None:
-                segment['day_end_travel'] = route_row['day_end_travel']
-            if route_row['day_start_wait'] is not None:
-                segment['day_start_wait'] = route_row['day_start_wait']
-            if route_row['day_end_wait'] is not None:
-                segment['day_end_wait'] = route_row['day_end_wait']
-            if route_row['action']:
-                segment['action'] = route_row['action']
+            # Get cargo
+            cargo_cursor = conn.execute(_SQL_GET_VESSEL_CARGO, (vessel_db_id,))
             
-            route.append(segment)
-        
-        vessel['route'] = route
-        
-        # Remove internal database ID from response
-        vessel.pop('id', None)
-        
-        return vessel
+            cargo = []
+            for cargo_row in cargo_cursor:
+                cargo.append({
+                    'grade': cargo_row['grade'],
+                    'volume': cargo_row['volume'],
+                    'origin': cargo_row['origin'],
+                    'loading_start_day': cargo_row['loading_start_day'],
+                    'loading_end_day': cargo_row['loading_end_day']
+                })
+            
+            vessel['cargo'] = cargo
+            
+            # Get route segments
+            route_cursor = conn.execute(_SQL_GET_VESSEL_ROUTE, (vessel_db_id,))
+            
+            route = []
+            for route_row in route_cursor:
+                segment = {
+                    'from': route_row['from_location'],
+                    'to': route_row['to_location'],
+                    'travel_days': route_row['travel_days']
+                }
+                
+                if route_row['day_start_travel'] is not None:
+                    segment['day_start_travel'] = route_row['day_start_travel']
+                if route_row['day_end_travel'] is not None:
+                    segment['day_end_travel'] = route_row['day_end_travel']
+                if route_row['day_start_wait'] is not None:
+                    segment['day_start_wait'] = route_row['day_start_wait']
+                if route_row['day_end_wait'] is not None:
+                    segment['day_end_wait'] = route_row['day_end_wait']
+                if route_row['action']:
+                    segment['action'] = route_row['action']
+                
+                route.append(segment)
+            
+            vessel['route'] = route
+            return vessel
     
     def get_all_vessels(self) -> Dict[str, Dict[str, Any]]:
         """Get all vessels in JSON-compatible format."""
-        conn = self._get_connection()
-        cursor = conn.execute("SELECT vessel_id FROM vessels ORDER BY vessel_id")
-        
-        vessels = {}
-        for row in cursor.fetchall():
-            vessel_id = row['vessel_id']
-            vessel_data = self.get_vessel(vessel_id=vessel_id)
-            if vessel_data:
-                vessels[vessel_id] = vessel_data
-        
-        return vessels
+        with self._read_conn() as conn:
+            return self._fetch_all_vessels(conn)
     
     def save_vessels_data(self, vessels_data: Dict[str, Dict[str, Any]]) -> bool:
         """Save complete vessels data."""
-        with self.transaction() as conn:
-            # Clear existing vessel data
+        cargo_rows = [
+            (vessel_id, cargo_item.get('grade', ''), cargo_item.get('volume', 0),
+             cargo_item.get('origin', ''), cargo_item.get('loading_start_day', 0),
+             cargo_item.get('loading_end_day', 0))
+            for vessel_id, vessel_info in vessels_data.items()
+            for cargo_item in vessel_info.get('cargo', [])
+        ]
+        route_rows = [
+            (vessel_id, idx, route_segment)
+            for vessel_id, vessel_info in vessels_data.items()
+            for idx, route_segment in enumerate(vessel_info.get('route', []))
+        ]
+        with self.replace_transaction() as conn:
+            # Clear existing vessel data (children first; enforcement is off)
             conn.execute("DELETE FROM vessel_daily_locations")
             conn.execute("DELETE FROM vessel_routes")
             conn.execute("DELETE FROM vessel_cargo")
             conn.execute("DELETE FROM vessels")
             
-            for vessel_id, vessel_info in vessels_data.items():
-                # Create vessel
-                cursor = conn.execute("""
-                    INSERT INTO vessels (vessel_id, arrival_day, capacity, cost, days_held) 
-                    VALUES (?, ?, ?, ?, ?)
-                """, (
-                    vessel_id,
-                    vessel_info.get('arrival_day', 0),
-                    vessel_info.get('capacity', 0),
-                    vessel_info.get('cost', 0),
-                    vessel_info.get('days_held', 0)
-                ))
-                
-                vessel_db_id = cursor.lastrowid
-                
-                # Add cargo
-                for cargo_item in vessel_info.get('cargo', []):
-                    # Get or create crude
-                    crude_cursor = conn.execute("SELECT id FROM crudes WHERE name = ?", (cargo_item.get('grade', ''),))
-                    crude_row = crude_cursor.fetchone()
-                    
-                    if crude_row:
-                        crude_id = crude_row['id']
-                    else:
-                        # Create crude with default values
-                        create_cursor = conn.execute(
-                            "INSERT INTO crudes (name, margin, origin) VALUES (?, ?, ?)",
-                            (cargo_item.get('grade', ''), 15.0, cargo_item.get('origin', 'Unknown'))
-                        )
-                        crude_id = create_cursor.lastrowid
-                    
-                    conn.execute("""
-                        INSERT INTO vessel_cargo 
-                        (vessel_id, crude_id, volume, origin, loading_start_day, loading_end_day) 
-                        VALUES (?, ?, ?, ?, ?, ?)
-                    """, (
-                        vessel_db_id,
-                        crude_id,
-                        cargo_item.get('volume', 0),
-                        cargo_item.get('origin', ''),
-                        cargo_item.get('loading_start_day', 0),
-                        cargo_item.get('loading_end_day', 0)
-                    ))
-                
-                # Add route segments
-                for idx, route_segment in enumerate(vessel_info.get('route', [])):
-                    # Get or create route
-                    route_cursor = conn.execute(
-                        "SELECT id FROM routes WHERE origin = ? AND destination = ?",
-                        (route_segment.get('from', ''), route_segment.get('to', ''))
-                    )
-                    route_row = route_cursor.fetchone()
-                    
-                    if route_row:
-                        route_id = route_row['id']
-                    else:
-                        # Create route
-                        create_cursor = conn.execute("""
-                            INSERT INTO routes (origin, destination, time_travel) 
-                            VALUES (?, ?, ?)
-                        """, (
-                            route_segment.get('from', ''),
-                            route_segment.get('to', ''),
-                            route_segment.get('travel_days', 1)
-                        ))
-                        route_id = create_cursor.lastrowid
-                    
-                    conn.execute("""
-                        INSERT INTO vessel_routes 
-                        (vessel_id, route_id, day_start_travel, day_end_travel, 
-                         day_start_wait, day_end_wait, action, segment_order) 
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        vessel_db_id,
-                        route_id,
-                        route_segment.get('day_start_travel'),
-                        route_segment.get('day_end_travel'),
-                        route_segment.get('day_start_wait'),
-                        route_segment.get('day_end_wait'),
-                        route_segment.get('action'),
-                        idx
-                    ))
+            conn.executemany("""
+                INSERT INTO vessels (vessel_id, arrival_day, capacity, cost, days_held) 
+                VALUES (?, ?, ?, ?, ?)
+            """, [
+                (vessel_id, vessel_info.get('arrival_day', 0), vessel_info.get('capacity', 0),
+                 vessel_info.get('cost', 0), vessel_info.get('days_held', 0))
+                for vessel_id, vessel_info in vessels_data.items()
+            ])
+            self._insert_vessel_cargo(conn, cargo_rows)
+            
+            # Create missing routes (once per leg, first travel time wins), then
+            # add the segments with ids resolved in the insert
+            new_routes: Dict[Tuple[str, str], float] = {}
+            for _, _, segment in route_rows:
+                new_routes.setdefault((segment.get('from', ''), segment.get('to', '')),
+                                      segment.get('travel_days', 1))
+            conn.executemany(
+                _SQL_CREATE_MISSING_ROUTE,
+                [(origin, destination, travel_days) for (origin, destination), travel_days in new_routes.items()]
+            )
+            conn.executemany("""
+                INSERT INTO vessel_routes 
+                (vessel_id, route_id, day_start_travel, day_end_travel, 
+                 day_start_wait, day_end_wait, action, segment_order) 
+                SELECT v.id, r.id, ?, ?, ?, ?, ?, ?
+                FROM vessels v, routes r
+                WHERE v.vessel_id = ? AND r.origin = ? AND r.destination = ?
+            """, [
+                (segment.get('day_start_travel'), segment.get('day_end_travel'),
+                 segment.get('day_start_wait'), segment.get('day_end_wait'),
+                 segment.get('action'), idx,
+                 vessel_id, segment.get('from', ''), segment.get('to', ''))
+                for vessel_id, idx, segment in route_rows
+            ])
             
             return True
     
+    def save_vessels_bulk(self, vessel_rows: List[Tuple], cargo_rows: List[Tuple] = ()) -> bool:
+        """
+        Upsert vessels and replace their cargo in a single transaction.
+        
+        Args:
+            vessel_rows: (vessel_id, arrival_day, capacity, cost, days_held) tuples
+            cargo_rows: (vessel_id, grade, volume, origin, loading_start_day, loading_end_day) tuples
+        """
+        with self.transaction("IMMEDIATE") as conn:
+            conn.executemany("""
+                INSERT INTO vessels (vessel_id, arrival_day, capacity, cost, days_held) 
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(vessel_id) DO UPDATE SET
+                    arrival_day = excluded.arrival_day,
+                    capacity = excluded.capacity,
+                    cost = excluded.cost,
+                    days_held = excluded.days_held,
+                    updated_at = strftime('%s', 'now')
+            """, vessel_rows)
+            self._replace_vessel_cargo(conn, [row[0] for row in vessel_rows], cargo_rows)
+        return True
+    
+    def add_vessel_cargo_bulk(self, cargo_rows: List[Tuple]) -> bool:
+        """Replace the cargo of every vessel referenced in cargo_rows in a single transaction."""
+        with self.transaction("IMMEDIATE") as conn:
+            self._replace_vessel_cargo(conn, list({row[0] for row in cargo_rows}), cargo_rows)
+        return True
+    
+    def _replace_vessel_cargo(self, conn, vessel_ids: List[str], cargo_rows: List[Tuple]) -> None:
+        """Delete existing cargo for vessel_ids and insert cargo_rows (caller owns the transaction)."""
+        if vessel_ids:
+            placeholders = ', '.join('?' * len(vessel_ids))
+            conn.execute(f"""
+                DELETE FROM vessel_cargo 
+                WHERE vessel_id IN (SELECT id FROM vessels WHERE vessel_id IN ({placeholders}))
+            """, vessel_ids)
+        self._insert_vessel_cargo(conn, cargo_rows)
+    
+    def _insert_vessel_cargo(self, conn, cargo_rows: List[Tuple]) -> None:
+        """Insert cargo_rows, creating unknown grades with default values (caller owns the transaction)."""
+        if not cargo_rows:
+            return
+        
+        # Unknown grades get a crude with default values, origin from their first cargo
+        new_crudes: Dict[str, str] = {}
+        for row in cargo_rows:
+            new_crudes.setdefault(row[1], row[3] or 'Unknown')
+        conn.executemany(_SQL_CREATE_MISSING_CRUDE, new_crudes.items())
+        conn.executemany("""
+            INSERT INTO vessel_cargo 
+            (vessel_id, crude_id, volume, origin, loading_start_day, loading_end_day) 
+            SELECT v.id, c.id, ?, ?, ?, ?
+            FROM vessels v, crudes c
+            WHERE v.vessel_id = ? AND c.name = ?
+        """, [
+            (volume, origin, start_day, end_day, vessel_id, grade)
+            for vessel_id, grade, volume, origin, start_day, end_day in cargo_rows
+        ])
+    
+    def get_table_counts(self, tables: List[str]) -> Dict[str, int]:
+        """Row counts for several tables in a single query (table names are trusted constants)."""
+        if not tables:
+            return {}
+        with self._read_conn() as conn:
+            select = ", ".join(f'(SELECT COUNT(*) FROM {table}) AS "{table}"' for table in tables)
+            row = conn.execute(f"SELECT {select}").fetchone()
+            return dict(zip(tables, row))
+    
+    # Bulk configuration snapshot
+    def load_all_config_bulk(self, include_vessels: bool = True) -> ConfigSnapshot:
+        """
+        Read every configuration table in one read transaction.
+        
+        Tank contents, vessel cargo and vessel routes are fetched with one query
+        each and grouped in a single pass, instead of one query per tank/vessel.
+        Pass include_vessels=False when the caller has its own vessel cache;
+        vessels is then an empty dict.
+        """
+        with self._read_snapshot() as conn:
+            return ConfigSnapshot(
+                tanks=self._fetch_all_tanks(conn),
+                vessels=self._fetch_all_vessels(conn) if include_vessels else {},
+                crudes=self.get_all_crudes(),
+                recipes=self.get_all_blending_recipes(),
+                routes=self.get_all_routes(),
+                plants=self.get_all_plants(),
+                feedstock_requirements=self.get_all_feedstock_requirements(),
+                vessel_types=self.get_all_vessel_types()
+            )
+    
+    def _fetch_all_tanks(self, conn) -> Dict[str, Dict[str, Any]]:
+        """Tanks with contents, same shape as get_all_tanks, in one query."""
+        # SQLite builds each tank's content list as JSON, decoded once per tank
+        return {
+            row['name']: {
+                'name': row['name'],
+                'capacity': row['capacity'],
+                'content': _json_loads(row['content'])
+            }
+            for row in conn.execute(f"""
+                SELECT t.name, t.capacity, (
+                    SELECT json_group_array(json_object(crude_name, {_JSON_REAL.format('volume')}))
+                    FROM (
+                        SELECT c.name as crude_name, tc.volume
+                        FROM tank_contents tc
+                        JOIN crudes c ON c.id = tc.crude_id
+                        WHERE tc.tank_id = t.id
+                        ORDER BY tc.id
+                    )
+                ) as content
+                FROM tanks t
+                ORDER BY t.name
+            """)
+        }
+    
+    def _fetch_all_vessels(self, conn) -> Dict[str, Dict[str, Any]]:
+        """Vessels with cargo and routes, same shape as get_all_vessels, in two queries."""
+        route_by_vessel: Dict[int, List[Dict[str, Any]]] = {}
+        for row in conn.execute("""
+            SELECT vr.vessel_id, r.origin as from_location, r.destination as to_location,
+                   vr.day_start_travel, vr.day_end_travel, 
+                   vr.day_start_wait, vr.day_end_wait,
+                   r.time_travel as travel_days, vr.action
+            FROM vessel_routes vr
+            JOIN routes r ON vr.route_id = r.id
+            ORDER BY vr.vessel_id, vr.segment_order
+        """):
+            segment = {
+                'from': row['from_location'],
+                'to': row['to_location'],
+                'travel_days': row['travel_days']
+            }
+            for key in ('day_start_travel', 'day_end_travel', 'day_start_wait', 'day_end_wait'):
+                if row[key] is not None:
+                    segment[key] = row[key]
+            if row['action']:
+                segment['action'] = row['action']
+            route_by_vessel.setdefault(row['vessel_id'], []).append(segment)
+        
+        # Cargo lists are built as JSON by SQLite, as for tank contents
+        vessels = {}
+        for row in conn.execute(f"""
+            SELECT v.id, v.vessel_id, v.arrival_day, v.capacity, v.cost, v.days_held,
+                   v.created_at, v.updated_at, (
+                SELECT json_group_array(json_object(
+                    'grade', grade, 'volume', {_JSON_REAL.format('volume')}, 'origin', origin,
+                    'loading_start_day', loading_start_day, 'loading_end_day', loading_end_day
+                ))
+                FROM (
+                    SELECT c.name as grade, vc.volume, vc.origin,
+                           vc.loading_start_day, vc.loading_end_day
+                    FROM vessel_cargo vc
+                    JOIN crudes c ON vc.crude_id = c.id
+                    WHERE vc.vessel_id = v.id
+                    ORDER BY vc.id
+                )
+            ) as cargo_json
+            FROM vessels v
+            ORDER BY v.vessel_id
+        """):
+            vessel = dict(row)
+            vessel_db_id = vessel.pop('id')
+            vessel['cargo'] = _json_loads(vessel.pop('cargo_json'))
+            vessel['route'] = route_by_vessel.get(vessel_db_id, [])
+            vessels[vessel['vessel_id']] = vessel
+        
+        return vessels
+    
     def get_all_feedstock_requirements(self) -> List[Dict[str, Any]]:
         """Get all feedstock requirements with crude names (grades)."""
-        import json
-        conn = self._get_connection()
-        cursor = conn.execute("""
-            SELECT fr.*, c.name as grade 
-            FROM feedstock_requirements fr
-            JOIN crudes c ON fr.crude_id = c.id
-            ORDER BY fr.id
-        """)
-        requirements = []
-        for row in cursor.fetchall():
-            req_dict = dict(row)
-            # Parse allowed_ldr JSON if it exists
-            if req_dict.get('allowed_ldr'):
-                try:
-                    req_dict['allowed_ldr'] = json.loads(req_dict['allowed_ldr'])
-                except (json.JSONDecodeError, TypeError):
-                    req_dict['allowed_ldr'] = {}
-            requirements.append(req_dict)
-        return requirements
+        with self._read_conn() as conn:
+            cursor = conn.execute("""
+                SELECT fr.*, c.name as grade 
+                FROM feedstock_requirements fr
+                JOIN crudes c ON fr.crude_id = c.id
+                ORDER BY fr.id
+            """)
+            requirements = []
+            for row in cursor:
+                req_dict = dict(row)
+                # Parse allowed_ldr JSON if it exists
+                if req_dict.get('allowed_ldr'):
+                    try:
+                        req_dict['allowed_ldr'] = _json_loads(req_dict['allowed_ldr'])
+                    except (json.JSONDecodeError, TypeError):
+                        req_dict['allowed_ldr'] = {}
+                requirements.append(req_dict)
+            return requirements
 
     def get_all_routes(self) -> List[Dict[str, Any]]:
         """Get all routes."""
-        conn = self._get_connection()
-        cursor = conn.execute("SELECT * FROM routes ORDER BY origin, destination")
-        return [dict(row) for row in cursor.fetchall()]
+        with self._read_conn() as conn:
+            cursor = conn.execute("SELECT * FROM routes ORDER BY origin, destination")
+            return _rows_to_dicts(cursor)
 
+    def save_route(self, route: Dict[str, Any]) -> bool:
+        """Upsert a single route by id."""
+        with self.transaction("IMMEDIATE") as conn:
+            conn.execute("""
+                INSERT INTO routes (id, origin, destination, time_travel) VALUES (?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    origin = excluded.origin,
+                    destination = excluded.destination,
+                    time_travel = excluded.time_travel
+            """, (route['id'], route['origin'], route['destination'], route['time_travel']))
+        return True
+    
+    # Daily plan detail rows
+    def upsert_daily_inventory_bulk(self, rows: List[Tuple[int, int, float]]) -> bool:
+        """Insert or overwrite (daily_plan_id, crude_id, volume) rows in one transaction."""
+        with self.transaction("IMMEDIATE") as conn:
+            conn.executemany("""
+                INSERT INTO daily_inventory (daily_plan_id, crude_id, volume) VALUES (?, ?, ?)
+                ON CONFLICT(daily_plan_id, crude_id) DO UPDATE SET volume = excluded.volume
+            """, rows)
+        return True
+    
+    def upsert_daily_plan_processing_bulk(self, rows: List[Tuple[int, int, float]]) -> bool:
+        """Insert or overwrite (daily_plan_id, recipe_id, processing_rate) rows in one transaction."""
+        with self.transaction("IMMEDIATE") as conn:
+            conn.executemany("""
+                INSERT INTO daily_plan_processing (daily_plan_id, recipe_id, processing_rate) VALUES (?, ?, ?)
+                ON CONFLICT(daily_plan_id, recipe_id) DO UPDATE SET processing_rate = excluded.processing_rate
+            """, rows)
+        return True
+    
     # CRUD Operations for Vessel Types
     def get_all_vessel_types(self) -> list:
         """Get all vessel types from the database."""
-        conn = self._get_connection()
-        cursor = conn.execute("SELECT name, capacity, cost FROM vessel_types ORDER BY capacity DESC")
-        return [dict(row) for row in cursor.fetchall()]
+        with self._read_conn() as conn:
+            cursor = conn.execute("SELECT name, capacity, cost FROM vessel_types ORDER BY capacity DESC")
+            return _rows_to_dicts(cursor)
 
     def save_vessel_types(self, vessel_types: list) -> bool:
         """Replace all vessel types in the database."""
-        with self.transaction() as conn:
+        with self.transaction("IMMEDIATE") as conn:
             conn.execute("DELETE FROM vessel_types")
             for vt in vessel_types:
                 conn.execute(
@@ -547,8 +773,4 @@ class DatabaseManagerExtended(DatabaseManager):
                     (vt.get('name', 'Unnamed'), vt.get('capacity', 0), vt.get('cost', 0))
                 )
         return True
-    
-    def close(self):
-        """Close database connections."""
-        if hasattr(self._local, 'connection'):
-            self._local.connection.close()
+
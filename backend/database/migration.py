@@ -7,22 +7,144 @@ Copyright (c) by Abu Huzaifah Bidin with help from Github Copilot
 """
 
 import json
+import mmap
 import os
 import shutil
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, Iterator, List, Optional, Set, Tuple
 from datetime import datetime
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
 try:
     from .extended_ops import DatabaseManagerExtended
 except ImportError:
     from extended_ops import DatabaseManagerExtended
 
+# orjson parses several times faster when installed and accepts the raw bytes,
+# including a memoryview over a mapped file
+try:
+    from orjson import loads as _json_loads
+    _HAS_ORJSON = True
+except ImportError:
+    _json_loads = json.loads
+    _HAS_ORJSON = False
+
+# Linux FICLONE ioctl: share the source's extents copy-on-write (btrfs, XFS)
+_FICLONE = 0x40049409
+
+# Files parsed up front by migrate_from_json, in the order they are written;
+# vessel_routes.json is streamed separately
+_STATIC_FILES = ('crudes.json', 'plant.json', 'recipes.json', 'routes.json')
+_DYNAMIC_FILES = ('tanks.json', 'vessels.json', 'feedstock_requirements.json')
+
+# Row inserts for the files loaded directly rather than through the manager
+_SQL_INSERT_ROUTE = """
+    INSERT OR IGNORE INTO routes (origin, destination, time_travel, cost)
+    VALUES (?, ?, ?, ?)
+"""
+_SQL_INSERT_FEEDSTOCK = """
+    INSERT INTO feedstock_requirements
+    (crude_id, volume, origin, allowed_ldr_start, allowed_ldr_end, required_arrival_by)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+_SQL_INSERT_VESSEL_LOCATION = """
+    INSERT OR REPLACE INTO vessel_daily_locations (vessel_id, day, location)
+    VALUES (?, ?, ?)
+"""
+
+# Migration-window settings on the writer, used only for offline runs whose
+# source JSON has been backed up: no fsyncs, and one file lock held for the
+# whole load instead of being taken per transaction. journal_mode stays WAL
+# rather than OFF, since a file that fails to migrate is undone by rolling
+# back to its savepoint
+_FAST_LOAD_PRAGMAS = """
+    PRAGMA synchronous = OFF;
+    PRAGMA locking_mode = EXCLUSIVE;
+"""
+# The writer defaults, put back once the load ends; the lock is released at the
+# next statement after locking_mode returns to NORMAL
+_RESTORE_PRAGMAS = """
+    PRAGMA synchronous = NORMAL;
+    PRAGMA locking_mode = NORMAL;
+    SELECT 1 FROM sqlite_master LIMIT 1;
+"""
+
+# Per-file completion markers that let a resumed run skip files already
+# imported; a file is only skipped while its size and mtime are unchanged
+_SQL_CREATE_MIGRATION_LOG = """
+    CREATE TABLE IF NOT EXISTS migration_log (
+        filename TEXT PRIMARY KEY,
+        completed_at INTEGER DEFAULT (strftime('%s', 'now')),
+        row_count INTEGER,
+        file_size INTEGER,
+        file_mtime_ns INTEGER
+    )
+"""
+# Columns added to migration_log after its first release
+_MIGRATION_LOG_UPGRADES = {
+    'file_size': "ALTER TABLE migration_log ADD COLUMN file_size INTEGER",
+    'file_mtime_ns': "ALTER TABLE migration_log ADD COLUMN file_mtime_ns INTEGER",
+}
+_SQL_LOG_MIGRATED_FILE = """
+    INSERT OR REPLACE INTO migration_log (filename, row_count, file_size, file_mtime_ns)
+    VALUES (?, ?, ?, ?)
+"""
+
+# Statistic holding the row count recorded in migration_log for each file
+_FILE_STAT_KEYS = {
+    'crudes.json': 'crudes_migrated',
+    'plant.json': 'plants_migrated',
+    'recipes.json': 'recipes_migrated',
+    'routes.json': 'routes_migrated',
+    'tanks.json': 'tanks_migrated',
+    'vessels.json': 'vessels_migrated',
+    'feedstock_requirements.json': 'feedstock_requirements_migrated',
+    'vessel_routes.json': 'vessel_daily_locations_migrated',
+}
+
+# Files whose rows are looked up by name while migrating another file; the
+# dependent file is re-run whenever its prerequisite is
+_FILE_PREREQUISITES = {
+    'recipes.json': ('crudes.json',),
+    'feedstock_requirements.json': ('crudes.json',),
+    'vessel_routes.json': ('vessels.json',),
+}
+
+# Tables filled by _migrate_dynamic_data; their non-unique indexes are rebuilt
+# after the load instead of being updated per inserted row
+_DYNAMIC_TABLES = (
+    'tank_contents', 'vessel_cargo', 'vessel_routes',
+    'feedstock_requirements', 'vessel_daily_locations'
+)
+
+# use_memory falls back to building on disk when any input JSON is bigger
+# than this, since the parsed data and the database would both sit in RAM
+_MEMORY_MAX_INPUT_BYTES = 500_000_000
+
+# ijson streams a large top-level object one entry at a time (optional)
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Files above this size are memory-mapped or streamed rather than read into a
+# bytes copy; below it the setup costs more than the copy it saves
+_LARGE_JSON_BYTES = 1_000_000
+
 
 def migrate_from_json(db_path: str = "oasis.db", 
                      static_data_dir: str = "static_data",
                      dynamic_data_dir: str = "dynamic_data",
-                     backup_existing: bool = True) -> Dict[str, Any]:
+                     backup_existing: bool = True,
+                     use_memory: bool = False,
+                     offline: bool = False,
+                     resume: bool = False) -> Dict[str, Any]:
     """
     Migrate all JSON data to SQLite database.
     
@@ -31,6 +153,15 @@ def migrate_from_json(db_path: str = "oasis.db",
         static_data_dir: Path to static data directory
         dynamic_data_dir: Path to dynamic data directory
         backup_existing: Whether to backup existing JSON files
+        use_memory: Build the database in memory and copy it to db_path in one
+            pass at the end, replacing its contents; ignored when any input
+            file is too large to hold in RAM
+        offline: Nothing else has db_path open (command-line runs); together
+            with backup_existing this lets the load skip fsyncs and hold an
+            exclusive lock. Leave False when a server is using the database
+        resume: Skip the files an earlier run migrated, as long as they have
+            not changed since, so a re-run after a partial failure only
+            retries the rest. False migrates every file
     
     Returns:
         Migration results with status and statistics
@@ -45,43 +176,168 @@ def migrate_from_json(db_path: str = "oasis.db",
         'statistics': {}
     }
     
+    db = None
+    fast_load = False
     try:
         # Create database manager
-        db = DatabaseManagerExtended(db_path)
+        in_memory = use_memory and not _any_json_larger_than(
+            (static_data_dir, dynamic_data_dir), _MEMORY_MAX_INPUT_BYTES
+        )
+        db = DatabaseManagerExtended(":memory:" if in_memory else db_path)
         
         # Backup existing files if requested
         if backup_existing:
             backup_dir = f"json_backup_{migration_start.strftime('%Y%m%d_%H%M%S')}"
             _backup_json_files(static_data_dir, dynamic_data_dir, backup_dir)
             results['backup_directory'] = backup_dir
+            
+            # With the JSON backed up and no other users, give up crash safety
+            # for the migration window
+            if offline and not in_memory:
+                db._get_connection().executescript(_FAST_LOAD_PRAGMAS)
+                fast_load = True
         
-        # Migrate static data first (reference data)
-        static_stats = _migrate_static_data(db, static_data_dir, results)
+        # One directory listing each tells every step below which files exist
+        static_files = _scan_json_files(static_data_dir)
+        dynamic_files = _scan_json_files(dynamic_data_dir)
         
-        # Migrate dynamic data (transactional data)
-        dynamic_stats = _migrate_dynamic_data(db, dynamic_data_dir, results)
+        # Size and mtime of each input, recorded with the files that migrate
+        file_stamps = {
+            **_stat_json_files(static_data_dir, static_files),
+            **_stat_json_files(dynamic_data_dir, dynamic_files),
+        }
+        
+        # Load everything in one transaction so the migration commits (and syncs)
+        # once; the per-file writes nest inside it as savepoints
+        with db.transaction("IMMEDIATE") as conn:
+            conn.execute(_SQL_CREATE_MIGRATION_LOG)
+            logged_columns = {row[1] for row in conn.execute("PRAGMA table_info(migration_log)")}
+            for column, ddl in _MIGRATION_LOG_UPGRADES.items():
+                if column not in logged_columns:
+                    conn.execute(ddl)
+            
+            # A resumed run skips the files migration_log records with their
+            # current size and mtime, so it only retries the files that failed
+            # or changed (and the files that resolve ids against them)
+            completed = set()
+            if resume:
+                completed = {
+                    name for name, size, mtime_ns in conn.execute(
+                        "SELECT filename, file_size, file_mtime_ns FROM migration_log"
+                    )
+                    if file_stamps.get(name) == (size, mtime_ns)
+                }
+                completed = {
+                    name for name in completed
+                    if all(prerequisite in completed for prerequisite in _FILE_PREREQUISITES.get(name, ()))
+                }
+            results['skipped_files'] = sorted(completed)
+            static_files -= completed
+            dynamic_files -= completed
+            
+            # Parse the input files in the background so reading and decoding overlap
+            # with the writes; the writes still run on this thread in dependency order
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                parsed = {
+                    path: pool.submit(_load_json, path)
+                    for path in [Path(static_data_dir) / name for name in _STATIC_FILES if name in static_files] +
+                                [Path(dynamic_data_dir) / name for name in _DYNAMIC_FILES if name in dynamic_files]
+                }
+                
+                def load_json(path: Path) -> Any:
+                    return parsed[path].result()
+                
+                # Migrate static data first (reference data)
+                static_stats = _migrate_static_data(db, static_data_dir, results, load_json, static_files)
+
+                # Migrate dynamic data (transactional data), maintaining the
+                # secondary indexes once at the end rather than row by row
+                index_ddl = _drop_secondary_indexes(conn, _DYNAMIC_TABLES)
+                dynamic_stats = _migrate_dynamic_data(db, dynamic_data_dir, results, load_json, dynamic_files)
+                _restore_indexes(conn, index_ddl)
+            
+            file_stats = {**static_stats, **dynamic_stats}
+            conn.executemany(_SQL_LOG_MIGRATED_FILE, [
+                (name, file_stats.get(_FILE_STAT_KEYS[name]), *file_stamps[name])
+                for name in results['migrated_files']
+            ])
         
         # Calculate final statistics
+        migration_end = datetime.now()
         results['statistics'] = {
             **static_stats,
             **dynamic_stats,
-            'total_migration_time_seconds': (datetime.now() - migration_start).total_seconds()
+            'total_migration_time_seconds': (migration_end - migration_start).total_seconds()
         }
         
         results['status'] = 'completed'
-        results['end_time'] = datetime.now().isoformat()
+        results['end_time'] = migration_end.isoformat()
         
-        # Close database
-        db.close()
+        # Gather index statistics for the freshly loaded tables
+        db.analyze()
+        
+        if in_memory:
+            db.backup(db_path)
         
     except Exception as e:
         results['status'] = 'failed'
         results['error'] = str(e)
         results['errors'].append(f"Migration failed: {str(e)}")
     
+    finally:
+        # Restore the writer's settings and close the database, releasing the
+        # exclusive lock even when the migration failed
+        if db is not None:
+            if fast_load:
+                try:
+                    db._get_connection().executescript(_RESTORE_PRAGMAS)
+                except sqlite3.Error as e:
+                    results['errors'].append(f"Failed to restore database settings: {str(e)}")
+            db.close()
+    
     return results
 
 
+def _drop_secondary_indexes(conn, tables: Tuple[str, ...]) -> List[str]:
+    """
+    Drop the explicitly created, non-unique indexes on tables and return their
+    DDL for _restore_indexes. Unique indexes stay, since conflict handling in
+    the inserts depends on them.
+    """
+    placeholders = ", ".join("?" for _ in tables)
+    indexes = conn.execute(f"""
+        SELECT name, sql FROM sqlite_master
+        WHERE type = 'index' AND sql IS NOT NULL AND sql NOT LIKE 'CREATE UNIQUE%'
+          AND tbl_name IN ({placeholders})
+    """, tables).fetchall()
+    for name, _ in indexes:
+        conn.execute(f'DROP INDEX "{name}"')
+    return [sql for _, sql in indexes]
+
+
+def _restore_indexes(conn, index_ddl: List[str]):
+    """Recreate indexes dropped by _drop_secondary_indexes."""
+    for sql in index_ddl:
+        conn.execute(sql)
+
+
+def _reflink_copy(src: str, dst: str) -> str:
+    """
+    shutil.copy2 replacement for copytree that clones the file instead of
+    copying its bytes where the filesystem supports reflinks, and falls back
+    to a regular copy everywhere else.
+    """
+    if fcntl is not None:
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            shutil.copystat(src, dst)
+            return dst
+        except OSError:
+            pass
+    return shutil.copy2(src, dst)
+
+
 def _backup_json_files(static_dir: str, dynamic_dir: str, backup_dir: str):
     """Backup existing JSON files."""
     backup_path = Path(backup_dir)
@@ -91,35 +347,92 @@ def _backup_json_files(static_dir: str, dynamic_dir: str, backup_dir: str):
     static_path = Path(static_dir)
     if static_path.exists():
         static_backup = backup_path / "static_data"
-        shutil.copytree(static_path, static_backup, dirs_exist_ok=True)
+        shutil.copytree(static_path, static_backup, copy_function=_reflink_copy, dirs_exist_ok=True)
     
     # Backup dynamic data
     dynamic_path = Path(dynamic_dir)
     if dynamic_path.exists():
         dynamic_backup = backup_path / "dynamic_data"
-        shutil.copytree(dynamic_path, dynamic_backup, dirs_exist_ok=True)
+        shutil.copytree(dynamic_path, dynamic_backup, copy_function=_reflink_copy, dirs_exist_ok=True)
 
 
-def _migrate_static_data(db: DatabaseManagerExtended, static_dir: str, results: Dict[str, Any]) -> Dict[str, int]:
-    """Migrate static data files."""
+def _scan_json_files(directory: str) -> Set[str]:
+    """Names of the JSON files in directory, from a single directory listing."""
+    try:
+        with os.scandir(directory) as entries:
+            return {entry.name for entry in entries if entry.name.endswith('.json') and entry.is_file()}
+    except FileNotFoundError:
+        return set()
+
+
+def _stat_json_files(directory: str, names: Set[str]) -> Dict[str, Tuple[int, int]]:
+    """(size, mtime in ns) of each named file in directory, for migration_log."""
+    stamps = {}
+    for name in names:
+        stat = os.stat(os.path.join(directory, name))
+        stamps[name] = (stat.st_size, stat.st_mtime_ns)
+    return stamps
+
+
+def _any_json_larger_than(directories, limit: int) -> bool:
+    """Whether any .json file directly inside directories is over limit bytes."""
+    return any(
+        path.stat().st_size > limit
+        for directory in directories
+        for path in Path(directory).glob('*.json')
+    )
+
+
+def _load_json(path: Path) -> Any:
+    """Parse a JSON file, decoding the bytes in one call."""
+    with open(path, 'rb') as f:
+        if _HAS_ORJSON and os.fstat(f.fileno()).st_size > _LARGE_JSON_BYTES:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+                return _json_loads(view)
+        return _json_loads(f.read())
+
+
+def _iter_json_object(path: Path) -> Iterator[Tuple[str, Any]]:
+    """
+    Yield the (key, value) pairs of a file holding one JSON object.
+    
+    Large files are streamed with ijson when it is installed, so only one
+    value is materialized at a time; otherwise the whole file is parsed.
+    """
+    if ijson is not None and path.stat().st_size > _LARGE_JSON_BYTES:
+        with open(path, 'rb') as f:
+            yield from ijson.kvitems(f, '', use_float=True)
+    else:
+        yield from _load_json(path).items()
+
+
+def _migrate_static_data(db: DatabaseManagerExtended, static_dir: str, results: Dict[str, Any],
+                         load_json: Callable[[Path], Any] = _load_json,
+                         present: Optional[Set[str]] = None) -> Dict[str, int]:
+    """Migrate static data files, parsing each through load_json; present lists the files found."""
     static_path = Path(static_dir)
+    if present is None:
+        present = _scan_json_files(static_dir)
     stats = {}
     
     # Migrate crudes.json
     crudes_file = static_path / "crudes.json"
-    if crudes_file.exists():
+    if "crudes.json" in present:
         try:
-            with open(crudes_file, 'r') as f:
-                crudes_data = json.load(f)
+            crudes_data = load_json(crudes_file)
             
+            # One savepoint for the file, so a failure part-way leaves no crudes
+            # behind; upserting by name lets a re-run update crudes that already
+            # exist (tanks.json creates any grade it holds)
             crude_count = 0
-            for crude_name, crude_info in crudes_data.items():
-                db.create_crude(
-                    name=crude_name,
-                    margin=crude_info.get('margin', 15.0),
-                    origin=crude_info.get('origin', 'Unknown')
-                )
-                crude_count += 1
+            with db.transaction():
+                for crude_name, crude_info in crudes_data.items():
+                    db.save_crude({
+                        'name': crude_name,
+                        'margin': crude_info.get('margin', 15.0),
+                        'origin': crude_info.get('origin', 'Unknown')
+                    })
+                    crude_count += 1
             
             stats['crudes_migrated'] = crude_count
             results['migrated_files'].append('crudes.json')
@@ -129,20 +442,21 @@ def _migrate_static_data(db: DatabaseManagerExtended, static_dir: str, results:
     
     # Migrate plant.json
     plant_file = static_path / "plant.json"
-    if plant_file.exists():
+    if "plant.json" in present:
         try:
-            with open(plant_file, 'r') as f:
-                plant_data = json.load(f)
+            plant_data = load_json(plant_file)
             
+            # One savepoint for the file, so a failure part-way leaves no plants behind
             plant_count = 0
-            for plant_name, plant_info in plant_data.items():
-                db.create_plant(
-                    name=plant_name,
-                    capacity=plant_info.get('capacity', 1000),
-                    base_crude_capacity=plant_info.get('base_crude_capacity', 1000),
-                    max_inventory=plant_info.get('max_inventory', 2000)
-                )
-                plant_count += 1
+            with db.transaction():
+                for plant_name, plant_info in plant_data.items():
+                    db.create_plant(
+                        name=plant_name,
+                        capacity=plant_info.get('capacity', 1000),
+                        base_crude_capacity=plant_info.get('base_crude_capacity', 1000),
+                        max_inventory=plant_info.get('max_inventory', 2000)
+                    )
+                    plant_count += 1
             
             stats['plants_migrated'] = plant_count
             results['migrated_files'].append('plant.json')
@@ -152,10 +466,9 @@ def _migrate_static_data(db: DatabaseManagerExtended, static_dir: str, results:
     
     # Migrate recipes.json
     recipes_file = static_path / "recipes.json"
-    if recipes_file.exists():
+    if "recipes.json" in present:
         try:
-            with open(recipes_file, 'r') as f:
-                recipes_data = json.load(f)
+            recipes_data = load_json(recipes_file)
             
             # Convert to list format for batch save
             recipes_list = []
@@ -177,26 +490,23 @@ def _migrate_static_data(db: DatabaseManagerExtended, static_dir: str, results:
     
     # Migrate routes.json
     routes_file = static_path / "routes.json"
-    if routes_file.exists():
+    if "routes.json" in present:
         try:
-            with open(routes_file, 'r') as f:
-                routes_data = json.load(f)
+            routes_data = load_json(routes_file)
             
-            route_count = 0
+            route_rows = [
+                (
+                    route_info.get('origin', ''),
+                    route_info.get('destination', ''),
+                    route_info.get('time_travel', 1),
+                    route_info.get('cost', 10000)
+                )
+                for route_info in routes_data
+            ]
             with db.transaction() as conn:
-                for route_info in routes_data:
-                    conn.execute("""
-                        INSERT OR IGNORE INTO routes (origin, destination, time_travel, cost) 
-                        VALUES (?, ?, ?, ?)
-                    """, (
-                        route_info.get('origin', ''),
-                        route_info.get('destination', ''),
-                        route_info.get('time_travel', 1),
-                        route_info.get('cost', 10000)
-                    ))
-                    route_count += 1
+                conn.executemany(_SQL_INSERT_ROUTE, route_rows)
             
-            stats['routes_migrated'] = route_count
+            stats['routes_migrated'] = len(route_rows)
             results['migrated_files'].append('routes.json')
             
         except Exception as e:
@@ -205,17 +515,23 @@ def _migrate_static_data(db: DatabaseManagerExtended, static_dir: str, results:
     return stats
 
 
-def _migrate_dynamic_data(db: DatabaseManagerExtended, dynamic_dir: str, results: Dict[str, Any]) -> Dict[str, int]:
-    """Migrate dynamic data files."""
+def _migrate_dynamic_data(db: DatabaseManagerExtended, dynamic_dir: str, results: Dict[str, Any],
+                          load_json: Callable[[Path], Any] = _load_json,
+                          present: Optional[Set[str]] = None) -> Dict[str, int]:
+    """
+    Migrate dynamic data files, parsing each through load_json (vessel_routes.json
+    is streamed); present lists the files found.
+    """
     dynamic_path = Path(dynamic_dir)
+    if present is None:
+        present = _scan_json_files(dynamic_dir)
     stats = {}
     
     # Migrate tanks.json
     tanks_file = dynamic_path / "tanks.json"
-    if tanks_file.exists():
+    if "tanks.json" in present:
         try:
-            with open(tanks_file, 'r') as f:
-                tanks_data = json.load(f)
+            tanks_data = load_json(tanks_file)
             
             db.save_tanks_data(tanks_data)
             stats['tanks_migrated'] = len(tanks_data)
@@ -226,10 +542,9 @@ def _migrate_dynamic_data(db: DatabaseManagerExtended, dynamic_dir: str, results
     
     # Migrate vessels.json
     vessels_file = dynamic_path / "vessels.json"
-    if vessels_file.exists():
+    if "vessels.json" in present:
         try:
-            with open(vessels_file, 'r') as f:
-                vessels_data = json.load(f)
+            vessels_data = load_json(vessels_file)
             
             db.save_vessels_data(vessels_data)
             stats['vessels_migrated'] = len(vessels_data)
@@ -240,34 +555,30 @@ def _migrate_dynamic_data(db: DatabaseManagerExtended, dynamic_dir: str, results
     
     # Migrate feedstock_requirements.json
     requirements_file = dynamic_path / "feedstock_requirements.json"
-    if requirements_file.exists():
+    if "feedstock_requirements.json" in present:
         try:
-            with open(requirements_file, 'r') as f:
-                requirements_data = json.load(f)
+            requirements_data = load_json(requirements_file)
             
-            requirement_count = 0
+            requirement_rows = []
             with db.transaction() as conn:
+                # The file replaces the table, so re-running it after its crudes
+                # prerequisite does not duplicate the requirements
+                conn.execute("DELETE FROM feedstock_requirements")
+                
+                # Resolve grades against one name -> id map instead of a query per row
+                crude_ids = db._crude_ids()
                 for req in requirements_data:
-                    # Get crude ID
-                    crude_cursor = conn.execute("SELECT id FROM crudes WHERE name = ?", (req.get('grade', ''),))
-                    crude_row = crude_cursor.fetchone()
+                    crude_id = crude_ids.get(req.get('grade', ''))
                     
-                    if crude_row:
-                        crude_id = crude_row['id']
-                        
-                        # Extract LDR dates
-                        allowed_ldr = req.get('allowed_ldr', {})
-                        if isinstance(allowed_ldr, dict) and allowed_ldr:
-                            ldr_start = next(iter(allowed_ldr.keys()), 0)
-                            ldr_end = next(iter(allowed_ldr.values()), 0)
+                    if crude_id is not None:
+                        # Extract LDR dates from the first {start: end} pair
+                        allowed_ldr = req.get('allowed_ldr') or {}
+                        if isinstance(allowed_ldr, dict):
+                            ldr_start, ldr_end = next(iter(allowed_ldr.items()), (0, 0))
                         else:
                             ldr_start = ldr_end = 0
                         
-                        conn.execute("""
-                            INSERT INTO feedstock_requirements 
-                            (crude_id, volume, origin, allowed_ldr_start, allowed_ldr_end, required_arrival_by) 
-                            VALUES (?, ?, ?, ?, ?, ?)
-                        """, (
+                        requirement_rows.append((
                             crude_id,
                             req.get('volume', 0),
                             req.get('origin', ''),
@@ -275,9 +586,10 @@ def _migrate_dynamic_data(db: DatabaseManagerExtended, dynamic_dir: str, results
                             ldr_end,
                             req.get('required_arrival_by', 30)
                         ))
-                        requirement_count += 1
+                
+                conn.executemany(_SQL_INSERT_FEEDSTOCK, requirement_rows)
             
-            stats['feedstock_requirements_migrated'] = requirement_count
+            stats['feedstock_requirements_migrated'] = len(requirement_rows)
             results['migrated_files'].append('feedstock_requirements.json')
             
         except Exception as e:
@@ -285,29 +597,25 @@ def _migrate_dynamic_data(db: DatabaseManagerExtended, dynamic_dir: str, results
     
     # Migrate vessel_routes.json (daily locations)
     vessel_routes_file = dynamic_path / "vessel_routes.json"
-    if vessel_routes_file.exists():
+    if "vessel_routes.json" in present:
         try:
-            with open(vessel_routes_file, 'r') as f:
-                vessel_routes_data = json.load(f)
-            
             location_count = 0
             with db.transaction() as conn:
-                for vessel_id, route_info in vessel_routes_data.items():
-                    # Get vessel database ID
-                    vessel_cursor = conn.execute("SELECT id FROM vessels WHERE vessel_id = ?", (vessel_id,))
-                    vessel_row = vessel_cursor.fetchone()
+                vessel_ids = dict(conn.execute("SELECT vessel_id, id FROM vessels"))
+                for vessel_id, route_info in _iter_json_object(vessel_routes_file):
+                    vessel_db_id = vessel_ids.get(vessel_id)
                     
-                    if vessel_row:
-                        vessel_db_id = vessel_row['id']
+                    if vessel_db_id is not None:
+                        # Add daily locations, one batch per vessel so a streamed
+                        # file never holds more than one vessel's rows
+                        location_rows = [
+                            (vessel_db_id, int(day_str), location)
+                            for day_str, location in route_info.get('days', {}).items()
+                            if location  # Skip empty locations
+                        ]
                         
-                        # Add daily locations
-                        for day_str, location in route_info.get('days', {}).items():
-                            if location:  # Skip empty locations
-                                conn.execute("""
-                                    INSERT OR REPLACE INTO vessel_daily_locations 
-                                    (vessel_id, day, location) VALUES (?, ?, ?)
-                                """, (vessel_db_id, int(day_str), location))
-                                location_count += 1
+                        conn.executemany(_SQL_INSERT_VESSEL_LOCATION, location_rows)
+                        location_count += len(location_rows)
             
             stats['vessel_daily_locations_migrated'] = location_count
             results['migrated_files'].append('vessel_routes.json')
@@ -348,33 +656,31 @@ def verify_migration(db_path: str = "oasis.db") -> Dict[str, Any]:
     }
     
     try:
-        conn = db._get_connection()
-        
-        # Check each table
-        tables = [
-            'plants', 'crudes', 'tanks', 'tank_contents', 'blending_recipes',
-            'vessels', 'vessel_cargo', 'vessel_routes', 'routes',
-            'feedstock_requirements', 'vessel_daily_locations'
-        ]
+        # Counts and orphan checks read one snapshot, one query each
+        with db._read_snapshot() as conn:
+            # Check each table
+            tables = [
+                'plants', 'crudes', 'tanks', 'tank_contents', 'blending_recipes',
+                'vessels', 'vessel_cargo', 'vessel_routes', 'routes',
+                'feedstock_requirements', 'vessel_daily_locations'
+            ]
         
-        for table in tables:
-            cursor = conn.execute(f"SELECT COUNT(*) as count FROM {table}")
-            count = cursor.fetchone()['count']
-            verification['data_counts'][table] = count
-            verification['tables_verified'].append(table)
+            verification['data_counts'] = db.get_table_counts(tables)
+            verification['tables_verified'].extend(tables)
         
-        # Check for orphaned records
-        orphan_checks = [
-            ("tank_contents without tanks", "SELECT COUNT(*) FROM tank_contents tc LEFT JOIN tanks t ON tc.tank_id = t.id WHERE t.id IS NULL"),
-            ("vessel_cargo without vessels", "SELECT COUNT(*) FROM vessel_cargo vc LEFT JOIN vessels v ON vc.vessel_id = v.id WHERE v.id IS NULL"),
-            ("vessel_routes without vessels", "SELECT COUNT(*) FROM vessel_routes vr LEFT JOIN vessels v ON vr.vessel_id = v.id WHERE v.id IS NULL"),
-        ]
+            # Check for orphaned records
+            orphan_checks = [
+                ("tank_contents without tanks", "SELECT COUNT(*) FROM tank_contents tc LEFT JOIN tanks t ON tc.tank_id = t.id WHERE t.id IS NULL"),
+                ("vessel_cargo without vessels", "SELECT COUNT(*) FROM vessel_cargo vc LEFT JOIN vessels v ON vc.vessel_id = v.id WHERE v.id IS NULL"),
+                ("vessel_routes without vessels", "SELECT COUNT(*) FROM vessel_routes vr LEFT JOIN vessels v ON vr.vessel_id = v.id WHERE v.id IS NULL"),
+            ]
+            orphan_counts = conn.execute(
+                "SELECT " + ", ".join(f"({query})" for _, query in orphan_checks)
+            ).fetchone()
         
-        for check_name, query in orphan_checks:
-            cursor = conn.execute(query)
-            count = cursor.fetchone()[0]
-            if count > 0:
-                verification['issues'].append(f"{check_name}: {count} orphaned records")
+            for (check_name, _), count in zip(orphan_checks, orphan_counts):
+                if count > 0:
+                    verification['issues'].append(f"{check_name}: {count} orphaned records")
         
         db.close()
         
@@ -389,13 +695,18 @@ if __name__ == "__main__":
     # Run migration if called directly
     import sys
     
-    static_dir = sys.argv[1] if len(sys.argv) > 1 else "static_data"
-    dynamic_dir = sys.argv[2] if len(sys.argv) > 2 else "dynamic_data"
+    # --resume skips the files an earlier, partly failed run already migrated
+    resume = "--resume" in sys.argv[1:]
+    args = [arg for arg in sys.argv[1:] if arg != "--resume"]
+    static_dir = args[0] if len(args) > 0 else "static_data"
+    dynamic_dir = args[1] if len(args) > 1 else "dynamic_data"
     
     print("Starting OASIS database migration...")
     results = migrate_from_json(
         static_data_dir=static_dir,
-        dynamic_data_dir=dynamic_dir
+        dynamic_data_dir=dynamic_dir,
+        offline=True,
+        resume=resume
     )
     
     print(f"Migration {results['status']}")
@@ -5,14 +5,21 @@ OpenAI function calling integration for comprehensive system data access
 Copyright (c) by Abu Huzaifah Bidin with help from Github Copilot
 """
 
+import copy
 import json
+import operator
 import os
-from typing import Dict, List, Any, Optional
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 from dotenv import load_dotenv
 import openai
 
 from database.extended_ops import DatabaseManagerExtended
+from database.db_manager import with_iso_timestamps
 from scheduler import (
     Scheduler, VesselOptimizer, SchedulerOptimizer,
     Tank, Vessel, Crude, Route, FeedstockParcel, FeedstockRequirement, DailyPlan
@@ -23,347 +30,418 @@ from scheduler.models import BlendingRecipe
 load_dotenv()
 openai.api_key = os.getenv('OPENAI_API_KEY')
 
-class OASISLLMFunctions:
-    """OpenAI function calling handler for OASIS system."""
-    
-    def __init__(self, db_path: str):
-        self.db = DatabaseManagerExtended(db_path)
-        self.client = openai.OpenAI()
-        self._cached_data = {}
-        self._last_refresh_time = None
-        self._refresh_interval = 5  # Refresh data every 5 seconds minimum
-        
-    def get_function_schemas(self) -> List[Dict]:
-        """Get all available function schemas for OpenAI."""
-        return [
-            # Tank Operations
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_tank_status",
-                    "description": "Get status and inventory for all tanks or a specific tank",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "tank_name": {
-                                "type": "string",
-                                "description": "Optional: specific tank name to query"
-                            }
-                        }
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "update_tank_inventory",
-                    "description": "Update tank inventory levels for a specific crude type",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "tank_name": {
-                                "type": "string",
-                                "description": "Name of the tank to update"
-                            },
-                            "crude_name": {
-                                "type": "string",
-                                "description": "Name of the crude type"
-                            },
-                            "volume": {
-                                "type": "number",
-                                "description": "New volume in kbbl"
-                            }
-                        },
-                        "required": ["tank_name", "crude_name", "volume"]
+
+@lru_cache(maxsize=8)
+def _openai_client(api_key: Optional[str]) -> openai.OpenAI:
+    """Process-wide OpenAI client per API key, so its HTTP connection pool is reused."""
+    return openai.OpenAI(api_key=api_key)
+
+
+# Function schemas offered to OpenAI; built once at import and shared by every call
+_FUNCTION_SCHEMAS = [
+    # Tank Operations
+    {
+        "type": "function",
+        "function": {
+            "name": "get_tank_status",
+            "description": "Get status and inventory for all tanks or a specific tank",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "tank_name": {
+                        "type": "string",
+                        "description": "Optional: specific tank name to query"
                     }
                 }
-            },
-            
-            # Vessel Operations
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_vessel_schedule",
-                    "description": "Get vessel schedule information, arrivals, cargo details",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "vessel_id": {
-                                "type": "string",
-                                "description": "Optional: specific vessel ID to query"
-                            },
-                            "days_ahead": {
-                                "type": "number",
-                                "description": "Number of days ahead to look for arrivals (default: 30)"
-                            }
-                        }
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "update_tank_inventory",
+            "description": "Update tank inventory levels for a specific crude type",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "tank_name": {
+                        "type": "string",
+                        "description": "Name of the tank to update"
+                    },
+                    "crude_name": {
+                        "type": "string",
+                        "description": "Name of the crude type"
+                    },
+                    "volume": {
+                        "type": "number",
+                        "description": "New volume in kbbl"
                     }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "modify_vessel_arrival",
-                    "description": "Modify vessel arrival day or cargo details",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "vessel_id": {
-                                "type": "string",
-                                "description": "Vessel ID to modify"
-                            },
-                            "arrival_day": {
-                                "type": "number",
-                                "description": "New arrival day"
-                            },
-                            "cargo_updates": {
-                                "type": "array",
-                                "description": "Optional cargo modifications",
-                                "items": {
-                                    "type": "object",
-                                    "properties": {
-                                        "grade": {"type": "string"},
-                                        "volume": {"type": "number"},
-                                        "origin": {"type": "string"}
-                                    }
-                                }
-                            }
-                        },
-                        "required": ["vessel_id"]
+                },
+                "required": ["tank_name", "crude_name", "volume"]
+            }
+        }
+    },
+    
+    # Vessel Operations
+    {
+        "type": "function",
+        "function": {
+            "name": "get_vessel_schedule",
+            "description": "Get vessel schedule information, arrivals, cargo details",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "vessel_id": {
+                        "type": "string",
+                        "description": "Optional: specific vessel ID to query"
+                    },
+                    "days_ahead": {
+                        "type": "number",
+                        "description": "Number of days ahead to look for arrivals (default: 30)"
                     }
                 }
-            },
-            
-            # Production and Recipe Operations  
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_production_metrics",
-                    "description": "Get production metrics, throughput, margin analysis, and day-specific details from actual schedule data",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "days": {
-                                "type": "number",
-                                "description": "Number of days to analyze (default: 30)"
-                            },
-                            "metric_type": {
-                                "type": "string",
-                                "enum": ["throughput", "margin", "inventory", "all"],
-                                "description": "Type of metrics to retrieve"
-                            },
-                            "specific_day": {
-                                "type": "number",
-                                "description": "Optional: Get detailed analysis for a specific day (0-indexed)"
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "modify_vessel_arrival",
+            "description": "Modify vessel arrival day or cargo details",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "vessel_id": {
+                        "type": "string",
+                        "description": "Vessel ID to modify"
+                    },
+                    "arrival_day": {
+                        "type": "number",
+                        "description": "New arrival day"
+                    },
+                    "cargo_updates": {
+                        "type": "array",
+                        "description": "Optional cargo modifications",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "grade": {"type": "string"},
+                                "volume": {"type": "number"},
+                                "origin": {"type": "string"}
                             }
                         }
                     }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_crude_information",
-                    "description": "Get crude oil properties, margins, and availability",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "crude_name": {
-                                "type": "string", 
-                                "description": "Optional: specific crude name to query"
-                            }
-                        }
+                },
+                "required": ["vessel_id"]
+            }
+        }
+    },
+    
+    # Production and Recipe Operations  
+    {
+        "type": "function",
+        "function": {
+            "name": "get_production_metrics",
+            "description": "Get production metrics, throughput, margin analysis, and day-specific details from actual schedule data",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "days": {
+                        "type": "number",
+                        "description": "Number of days to analyze (default: 30)"
+                    },
+                    "metric_type": {
+                        "type": "string",
+                        "enum": ["throughput", "margin", "inventory", "all"],
+                        "description": "Type of metrics to retrieve"
+                    },
+                    "specific_day": {
+                        "type": "number",
+                        "description": "Optional: Get detailed analysis for a specific day (0-indexed)"
                     }
                 }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_blending_recipes",
-                    "description": "Get blending recipe configurations and production rates",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "recipe_name": {
-                                "type": "string",
-                                "description": "Optional: specific recipe name to query"
-                            }
-                        }
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_crude_information",
+            "description": "Get crude oil properties, margins, and availability",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "crude_name": {
+                        "type": "string", 
+                        "description": "Optional: specific crude name to query"
                     }
                 }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "analyze_schedule_performance",
-                    "description": "Comprehensive analysis of schedule performance including multi-recipe operations and transitions",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "analysis_type": {
-                                "type": "string",
-                                "enum": ["transitions", "multi_recipe", "efficiency", "all"],
-                                "description": "Type of schedule analysis to perform"
-                            },
-                            "days": {
-                                "type": "number",
-                                "description": "Number of days to analyze (default: 30)"
-                            }
-                        }
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_blending_recipes",
+            "description": "Get blending recipe configurations and production rates",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "recipe_name": {
+                        "type": "string",
+                        "description": "Optional: specific recipe name to query"
                     }
                 }
-            },
-            
-            # Optimization Operations
-            {
-                "type": "function", 
-                "function": {
-                    "name": "run_schedule_optimization",
-                    "description": "Run schedule optimization to maximize throughput or margin using optimizer.py.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "optimization_type": {
-                                "type": "string",
-                                "enum": ["margin", "throughput"],
-                                "description": "Type of optimization to perform"
-                            },
-                            "horizon_days": {
-                                "type": "number",
-                                "description": "Optimization horizon in days (default: 30)"
-                            }
-                        },
-                        "required": ["optimization_type"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "analyze_schedule_performance",
+            "description": "Comprehensive analysis of schedule performance including multi-recipe operations and transitions",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "analysis_type": {
+                        "type": "string",
+                        "enum": ["transitions", "multi_recipe", "efficiency", "all"],
+                        "description": "Type of schedule analysis to perform"
+                    },
+                    "days": {
+                        "type": "number",
+                        "description": "Number of days to analyze (default: 30)"
                     }
                 }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "run_vessel_optimization",
-                    "description": "Run vessel scheduling and feedstock delivery optimization using vessel_optimizer.py.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "horizon_days": {
-                                "type": "number",
-                                "description": "Optimization horizon in days (default: 30)"
-                            },
-                            "cost_per_deployed_vessel": {
-                                "type": "number",
-                                "description": "Cost per deployed vessel (default: 1000)"
-                            },
-                            "penalty_per_unmet_requirement": {
-                                "type": "number",
-                                "description": "Penalty for each unmet requirement (default: 100000)"
-                            }
-                        }
+            }
+        }
+    },
+    
+    # Optimization Operations
+    {
+        "type": "function", 
+        "function": {
+            "name": "run_schedule_optimization",
+            "description": "Run schedule optimization to maximize throughput or margin using optimizer.py.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "optimization_type": {
+                        "type": "string",
+                        "enum": ["margin", "throughput"],
+                        "description": "Type of optimization to perform"
+                    },
+                    "horizon_days": {
+                        "type": "number",
+                        "description": "Optimization horizon in days (default: 30)"
+                    }
+                },
+                "required": ["optimization_type"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "run_vessel_optimization",
+            "description": "Run vessel scheduling and feedstock delivery optimization using vessel_optimizer.py.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "horizon_days": {
+                        "type": "number",
+                        "description": "Optimization horizon in days (default: 30)"
+                    },
+                    "cost_per_deployed_vessel": {
+                        "type": "number",
+                        "description": "Cost per deployed vessel (default: 1000)"
+                    },
+                    "penalty_per_unmet_requirement": {
+                        "type": "number",
+                        "description": "Penalty for each unmet requirement (default: 100000)"
                     }
                 }
-            },
-            
-            # Analysis and Reporting
-            {
-                "type": "function",
-                "function": {
-                    "name": "analyze_inventory_trends",
-                    "description": "Analyze inventory trends and predict shortages or surpluses",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "crude_type": {
-                                "type": "string",
-                                "description": "Optional: focus on specific crude type"
-                            },
-                            "days_ahead": {
-                                "type": "number", 
-                                "description": "Days ahead to analyze (default: 14)"
-                            }
-                        }
+            }
+        }
+    },
+    
+    # Analysis and Reporting
+    {
+        "type": "function",
+        "function": {
+            "name": "analyze_inventory_trends",
+            "description": "Analyze inventory trends and predict shortages or surpluses",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "crude_type": {
+                        "type": "string",
+                        "description": "Optional: focus on specific crude type"
+                    },
+                    "days_ahead": {
+                        "type": "number", 
+                        "description": "Days ahead to analyze (default: 14)"
                     }
                 }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_feedstock_requirements",
-                    "description": "Get feedstock requirements and delivery schedules",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "grade": {
-                                "type": "string",
-                                "description": "Optional: specific grade to query"
-                            },
-                            "urgent_only": {
-                                "type": "boolean",
-                                "description": "Only show urgent requirements (default: false)"
-                            }
-                        }
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_feedstock_requirements",
+            "description": "Get feedstock requirements and delivery schedules",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "grade": {
+                        "type": "string",
+                        "description": "Optional: specific grade to query"
+                    },
+                    "urgent_only": {
+                        "type": "boolean",
+                        "description": "Only show urgent requirements (default: false)"
                     }
                 }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "generate_system_summary",
-                    "description": "Generate comprehensive system status summary",
-                    "parameters": {
-                        "type": "object", 
-                        "properties": {
-                            "include_forecasts": {
-                                "type": "boolean",
-                                "description": "Include future predictions (default: true)"
-                            },
-                            "detail_level": {
-                                "type": "string",
-                                "enum": ["high", "medium", "low"],
-                                "description": "Level of detail in summary"
-                            }
-                        }
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "generate_system_summary",
+            "description": "Generate comprehensive system status summary",
+            "parameters": {
+                "type": "object", 
+                "properties": {
+                    "include_forecasts": {
+                        "type": "boolean",
+                        "description": "Include future predictions (default: true)"
+                    },
+                    "detail_level": {
+                        "type": "string",
+                        "enum": ["high", "medium", "low"],
+                        "description": "Level of detail in summary"
                     }
                 }
             }
-        ]
+        }
+    }
+]
+
+# Schedule results written by the optimizers and the save-schedule endpoint
+_SCHEDULE_RESULTS_PATH = os.path.join(os.path.dirname(__file__), 'output', 'schedule_results.json')
+
+# Read-only functions whose results are reused for identical arguments until
+# the database changes, the data is next refreshed, or one of the other
+# functions runs
+_CACHEABLE_FUNCTIONS = frozenset({
+    "get_tank_status",
+    "get_vessel_schedule",
+    "get_crude_information",
+    "get_blending_recipes",
+    "analyze_inventory_trends",
+    "generate_system_summary",
+    "get_feedstock_requirements",
+    "get_production_metrics",
+})
+_RESULT_CACHE_SIZE = 128
+
+# Cacheable functions that also read the schedule results file, whose writes do
+# not bump the database data version; their cache key carries the file's mtime
+_SCHEDULE_READING_FUNCTIONS = frozenset({
+    "get_production_metrics",
+    "generate_system_summary",
+})
+
+# System data read during one execute_function call. A context variable rather
+# than instance state, since the API shares one OASISLLMFunctions between
+# concurrent requests (threads or greenlets) that must not see or clear each
+# other's reads
+_call_data: ContextVar[Optional[Dict[str, Any]]] = ContextVar('oasis_llm_call_data', default=None)
+
+
+class OASISLLMFunctions:
+    """OpenAI function calling handler for OASIS system."""
+    
+    def __init__(self, db_path: str, db: Optional[DatabaseManagerExtended] = None):
+        # Share the caller's manager (and its per-thread connections) when given one
+        self.db = db if db is not None else DatabaseManagerExtended(db_path)
+        self.client = _openai_client(os.getenv('OPENAI_API_KEY'))
+        self._last_refresh_time = None
+        self._refresh_interval = 5  # Refresh data every 5 seconds minimum
+        self._result_cache = OrderedDict()  # "name|data version|json args" -> result, oldest first
+        self._result_cache_lock = threading.Lock()
+        
+        # Function name -> bound handler, so execute_function routes with one lookup
+        self._dispatch = {
+            "get_tank_status": self._get_tank_status,
+            "update_tank_inventory": self._update_tank_inventory,
+            "get_vessel_schedule": self._get_vessel_schedule,
+            "modify_vessel_arrival": self._modify_vessel_arrival,
+            "get_production_metrics": self._get_production_metrics,
+            "get_crude_information": self._get_crude_information,
+            "get_blending_recipes": self._get_blending_recipes,
+            "analyze_schedule_performance": self._analyze_schedule_performance,
+            "run_schedule_optimization": self._run_schedule_optimization,
+            "run_vessel_optimization": self._run_vessel_optimization,
+            "analyze_inventory_trends": self._analyze_inventory_trends,
+            "get_feedstock_requirements": self._get_feedstock_requirements,
+            "generate_system_summary": self._generate_system_summary,
+        }
+        
+    def get_function_schemas(self) -> List[Dict]:
+        """Get all available function schemas for OpenAI."""
+        return _FUNCTION_SCHEMAS
     
     def execute_function(self, function_name: str, arguments: Dict) -> Dict[str, Any]:
         """Execute a function call and return the result."""
+        # Start every call from fresh data, fetched at most once per call
+        token = _call_data.set({})
         try:
             # AUTOMATIC DATA REFRESH: Refresh all data before executing any function
             refresh_result = self._refresh_system_data()
+            if refresh_result["status"] != "skipped":
+                with self._result_cache_lock:
+                    self._result_cache.clear()
             
             # Route to appropriate function
-            if function_name == "get_tank_status":
-                return self._get_tank_status(**arguments)
-            elif function_name == "update_tank_inventory":
-                return self._update_tank_inventory(**arguments)
-            elif function_name == "get_vessel_schedule":
-                return self._get_vessel_schedule(**arguments)
-            elif function_name == "modify_vessel_arrival":
-                return self._modify_vessel_arrival(**arguments)
-            elif function_name == "get_production_metrics":
-                return self._get_production_metrics(**arguments)
-            elif function_name == "get_crude_information":
-                return self._get_crude_information(**arguments)
-            elif function_name == "get_blending_recipes":
-                return self._get_blending_recipes(**arguments)
-            elif function_name == "analyze_schedule_performance":
-                return self._analyze_schedule_performance(**arguments)
-            elif function_name == "run_schedule_optimization":
-                return self._run_schedule_optimization(**arguments)
-            elif function_name == "run_vessel_optimization":
-                return self._run_vessel_optimization(**arguments)
-            elif function_name == "analyze_inventory_trends":
-                return self._analyze_inventory_trends(**arguments)
-            elif function_name == "get_feedstock_requirements":
-                return self._get_feedstock_requirements(**arguments)
-            elif function_name == "generate_system_summary":
-                return self._generate_system_summary(**arguments)
-            else:
+            handler = self._dispatch.get(function_name)
+            if handler is None:
                 return {"error": f"Unknown function: {function_name}"}
+            
+            if function_name not in _CACHEABLE_FUNCTIONS:
+                result = handler(**arguments)
+                # Updates and optimization runs change what the read-only functions report
+                with self._result_cache_lock:
+                    self._result_cache.clear()
+                return result
+            
+            # Serve identical read-only calls from the result cache; the data version
+            # in the key retires entries as soon as any process writes the database,
+            # and the schedule file's mtime as soon as a new schedule is saved
+            key = f"{function_name}|{self.db.get_schema_version()}|{json.dumps(arguments, sort_keys=True)}"
+            if function_name in _SCHEDULE_READING_FUNCTIONS:
+                key += f"|{self._schedule_results_mtime()}"
+            with self._result_cache_lock:
+                result = self._result_cache.get(key)
+                if result is not None:
+                    self._result_cache.move_to_end(key)
+                    # A copy, so a caller editing its result cannot change the cache
+                    return copy.deepcopy(result)
+            
+            result = handler(**arguments)
+            if "error" not in result:
+                with self._result_cache_lock:
+                    self._result_cache[key] = copy.deepcopy(result)
+                    if len(self._result_cache) > _RESULT_CACHE_SIZE:
+                        self._result_cache.popitem(last=False)
+            return result
                 
         except Exception as e:
             return {"error": f"Function execution failed: {str(e)}"}
+        finally:
+            _call_data.reset(token)
     
     def _refresh_system_data(self) -> Dict[str, Any]:
         """
@@ -387,8 +465,9 @@ class OASISLLMFunctions:
         try:
             print(f"🔄 Refreshing system data at {current_time.strftime('%H:%M:%S')}")
             
-            # Clear cached data
-            self._cached_data.clear()
+            # Cached data for this call
+            cached_data = self._call_data()
+            cached_data.clear()
             
             # Refresh database connection if needed
             # The database manager should handle connection pooling
@@ -399,7 +478,7 @@ class OASISLLMFunctions:
             # 1. Refresh tank data
             try:
                 tanks = self.db.get_all_tanks()
-                self._cached_data['tanks'] = tanks
+                cached_data['tanks'] = tanks
                 refresh_results['tanks'] = f"✅ {len(tanks)} tanks refreshed"
             except Exception as e:
                 refresh_results['tanks'] = f"❌ Tank refresh failed: {str(e)}"
@@ -407,7 +486,7 @@ class OASISLLMFunctions:
             # 2. Refresh vessel data
             try:
                 vessels = self.db.get_all_vessels()
-                self._cached_data['vessels'] = vessels
+                cached_data['vessels'] = vessels
                 refresh_results['vessels'] = f"✅ {len(vessels)} vessels refreshed"
             except Exception as e:
                 refresh_results['vessels'] = f"❌ Vessel refresh failed: {str(e)}"
@@ -415,7 +494,7 @@ class OASISLLMFunctions:
             # 3. Refresh recipes data
             try:
                 recipes = self.db.get_all_blending_recipes()
-                self._cached_data['recipes'] = recipes
+                cached_data['recipes'] = recipes
                 refresh_results['recipes'] = f"✅ {len(recipes)} recipes refreshed"
             except Exception as e:
                 refresh_results['recipes'] = f"❌ Recipe refresh failed: {str(e)}"
@@ -423,7 +502,7 @@ class OASISLLMFunctions:
             # 4. Refresh feedstock requirements
             try:
                 requirements = self.db.get_all_feedstock_requirements()
-                self._cached_data['feedstock_requirements'] = requirements
+                cached_data['feedstock_requirements'] = requirements
                 refresh_results['feedstock_requirements'] = f"✅ {len(requirements)} requirements refreshed"
             except Exception as e:
                 refresh_results['feedstock_requirements'] = f"❌ Requirements refresh failed: {str(e)}"
@@ -431,7 +510,7 @@ class OASISLLMFunctions:
             # 5. Refresh routes data
             try:
                 routes = self.db.get_all_routes()
-                self._cached_data['routes'] = routes
+                cached_data['routes'] = routes
                 refresh_results['routes'] = f"✅ {len(routes)} routes refreshed"
             except Exception as e:
                 refresh_results['routes'] = f"❌ Routes refresh failed: {str(e)}"
@@ -440,7 +519,7 @@ class OASISLLMFunctions:
             try:
                 schedule_results = self._load_schedule_results()
                 if schedule_results:
-                    self._cached_data['schedule_results'] = schedule_results
+                    cached_data['schedule_results'] = schedule_results
                     refresh_results['schedule_results'] = "✅ Latest schedule results loaded"
                 else:
                     refresh_results['schedule_results'] = "⚠️ No schedule results available"
@@ -459,7 +538,7 @@ class OASISLLMFunctions:
                 "status": "completed",
                 "timestamp": current_time.isoformat(),
                 "refresh_results": refresh_results,
-                "cached_components": list(self._cached_data.keys())
+                "cached_components": list(cached_data.keys())
             }
             
         except Exception as e:
@@ -469,6 +548,51 @@ class OASISLLMFunctions:
                 "timestamp": current_time.isoformat()
             }
     
+    def _call_data(self) -> Dict[str, Any]:
+        """Data cached for the current execute_function call; a throwaway dict outside one."""
+        cached_data = _call_data.get()
+        return cached_data if cached_data is not None else {}
+    
+    def _cached_tanks(self) -> Dict[str, Dict]:
+        """All tanks, read from the database once per function call."""
+        cached_data = self._call_data()
+        tanks = cached_data.get('tanks')
+        if tanks is None:
+            tanks = cached_data['tanks'] = self.db.get_all_tanks()
+        return tanks
+    
+    def _cached_vessels(self) -> Dict[str, Dict]:
+        """All vessels, read from the database once per function call."""
+        cached_data = self._call_data()
+        vessels = cached_data.get('vessels')
+        if vessels is None:
+            vessels = cached_data['vessels'] = self.db.get_all_vessels()
+        return vessels
+    
+    def _cached_recipes(self) -> List[Dict]:
+        """All blending recipes, read from the database once per function call."""
+        cached_data = self._call_data()
+        recipes = cached_data.get('recipes')
+        if recipes is None:
+            recipes = cached_data['recipes'] = self.db.get_all_blending_recipes()
+        return recipes
+    
+    def _recipe_index(self) -> Dict[str, Dict]:
+        """Cached recipes keyed by name."""
+        cached_data = self._call_data()
+        index = cached_data.get('recipe_index')
+        if index is None:
+            index = cached_data['recipe_index'] = {r['name']: r for r in self._cached_recipes()}
+        return index
+    
+    def _tank_totals(self) -> Tuple[float, float, Dict[str, float]]:
+        """Aggregate of the cached tanks, computed once per function call."""
+        cached_data = self._call_data()
+        totals = cached_data.get('tank_totals')
+        if totals is None:
+            totals = cached_data['tank_totals'] = self._aggregate_tanks(self._cached_tanks())
+        return totals
+    
     # Tank Operations
     def _get_tank_status(self, tank_name: Optional[str] = None) -> Dict[str, Any]:
         """Get tank status and inventory."""
@@ -476,14 +600,10 @@ class OASISLLMFunctions:
             tank = self.db.get_tank(name=tank_name)
             if not tank:
                 return {"error": f"Tank '{tank_name}' not found"}
-            return {"tank": tank}
+            return {"tank": with_iso_timestamps(tank)}
         else:
-            tanks = self.db.get_all_tanks()
-            total_capacity = sum(t['capacity'] for t in tanks.values())
-            total_inventory = sum(
-                sum(sum(content.values()) for content in t['content']) 
-                for t in tanks.values()
-            )
+            tanks = self._cached_tanks()
+            total_capacity, total_inventory, _ = self._tank_totals()
             
             return {
                 "tanks": tanks,
@@ -510,9 +630,9 @@ class OASISLLMFunctions:
             vessel = self.db.get_vessel(vessel_id=vessel_id)
             if not vessel:
                 return {"error": f"Vessel '{vessel_id}' not found"}
-            return {"vessel": vessel}
+            return {"vessel": with_iso_timestamps(vessel)}
         else:
-            vessels = self.db.get_all_vessels()
+            vessels = self._cached_vessels()
             current_day = 1  # Could be calculated from system date
             upcoming_arrivals = []
             
@@ -527,7 +647,7 @@ class OASISLLMFunctions:
                     })
             
             return {
-                "vessels": vessels,
+                "vessels": {vid: with_iso_timestamps(vessel) for vid, vessel in vessels.items()},
                 "upcoming_arrivals": sorted(upcoming_arrivals, key=lambda x: x['arrival_day']),
                 "total_vessels": len(vessels)
             }
@@ -582,7 +702,7 @@ class OASISLLMFunctions:
                 metrics["margin"] = margin_data
             
             if metric_type in ["inventory", "all"]:
-                inventory_data = self._analyze_inventory_trends(analyzed_days)
+                inventory_data = self._analyze_inventory_levels(analyzed_days)
                 metrics["inventory"] = inventory_data
             
             if metric_type == "all":
@@ -598,14 +718,23 @@ class OASISLLMFunctions:
         except Exception as e:
             return {"error": f"Failed to analyze production metrics: {str(e)}"}
     
-    def _calculate_inventory_by_grade(self, tanks: Dict) -> Dict[str, float]:
-        """Calculate inventory levels by crude grade."""
+    def _aggregate_tanks(self, tanks: Dict) -> Tuple[float, float, Dict[str, float]]:
+        """Total capacity, total inventory and inventory by grade in one pass."""
+        total_capacity = 0
+        total_inventory = 0
         inventory_by_grade = {}
+        by_grade_get = inventory_by_grade.get
         for tank in tanks.values():
-            for content in tank.get('content', []):
+            total_capacity += tank['capacity']
+            for content in tank.get('content', ()):
                 for grade, volume in content.items():
-                    inventory_by_grade[grade] = inventory_by_grade.get(grade, 0) + volume
-        return inventory_by_grade
+                    total_inventory += volume
+                    inventory_by_grade[grade] = by_grade_get(grade, 0) + volume
+        return total_capacity, total_inventory, inventory_by_grade
+    
+    def _calculate_inventory_by_grade(self, tanks: Dict) -> Dict[str, float]:
+        """Calculate inventory levels by crude grade."""
+        return self._aggregate_tanks(tanks)[2]
     
     # Crude Information
     def _get_crude_information(self, crude_name: Optional[str] = None) -> Dict[str, Any]:
@@ -641,14 +770,13 @@ class OASISLLMFunctions:
     # Blending Recipes
     def _get_blending_recipes(self, recipe_name: Optional[str] = None) -> Dict[str, Any]:
         """Get blending recipe information."""
-        recipes = self.db.get_all_blending_recipes()
-        
         if recipe_name:
-            recipe = next((r for r in recipes if r['name'] == recipe_name), None)
+            recipe = self._recipe_index().get(recipe_name)
             if not recipe:
                 return {"error": f"Recipe '{recipe_name}' not found"}
             return {"recipe": recipe}
         else:
+            recipes = self._cached_recipes()
             return {
                 "recipes": recipes,
                 "total_recipes": len(recipes),
@@ -662,11 +790,13 @@ class OASISLLMFunctions:
     def _run_schedule_optimization(self, optimization_type: str, horizon_days: int = 30, max_processing_rate: float = None) -> Dict[str, Any]:
         """Run schedule optimization."""
         try:
-            # Load data from database
-            tanks = self._load_tanks_from_db()
-            vessels = self._load_vessels_from_db()
-            crudes = self._load_crudes_from_db()
-            recipes = self._load_recipes_from_db()
+            # Load data from database; any reads the refreshed cache cannot serve
+            # share one snapshot, so tanks, vessels and recipes are consistent
+            with self.db._read_snapshot():
+                tanks = self._load_tanks_from_db()
+                vessels = self._load_vessels_from_db()
+                crudes = self._load_crudes_from_db()
+                recipes = self._load_recipes_from_db()
 
             # Determine max_processing_rate from recipes if not provided
             if max_processing_rate is None:
@@ -783,7 +913,7 @@ class OASISLLMFunctions:
             # Save to schedule_results.json
             json_path = os.path.join(output_dir, "schedule_results.json")
             with open(json_path, 'w') as f:
-                json.dump(optimized_schedule_json, f, indent=2)
+                json.dump(optimized_schedule_json, f, separators=(',', ':'))
             
             print(f"Optimized schedule saved to {json_path}")
 
@@ -842,49 +972,52 @@ class OASISLLMFunctions:
     # Analysis Functions
     def _analyze_inventory_trends(self, crude_type: Optional[str] = None, days_ahead: int = 14) -> Dict[str, Any]:
         """Analyze inventory trends."""
-        tanks = self.db.get_all_tanks()
-        
         # Calculate current inventory by grade
-        current_inventory = self._calculate_inventory_by_grade(tanks)
+        current_inventory = self._tank_totals()[2]
         
-        # Simulate trend analysis (would use real consumption data)
+        # A single grade is looked up directly instead of filtered out of the scan
+        if crude_type:
+            grades = [(crude_type, current_inventory[crude_type])] if crude_type in current_inventory else []
+        else:
+            grades = current_inventory.items()
+        
+        # Simulate trend analysis (would use real consumption data), classifying
+        # each grade and collecting its recommendation in the same pass
+        daily_consumption = 12.0  # Placeholder
         trends = {}
-        for grade, inventory in current_inventory.items():
-            if crude_type and grade != crude_type:
-                continue
-            
-            daily_consumption = 12.0  # Placeholder
+        recommendations = []
+        for grade, inventory in grades:
             days_remaining = inventory / daily_consumption if daily_consumption > 0 else float('inf')
             
+            if days_remaining < 7:
+                status = "critical"
+                recommendations.append(f"URGENT: {grade} inventory critically low - arrange immediate delivery")
+            elif days_remaining < 14:
+                status = "low"
+                recommendations.append(f"Schedule {grade} delivery within next week")
+            else:
+                status = "normal"
+            
             trends[grade] = {
                 "current_inventory": inventory,
                 "daily_consumption": daily_consumption,
                 "days_remaining": days_remaining,
-                "status": "critical" if days_remaining < 7 else "low" if days_remaining < 14 else "normal"
+                "status": status
             }
         
         return {
             "inventory_trends": trends,
             "analysis_period": days_ahead,
-            "recommendations": self._generate_inventory_recommendations(trends)
+            "recommendations": recommendations
         }
     
-    def _generate_inventory_recommendations(self, trends: Dict) -> List[str]:
-        """Generate inventory recommendations based on trends."""
-        recommendations = []
-        for grade, trend in trends.items():
-            if trend["status"] == "critical":
-                recommendations.append(f"URGENT: {grade} inventory critically low - arrange immediate delivery")
-            elif trend["status"] == "low":
-                recommendations.append(f"Schedule {grade} delivery within next week")
-        return recommendations
-    
     # Feedstock Requirements
     def _get_feedstock_requirements(self, grade: Optional[str] = None, urgent_only: bool = False) -> Dict[str, Any]:
         """Get feedstock requirements."""
         requirements = self.db.get_all_feedstock_requirements()
         
         filtered_requirements = []
+        urgent_count = 0
         current_day = 1  # Would be calculated from system date
         
         for req in requirements:
@@ -894,20 +1027,22 @@ class OASISLLMFunctions:
             days_until_required = req.get('required_arrival_by', 999) - current_day
             is_urgent = days_until_required <= 7
             
-            if urgent_only and not is_urgent:
+            if is_urgent:
+                urgent_count += 1
+            elif urgent_only:
                 continue
             
             req_info = {
-                **req,
+                **with_iso_timestamps(req),
                 "days_until_required": days_until_required,
                 "urgency": "urgent" if is_urgent else "normal"
             }
             filtered_requirements.append(req_info)
         
         return {
-            "requirements": sorted(filtered_requirements, key=lambda x: x['required_arrival_by']),
+            "requirements": sorted(filtered_requirements, key=operator.itemgetter('required_arrival_by')),
             "total_requirements": len(filtered_requirements),
-            "urgent_count": sum(1 for r in filtered_requirements if r['urgency'] == 'urgent')
+            "urgent_count": urgent_count
         }
     
     # System Summary
@@ -920,12 +1055,11 @@ class OASISLLMFunctions:
         }
         
         # Tank status
-        tanks = self.db.get_all_tanks()
         tank_summary = self._get_tank_status()["summary"]
         summary["overview"]["tanks"] = tank_summary
         
         # Vessel status
-        vessels = self.db.get_all_vessels()
+        vessels = self._cached_vessels()
         vessel_summary = {
             "total_vessels": len(vessels),
             "upcoming_arrivals": len([v for v in vessels.values() if v.get('arrival_day', 0) <= 30])
@@ -954,11 +1088,7 @@ class OASISLLMFunctions:
     # Helper methods to load data from database
     def _load_tanks_from_db(self) -> Dict[str, Tank]:
         """Load tanks from database or cached data."""
-        # Use cached data if available, otherwise fetch from database
-        if 'tanks' in self._cached_data:
-            tanks_data = self._cached_data['tanks']
-        else:
-            tanks_data = self.db.get_all_tanks()
+        tanks_data = self._cached_tanks()
         
         tanks = {}
         
@@ -976,18 +1106,14 @@ class OASISLLMFunctions:
     
     def _load_vessels_from_db(self) -> List[Vessel]:
         """Load vessels from database or cached data."""
-        # Use cached data if available, otherwise fetch from database
-        if 'vessels' in self._cached_data:
-            vessels_data = self._cached_data['vessels']
-        else:
-            vessels_data = self.db.get_all_vessels()
+        vessels_data = self._cached_vessels()
         
         vessels = []
         
         for vessel_id, vessel_info in vessels_data.items():
             # Process cargo
             cargo = []
-            for parcel_info in vessel_info.get("cargo", []):
+            for parcel_info in vessel_info.get("cargo", ()):
                 cargo.append(FeedstockParcel(
                     grade=parcel_info.get("grade", ""),
                     volume=parcel_info.get("volume", 0),
@@ -1019,8 +1145,9 @@ class OASISLLMFunctions:
         """Load crudes from database or cached data."""
         # Use cached data if available, otherwise use placeholder data
         # TODO: Implement crude loading from database when DatabaseManagerExtended supports it
-        if 'crudes' in self._cached_data:
-            crudes_data = self._cached_data['crudes']
+        cached_data = self._call_data()
+        if 'crudes' in cached_data:
+            crudes_data = cached_data['crudes']
             # Convert cached data to Crude objects if needed
             crudes = {}
             for name, data in crudes_data.items():
@@ -1047,11 +1174,7 @@ class OASISLLMFunctions:
     
     def _load_recipes_from_db(self) -> List[BlendingRecipe]:
         """Load recipes from database or cached data, with JSON fallback."""
-        # Use cached data if available, otherwise fetch from database
-        if 'recipes' in self._cached_data:
-            recipes_data = self._cached_data['recipes']
-        else:
-            recipes_data = self.db.get_all_blending_recipes()
+        recipes_data = self._cached_recipes()
         
         # If database is empty, load from JSON file as fallback
         if not recipes_data:
@@ -1087,14 +1210,20 @@ class OASISLLMFunctions:
     def _load_schedule_results(self) -> Optional[Dict]:
         """Load schedule results from JSON file."""
         try:
-            schedule_path = os.path.join(os.path.dirname(__file__), 'output', 'schedule_results.json')
-            if os.path.exists(schedule_path):
-                with open(schedule_path, 'r') as f:
+            if os.path.exists(_SCHEDULE_RESULTS_PATH):
+                with open(_SCHEDULE_RESULTS_PATH, 'r') as f:
                     return json.load(f)
         except Exception as e:
             print(f"Failed to load schedule results: {e}")
         return None
     
+    def _schedule_results_mtime(self) -> Optional[int]:
+        """Modification time of the schedule results file in ns, None when it is missing."""
+        try:
+            return os.stat(_SCHEDULE_RESULTS_PATH).st_mtime_ns
+        except OSError:
+            return None
+    
     def _analyze_specific_day(self, daily_plans: List[Dict], day: int) -> Dict[str, Any]:
         """Provide detailed analysis for a specific day."""
         if day >= len(daily_plans):
@@ -1221,7 +1350,7 @@ class OASISLLMFunctions:
             "margin_trend": "increasing" if len(daily_margins) > 1 and daily_margins[-1] > daily_margins[0] else "stable"
         }
     
-    def _analyze_inventory_trends(self, daily_plans: List[Dict]) -> Dict[str, Any]:
+    def _analyze_inventory_levels(self, daily_plans: List[Dict]) -> Dict[str, Any]:
         """Analyze inventory trends from daily plans."""
         inventory_levels = []
         grade_trends = {}
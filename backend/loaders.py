@@ -0,0 +1,218 @@
+"""
+OASIS Model Loaders
+Shared database-to-model loaders used by the API modules.
+
+Database reads are memoized per resource and keyed on the database's
+schema_version counter, which every committed write transaction bumps, so
+repeated loads between edits skip the SQLite round-trips (in every worker
+process). Model objects are always built fresh because the scheduler mutates
+tank contents in place.
+
+Copyright (c) by Abu Huzaifah Bidin with help from Github Copilot
+"""
+
+import json
+import os
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from scheduler.models import (
+    Tank, Vessel, Crude, FeedstockParcel, BlendingRecipe, Route, FeedstockRequirement
+)
+
+# Parsed daily_plans per schedule file, keyed on the file's (mtime_ns, size)
+_daily_plans_cache: Dict[str, Tuple[Tuple[int, int], List[Dict]]] = {}
+
+# DatabaseManagerExtended reader behind each cacheable resource
+_ROW_READERS = {
+    'tanks': 'get_all_tanks',
+    'vessels': 'get_all_vessels',
+    'crudes': 'get_all_crudes',
+    'recipes': 'get_all_blending_recipes',
+    'routes': 'get_all_routes',
+    'feedstock_requirements': 'get_all_feedstock_requirements',
+}
+
+
+@lru_cache(maxsize=32)
+def _cached_rows(db, name: str, schema_version: int):
+    return getattr(db, _ROW_READERS[name])()
+
+
+def load_rows(db, name: str):
+    """Raw rows for one resource, memoized until the next committed database write."""
+    return _cached_rows(db, name, db.get_schema_version())
+
+
+def load_tanks(db) -> Dict[str, Tank]:
+    """Load tanks from database and convert to Tank objects."""
+    tanks_data = load_rows(db, 'tanks')
+    tanks = {}
+
+    for tank_name, tank_info in tanks_data.items():
+        tanks[tank_name] = Tank(
+            name=tank_name,
+            capacity=tank_info['capacity'],
+            # Copy the content dicts, the scheduler withdraws from them in place
+            content=[dict(content) for content in tank_info['content']]
+        )
+
+    return tanks
+
+
+def load_vessels(db) -> List[Vessel]:
+    """Load vessels from database and convert to Vessel objects."""
+    vessels_data = load_rows(db, 'vessels')
+    vessels = []
+
+    for vessel_id, vessel_info in vessels_data.items():
+        # Process cargo data
+        cargo = []
+        for parcel_info in vessel_info.get("cargo", ()):
+            cargo.append(FeedstockParcel(
+                grade=parcel_info.get("grade", ""),
+                volume=parcel_info.get("volume", 0),
+                origin=parcel_info.get("origin", ""),
+                ldr={
+                    int(parcel_info.get("loading_start_day", 0)):
+                    int(parcel_info.get("loading_end_day", 0))
+                },
+                vessel_id=vessel_id
+            ))
+
+        # Create vessel object
+        vessel = Vessel(
+            vessel_id=vessel_id,
+            arrival_day=int(vessel_info.get("arrival_day", 0)),
+            capacity=float(vessel_info.get("capacity", 0)),
+            cost=float(vessel_info.get("cost", 0)),
+            cargo=cargo,
+            days_held=int(vessel_info.get("days_held", 0))
+        )
+
+        # Set route attribute
+        if "route" in vessel_info:
+            vessel.route = vessel_info["route"]
+
+        vessels.append(vessel)
+
+    return vessels
+
+
+def load_crudes(db) -> Dict[str, Crude]:
+    """Load crudes from database and convert to Crude objects."""
+    crudes = {}
+
+    for crude_info in load_rows(db, 'crudes'):
+        crudes[crude_info['name']] = Crude(
+            name=crude_info['name'],
+            margin=crude_info['margin'],
+            origin=crude_info['origin']
+        )
+
+    return crudes
+
+
+def load_recipes(db) -> List[BlendingRecipe]:
+    """Load recipes from database and convert to BlendingRecipe objects."""
+    recipes = []
+
+    for recipe_info in load_rows(db, 'recipes'):
+        recipes.append(BlendingRecipe(
+            name=recipe_info['name'],
+            primary_grade=recipe_info['primary_grade'],
+            secondary_grade=recipe_info.get('secondary_grade'),
+            max_rate=recipe_info['max_rate'],
+            primary_fraction=recipe_info['primary_fraction']
+        ))
+
+    return recipes
+
+
+
+def load_routes(db) -> Dict[int, Route]:
+    """Load routes from database and convert to Route objects keyed by route id."""
+    routes = {}
+
+    for route_data in load_rows(db, 'routes'):
+        route_id = route_data.get('id', '')
+        routes[route_id] = Route(
+            origin=route_data.get('origin', ''),
+            destination=route_data.get('destination', ''),
+            time_travel=route_data.get('time_travel', 0)
+        )
+
+    return routes
+
+
+def load_feedstock_requirements(db, req_data: Optional[List[Dict]] = None) -> List[FeedstockRequirement]:
+    """Load feedstock requirements from database, or from already-fetched rows."""
+    if req_data is None:
+        req_data = load_rows(db, 'feedstock_requirements')
+    requirements = []
+
+    for req_info in req_data:
+        allowed_ldr = {
+            req_info.get('loading_start_day', 1):
+            req_info.get('loading_end_day', 10)
+        }
+
+        requirements.append(FeedstockRequirement(
+            grade=req_info.get('grade', ''),
+            volume=req_info.get('volume', 0),
+            origin=req_info.get('origin', ''),
+            allowed_ldr=allowed_ldr,
+            required_arrival_by=req_info.get('required_arrival_by', 30)
+        ))
+
+    return requirements
+
+def _file_version(path: str) -> Tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load_daily_plans(path: str) -> List[Dict]:
+    """
+    Load daily_plans from a schedule results file, parsing it once per file version.
+    
+    Raises FileNotFoundError / json.JSONDecodeError like a plain json.load would.
+    Callers must treat the returned list as read-only, it is shared between requests.
+    """
+    version = _file_version(path)
+    cached = _daily_plans_cache.get(path)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    with open(path, 'rb') as f:
+        schedule_json = orjson.loads(f.read()) if orjson else json.load(f)
+    daily_plans = schedule_json.get('daily_plans', [])
+    _daily_plans_cache[path] = (version, daily_plans)
+    return daily_plans
+
+
+def remember_daily_plans(path: str, daily_plans: List[Dict]) -> None:
+    """Seed the cache with plans the caller has just written to path, skipping a re-parse."""
+    _daily_plans_cache[path] = (_file_version(path), daily_plans)
+
+
+def save_daily_plans(path: str, daily_plans: List[Dict]) -> None:
+    """
+    Write daily_plans to a schedule results file as compact JSON and seed the cache.
+    
+    Pretty-printing roughly doubled the file and dominated write time; readers
+    only ever parse it, so no indentation is emitted.
+    """
+    schedule_json = {'daily_plans': daily_plans}
+    if orjson is None:
+        with open(path, 'w') as f:
+            json.dump(schedule_json, f, separators=(',', ':'))
+    else:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(schedule_json, option=orjson.OPT_SERIALIZE_NUMPY))
+    remember_daily_plans(path, daily_plans)
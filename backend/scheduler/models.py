@@ -6,7 +6,7 @@ Copyright (c) by Abu Huzaifah Bidin with help from Github Copilot
 """
 
 from dataclasses import dataclass, field
-from typing import List,Dict, Optional, Tuple
+from typing import List,Dict, Optional, Sequence, Tuple
 
 @dataclass
 class Plant:
@@ -37,6 +37,14 @@ class Tank:
     capacity: float #maximum capacity of the tank, only pumpable
     content:List[Dict[str, float]] # list of dicts with keys as crude name and values as volume in kb
 
+    def to_dict(self) -> Dict:
+        """JSON-ready dict in the API's tank shape, as stored in schedule results."""
+        return {
+            "name": self.name,
+            "capacity": self.capacity,
+            "content": self.content
+        }
+
 @dataclass
 class BlendingRecipe:
     """
@@ -61,8 +69,20 @@ class FeedstockRequirement:
     allowed_ldr: Dict[int, int] #start and end date of the loading at terminal
     required_arrival_by: int #day by which the feedstock should arrive at the refinery
 
+    def to_dict(self) -> Dict:
+        """JSON-ready dict in the API's flat loading_start_day/loading_end_day shape."""
+        ldr_start, ldr_end = next(iter(self.allowed_ldr.items())) if self.allowed_ldr else (0, 0)
+        return {
+            "grade": self.grade,
+            "volume": self.volume,
+            "origin": self.origin,
+            "loading_start_day": ldr_start,
+            "loading_end_day": ldr_end,
+            "required_arrival_by": self.required_arrival_by
+        }
 
-@dataclass
+
+@dataclass(slots=True)
 class FeedstockParcel:
     """
     A class representing a feedstock parcel in the OASIS system.
@@ -73,7 +93,23 @@ class FeedstockParcel:
     origin: str #origin of the feedstock parcel
     vessel_id: Optional[str] = None #vessel id, if it is on a vessel
 
-@dataclass
+    @property
+    def ldr_window(self) -> Tuple[int, int]:
+        """(start, end) of the loading window, read from ldr in one step; (0, 0) if unset."""
+        return next(iter(self.ldr.items())) if self.ldr else (0, 0)
+
+    def to_dict(self) -> Dict:
+        """JSON-ready dict in the API's cargo shape."""
+        ldr_start, ldr_end = self.ldr_window
+        return {
+            "grade": self.grade,
+            "volume": self.volume,
+            "origin": self.origin,
+            "loading_start_day": ldr_start,
+            "loading_end_day": ldr_end
+        }
+
+@dataclass(slots=True)
 class Vessel:
     """
     A class representing a vessel in the OASIS system.
@@ -85,6 +121,19 @@ class Vessel:
     cargo: List[FeedstockParcel]
     original_arrival_day: Optional[int] =None
     days_held: int = 0  #days held at the arrival refinery
+    route: Sequence[Dict] = () #route segments, declared since slots forbid ad-hoc attributes
+
+    def to_dict(self) -> Dict:
+        """JSON-ready dict in the API's vessel shape, cargo included."""
+        return {
+            "vessel_id": self.vessel_id,
+            "arrival_day": self.arrival_day,
+            "capacity": self.capacity,
+            "cost": self.cost,
+            "cargo": [parcel.to_dict() for parcel in self.cargo],
+            "days_held": self.days_held,
+            "route": self.route
+        }
 
 
 
@@ -563,9 +563,9 @@ class Scheduler:
                 
                 daily_plans_json.append(plan_json)
             
-            # Write to file with proper formatting
+            # Write compact JSON, the file is only ever machine-read
             with open(file_path, 'w') as f:
-                json.dump({"daily_plans": daily_plans_json}, f, indent=2)
+                json.dump({"daily_plans": daily_plans_json}, f, separators=(',', ':'))
                 
             print(f"JSON export successful: {file_path}")
             
@@ -0,0 +1,18 @@
+"""
+OASIS WSGI Entrypoint
+Production entrypoint for serving the database-powered API.
+
+Every endpoint is I/O-bound on SQLite, so run it under a server that overlaps
+requests instead of the single-threaded Werkzeug dev server:
+
+    gunicorn -k gevent -w 4 -b 0.0.0.0:5001 wsgi:app
+
+The gevent worker monkey-patches threading, so the database manager's writer
+lock and reader pool cooperate across greenlets within each worker process.
+
+Copyright (c) by Abu Huzaifah Bidin with help from Github Copilot
+"""
+
+from api import app
+
+__all__ = ['app']
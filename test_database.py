@@ -0,0 +1,189 @@
+"""
+Test script for the SQLite persistence layer
+Covers in-memory databases, nested transactions and resuming a migration
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+
+# Add the backend directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from database.extended_ops import DatabaseManagerExtended
+from database.migration import migrate_from_json
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
+STATIC_DATA_DIR = os.path.join(BACKEND_DIR, "static_data")
+DYNAMIC_DATA_DIR = os.path.join(BACKEND_DIR, "dynamic_data")
+
+
+def test_memory_round_trip():
+    """Test that writes to a :memory: database are visible to its reads"""
+    print("=== Testing :memory: Round Trip ===")
+
+    db = DatabaseManagerExtended(":memory:")
+    try:
+        db.create_plant("Plant A", capacity=100, base_crude_capacity=80, max_inventory=500)
+        plant = db.get_plant(name="Plant A")
+        assert plant is not None and plant["capacity"] == 100
+
+        db.create_crude("Base", margin=15.0, origin="Peninsular Malaysia")
+        db.save_tanks_data({"Tank1": {"capacity": 250, "content": [{"Base": 120}]}})
+        tanks = db.get_all_tanks()
+        assert tanks["Tank1"]["content"] == [{"Base": 120.0}]
+
+        backup_dir = tempfile.mkdtemp()
+        try:
+            backup_path = os.path.join(backup_dir, "copy.db")
+            db.backup(backup_path)
+            conn = sqlite3.connect(backup_path)
+            assert conn.execute("SELECT COUNT(*) FROM tanks").fetchone()[0] == 1
+            conn.close()
+        finally:
+            shutil.rmtree(backup_dir)
+    finally:
+        db.close()
+
+    print("✓ Plant, crude and tank read back from :memory:")
+
+
+def test_nested_transaction_rollback():
+    """Test that a failing inner transaction rolls back only its own writes"""
+    print("=== Testing Nested Transaction Rollback ===")
+
+    work_dir = tempfile.mkdtemp()
+    db = DatabaseManagerExtended(os.path.join(work_dir, "nested.db"))
+    try:
+        with db.transaction("IMMEDIATE"):
+            db.create_crude("Kept", margin=10.0, origin="Sabah")
+            try:
+                with db.transaction():
+                    db.create_crude("Dropped", margin=11.0, origin="Sarawak")
+                    raise ValueError("inner failure")
+            except ValueError:
+                pass
+
+        names = {crude["name"] for crude in db.get_all_crudes()}
+        assert names == {"Kept"}, names
+
+        # A failure in the outer block discards the inner, already released, savepoint too
+        try:
+            with db.transaction("IMMEDIATE"):
+                with db.transaction():
+                    db.create_crude("Inner", margin=12.0, origin="Sabah")
+                raise ValueError("outer failure")
+        except ValueError:
+            pass
+
+        names = {crude["name"] for crude in db.get_all_crudes()}
+        assert names == {"Kept"}, names
+
+        # A BaseException such as KeyboardInterrupt rolls back too, leaving the
+        # writer free for the next transaction
+        try:
+            with db.transaction("IMMEDIATE"):
+                db.create_crude("Interrupted", margin=13.0, origin="Sabah")
+                raise KeyboardInterrupt
+        except KeyboardInterrupt:
+            pass
+
+        with db.transaction("IMMEDIATE"):
+            db.create_crude("After", margin=14.0, origin="Sarawak")
+        names = {crude["name"] for crude in db.get_all_crudes()}
+        assert names == {"Kept", "After"}, names
+    finally:
+        db.close()
+        shutil.rmtree(work_dir)
+
+    print("✓ Inner and outer failures roll back the right writes")
+
+
+def test_migration_rerun_after_partial_failure():
+    """Test that a migration re-run after a failed file completes without duplicates"""
+    print("=== Testing Migration Resume ===")
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        static_dir = os.path.join(work_dir, "static_data")
+        dynamic_dir = os.path.join(work_dir, "dynamic_data")
+        shutil.copytree(STATIC_DATA_DIR, static_dir)
+        shutil.copytree(DYNAMIC_DATA_DIR, dynamic_dir)
+        db_path = os.path.join(work_dir, "oasis.db")
+        crudes_path = os.path.join(static_dir, "crudes.json")
+
+        # Break the last crude so crudes.json fails after inserting the others
+        with open(crudes_path) as f:
+            good_crudes = f.read()
+        crudes = json.loads(good_crudes)
+        crudes[list(crudes)[-1]] = 0
+        with open(crudes_path, "w") as f:
+            json.dump(crudes, f)
+
+        first = migrate_from_json(db_path, static_dir, dynamic_dir, backup_existing=False)
+        assert "crudes.json" not in first["migrated_files"]
+
+        with open(crudes_path, "w") as f:
+            f.write(good_crudes)
+
+        def table_counts():
+            conn = sqlite3.connect(db_path)
+            try:
+                return {
+                    table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                    for table in ("crudes", "feedstock_requirements", "blending_recipes")
+                }
+            finally:
+                conn.close()
+
+        second = migrate_from_json(db_path, static_dir, dynamic_dir, backup_existing=False, resume=True)
+        assert second["status"] == "completed"
+        assert "crudes.json" in second["migrated_files"]
+        assert "feedstock_requirements.json" in second["migrated_files"]
+        counts = table_counts()
+        assert counts["crudes"] == len(crudes)
+        assert counts["feedstock_requirements"] == second["statistics"]["feedstock_requirements_migrated"]
+
+        # Everything is logged now, so a third run skips the files and changes nothing
+        third = migrate_from_json(db_path, static_dir, dynamic_dir, backup_existing=False, resume=True)
+        assert "crudes.json" in third["skipped_files"]
+        assert table_counts() == counts
+
+        # An edited file is migrated again, along with the files that depend on it
+        crudes = json.loads(good_crudes)
+        first_crude = list(crudes)[0]
+        crudes[first_crude]["margin"] = 99.0
+        with open(crudes_path, "w") as f:
+            json.dump(crudes, f)
+        fourth = migrate_from_json(db_path, static_dir, dynamic_dir, backup_existing=False, resume=True)
+        assert "crudes.json" in fourth["migrated_files"]
+        assert "feedstock_requirements.json" in fourth["migrated_files"]
+        assert "crudes.json" not in fourth["skipped_files"]
+        conn = sqlite3.connect(db_path)
+        try:
+            margin = conn.execute("SELECT margin FROM crudes WHERE name = ?", (first_crude,)).fetchone()[0]
+        finally:
+            conn.close()
+        assert margin == 99.0
+        assert table_counts() == counts
+
+        # Without resume every file is migrated, logged or not
+        full = migrate_from_json(db_path, static_dir, dynamic_dir, backup_existing=False)
+        assert full["skipped_files"] == []
+        assert "crudes.json" in full["migrated_files"]
+        assert table_counts() == counts
+    finally:
+        shutil.rmtree(work_dir)
+
+    print("✓ Re-run completes the failed file without duplicating rows")
+
+
+if __name__ == "__main__":
+    test_memory_round_trip()
+    test_nested_transaction_rollback()
+    test_migration_rerun_after_partial_failure()
+
+    print("\n=== Database Tests Complete ===")